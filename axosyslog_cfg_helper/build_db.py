@@ -1,41 +1,267 @@
+import sqlite3
 import sys
+import tempfile
+import time
 
 from argparse import ArgumentParser, Namespace
+from contextlib import closing
 from pathlib import Path
+from typing import List, Optional, Tuple
 
-from axosyslog_cfg_helper.module_loader import load_modules
+from neologism import YaccDecodeError
+
+from axosyslog_cfg_helper.driver_db import DriverDB
+from axosyslog_cfg_helper.driver_db.db_file import COMPRESSIONS, create_db_file, get_compression, open_db_file
+from axosyslog_cfg_helper.driver_db.driver_db import DriverDBDiff
+from axosyslog_cfg_helper.driver_db.sqlite_db import SQLiteDriverDB, dump_sqlite_db, is_sqlite_db
+from axosyslog_cfg_helper.module_loader import (
+    DirectorySourceTree,
+    ModuleMissingError,
+    SourceTree,
+    TarballSourceTree,
+    load_modules,
+    patch_modules,
+)
+from axosyslog_cfg_helper.module_loader.source_changes import get_changed_files
 
 
 def parse_args() -> Namespace:
     parser = ArgumentParser()
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
         "--source-dir",
         "-s",
         type=str,
-        required=True,
         help="Path of the AxoSyslog source directory (extracted from a release tarball).",
     )
+    source.add_argument(
+        "--source-tarball",
+        "-t",
+        type=str,
+        help="Path of the AxoSyslog release tarball. The source files are read from it without extracting it.",
+    )
     parser.add_argument("--output", "-o", type=str, required=True, help="Output path of the database built.")
+    parser.add_argument(
+        "--format",
+        choices=["json", "sqlite"],
+        default="json",
+        help="Format of the database built. The drivers of an SQLite database are read only when a query needs them, "
+        "and it can be queried with SQL, too.",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=sorted(COMPRESSIONS),
+        help="Compress the database built. The compression is detected when the database is read.",
+    )
+    parser.add_argument(
+        "--batch-parse",
+        action="store_true",
+        help="Parse the sentences of each grammar together, sharing the work on their common prefixes.",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of bison processes, and of worker processes enumerating the sentences of the large grammars "
+        "or parsing the SCL files.",
+    )
+    parser.add_argument(
+        "--work-dir",
+        "-w",
+        type=str,
+        help="Directory of the build artifacts. Only the grammars with changed inputs, and the changed SCL files, "
+        "are reloaded on rebuilds.",
+    )
 
-    return parser.parse_args()
+    parser.add_argument(
+        "--modules",
+        type=str,
+        help="Comma separated list of modules to rebuild. Their drivers are replaced in the database of --base-db.",
+    )
+    parser.add_argument("--base-db", type=str, help="Path of the database to patch with the modules of --modules.")
 
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep polling the source files after the build, and rebuild on their changes, reusing the build artifacts "
+        "of the grammars not affected.",
+    )
+    parser.add_argument(
+        "--watch-interval", type=float, default=1.0, help="Seconds between two polls of the source files."
+    )
 
-def main() -> int:
-    args = parse_args()
+    args = parser.parse_args()
+    if (args.modules is None) != (args.base_db is None):
+        parser.error("--modules and --base-db must be used together")
+    if args.watch and args.source_dir is None:
+        parser.error("--watch needs --source-dir")
+    if args.watch and args.modules is not None:
+        parser.error("--watch cannot be used with --modules")
+    if args.compress is not None and args.format != "json":
+        parser.error("--compress needs --format=json")
+
+    return args
+
+
+def read_header(db_file: Path, db_format: str, compression: Optional[str]) -> Tuple[Optional[str], bool]:
+    """The content hash of `db_file`, and whether it has a SupportIndex, if it is stored in `db_format`
+    with `compression`."""
+    try:
+        if db_format == "sqlite":
+            if not is_sqlite_db(db_file):
+                return None, False
+            with closing(SQLiteDriverDB(db_file)) as sqlite_driver_db:
+                return sqlite_driver_db.content_hash(), sqlite_driver_db.get_support_index() is not None
+
+        if is_sqlite_db(db_file) or get_compression(db_file) != compression:
+            return None, False
+        with open_db_file(db_file) as file:
+            content_hash = DriverDB.read_content_hash(file)
+        with open_db_file(db_file) as file:
+            return content_hash, DriverDB.read_support_index(file) is not None
+    except (OSError, ValueError, EOFError, sqlite3.Error):
+        return None, False
+
+
+def dump_db(driver_db: DriverDB, output: Path, db_format: str = "json", compression: Optional[str] = None) -> None:
+    """Replace `output` atomically, so its readers never see a partially written database.
 
-    source_dir = Path(args.source_dir)
-    lib_dir = source_dir / "lib"
-    modules_dir = source_dir / "modules"
+    `output` is kept as it is if it already holds the same drivers in the same format,
+    so the caches keyed on its stat stay valid.
 
+    The SupportIndex of the drivers is stored in the database, for the set queries of the console.
+    """
+    content_hash = driver_db.content_hash()
+    if read_header(output, db_format, compression) == (content_hash, True):
+        return
+
+    support_index = driver_db.to_support_index()
+    temporary_output = output.with_name(f".{output.name}.tmp")
+    if db_format == "sqlite":
+        temporary_output.unlink(missing_ok=True)
+        dump_sqlite_db(driver_db, temporary_output, content_hash, support_index)
+    else:
+        with create_db_file(temporary_output, compression) as file:
+            driver_db.dump(file, content_hash, support_index)
+    temporary_output.replace(output)
+
+
+def load_db(db_file: Path) -> DriverDB:
+    if is_sqlite_db(db_file):
+        with closing(SQLiteDriverDB(db_file)) as sqlite_driver_db:
+            return sqlite_driver_db.to_driver_db()
+
+    with open_db_file(db_file) as file:
+        return DriverDB.load(file)
+
+
+def format_diff_summary(diff: DriverDBDiff) -> List[str]:
+    lines = []
+
+    for context_name, drivers in diff.added_contexts.items():
+        lines.append(f"{context_name}: {len(drivers)} added")
+    for context_name, drivers in diff.removed_contexts.items():
+        lines.append(f"{context_name}: {len(drivers)} removed")
+    for context_name, context_diff in diff.changed_contexts.items():
+        counts = {
+            "added": len(context_diff.added_drivers),
+            "removed": len(context_diff.removed_drivers),
+            "changed": len(context_diff.changed_drivers),
+        }
+        lines.append(f"{context_name}: " + ", ".join(f"{count} {kind}" for kind, count in counts.items() if count))
+
+    return sorted(lines)
+
+
+def rebuild(args: Namespace, source_tree: SourceTree, work_dir: Path) -> DriverDB:
+    """A full build, with the build artifacts of the grammars whose inputs did not change reused.
+    Patching the previous database could not remove the drivers, blocks or options removed
+    from the sources, so the result would differ from a build from scratch."""
+    lib_dir = source_tree.root / "lib"
+    modules_dir = source_tree.root / "modules"
+
+    return load_modules(lib_dir, modules_dir, args.batch_parse, work_dir, source_tree, args.jobs)
+
+
+def watch(args: Namespace, source_tree: SourceTree, driver_db: DriverDB, work_dir: Path) -> int:
     output = Path(args.output)
+    mtimes = source_tree.get_mtimes()
+    print(f"Watching '{source_tree.root}' for changes.")
+
+    try:
+        while True:
+            time.sleep(args.watch_interval)
+
+            current_mtimes = source_tree.get_mtimes()
+            changed_files = get_changed_files(mtimes, current_mtimes)
+            mtimes = current_mtimes
+            # Only the source files are polled, any change of them may change the database
+            if not changed_files:
+                continue
 
-    driver_db = load_modules(lib_dir, modules_dir)
+            print(f"{len(changed_files)} source files changed, rebuilding.")
+            start = time.monotonic()
+            try:
+                rebuilt_driver_db = rebuild(args, source_tree, work_dir)
+            except (YaccDecodeError, OSError, UnicodeDecodeError) as exception:
+                # A source file is being edited: it does not parse yet, or it is removed or half written
+                print(f"Rebuild failed, waiting for the next change: {exception}")
+                continue
 
-    with output.open("w", encoding="utf-8") as file:
-        driver_db.dump(file)
+            dump_db(rebuilt_driver_db, output, args.format, args.compress)
+            print(f"Rebuilt '{output}' in {time.monotonic() - start:.2f}s.")
+            for line in format_diff_summary(rebuilt_driver_db.diff(driver_db)) or ["No changes in the database."]:
+                print(f"    {line}")
+
+            driver_db = rebuilt_driver_db
+    except KeyboardInterrupt:
+        return 0
+
+
+def build(args: Namespace, source_tree: SourceTree, work_dir: Optional[Path]) -> int:
+    lib_dir = source_tree.root / "lib"
+    modules_dir = source_tree.root / "modules"
+
+    if args.modules is None:
+        driver_db = load_modules(lib_dir, modules_dir, args.batch_parse, work_dir, source_tree, args.jobs)
+    else:
+        driver_db = load_db(Path(args.base_db))
+
+        module_names = [module_name.strip() for module_name in args.modules.split(",") if module_name.strip()]
+        try:
+            patch_modules(
+                driver_db, lib_dir, modules_dir, module_names, args.batch_parse, work_dir, source_tree, args.jobs
+            )
+        except ModuleMissingError as exception:
+            print(exception, file=sys.stderr)
+            return 1
+
+    dump_db(driver_db, Path(args.output), args.format, args.compress)
+
+    if args.watch:
+        assert work_dir is not None
+        return watch(args, source_tree, driver_db, work_dir)
 
     return 0
 
 
+def main() -> int:
+    args = parse_args()
+
+    if args.source_tarball is not None:
+        print(f"Reading the source files from '{args.source_tarball}'.")
+        source_tree: SourceTree = TarballSourceTree(Path(args.source_tarball))
+    else:
+        source_tree = DirectorySourceTree(Path(args.source_dir))
+
+    if args.watch and args.work_dir is None:
+        # The rebuilds reuse the grammars with unchanged inputs from the build artifacts
+        with tempfile.TemporaryDirectory() as work_dir:
+            return build(args, source_tree, Path(work_dir))
+
+    return build(args, source_tree, Path(args.work_dir) if args.work_dir else None)
+
+
 if __name__ == "__main__":
     sys.exit(main())
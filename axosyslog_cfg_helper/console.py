@@ -2,12 +2,20 @@ import sys
 
 from argparse import Action, ArgumentParser, Namespace
 from importlib.metadata import version as _pkg_version
+from contextlib import closing, redirect_stdout
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Union
 
 from axosyslog_cfg_helper._axosyslog_version import AXOSYSLOG_VERSION
 from axosyslog_cfg_helper.driver_db import DriverDB, Driver
-from axosyslog_cfg_helper.driver_db.utils import color_red, unindent
+from axosyslog_cfg_helper.driver_db.db_file import open_db_file
+from axosyslog_cfg_helper.driver_db.sqlite_db import SQLiteDriverDB, is_sqlite_db
+from axosyslog_cfg_helper.driver_db.support_index import SupportIndex
+from axosyslog_cfg_helper.driver_db.utils import color_red, normalize_name, unindent
+from axosyslog_cfg_helper.scl_overlay import get_cache_dir, load_overlay
+
+# The drivers of an SQLite database are read only when a query needs them, see build_db.py --format
+QueriedDatabase = Union[DriverDB, SQLiteDriverDB]
 
 
 def colorize_context_name(name: str, colored: bool = True) -> str:
@@ -32,20 +40,122 @@ def parse_args() -> Namespace:
     parser.add_argument("--context", "-c", type=str, help="e.g.: destination")
     parser.add_argument("--driver", "-d", type=str, help="e.g.: http")
     parser.add_argument("--no-color", "-n", action="store_true", help="Do not color the output")
+    parser.add_argument(
+        "--scl-path",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help="Directory of custom SCL files, whose blocks are queried as drivers too. Can be given more than once.",
+    )
+    set_query = parser.add_mutually_exclusive_group()
+    set_query.add_argument(
+        "--drivers-supporting",
+        type=str,
+        metavar="OPTIONS",
+        help="List the drivers supporting every option of the comma separated list, e.g.: tls/ca-file,keep-alive. "
+        "The drivers can be limited to the ones of --context.",
+    )
+    set_query.add_argument(
+        "--options-shared-by",
+        type=str,
+        metavar="DRIVERS",
+        help="List the options supported by every driver of --context in the comma separated list, e.g.: http,kafka",
+    )
     parser.add_argument("--version", "-V", action=_PrintVersionAction, help="Print version information and exit")
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.options_shared_by is not None and args.context is None:
+        parser.error("--options-shared-by needs --context")
+    if (args.drivers_supporting is not None or args.options_shared_by is not None) and args.driver is not None:
+        parser.error("--drivers-supporting and --options-shared-by cannot be used with --driver")
+    if args.drivers_supporting is not None and not args.drivers_supporting.strip(", "):
+        parser.error("--drivers-supporting needs at least one option")
+    for scl_path in args.scl_path:
+        if not Path(scl_path).is_dir():
+            parser.error(f"--scl-path: '{scl_path}' is not a directory")
+
+    return args
 
 
-def open_db() -> DriverDB:
-    db_file = Path(__file__).parent / "axosyslog-cfg-helper.db"
-    with db_file.open("r") as file:
-        driver_db = DriverDB.load(file)
+def get_db_file() -> Path:
+    return Path(__file__).parent / "axosyslog-cfg-helper.db"
+
+
+def open_db() -> QueriedDatabase:
+    if is_sqlite_db(get_db_file()):
+        return SQLiteDriverDB(get_db_file())
+
+    # The database may be compressed, see build_db.py --compress.
+    # A query prints a few drivers at most, the others are never built.
+    with open_db_file(get_db_file()) as file:
+        driver_db = DriverDB.load(file, lazy=True)
 
     return driver_db
 
 
-def print_global_options(driver_db: DriverDB, colored: bool) -> None:
+def get_db_fingerprint() -> str:
+    if is_sqlite_db(get_db_file()):
+        with closing(SQLiteDriverDB(get_db_file())) as sqlite_driver_db:
+            content_hash = sqlite_driver_db.content_hash()
+    else:
+        with open_db_file(get_db_file()) as file:
+            content_hash = DriverDB.read_content_hash(file)
+
+    if content_hash is not None:
+        return content_hash
+
+    db_stat = get_db_file().stat()
+    return f"{db_stat.st_mtime_ns}:{db_stat.st_size}"
+
+
+def read_support_index() -> Optional[SupportIndex]:
+    if is_sqlite_db(get_db_file()):
+        with closing(SQLiteDriverDB(get_db_file())) as sqlite_driver_db:
+            return sqlite_driver_db.get_support_index()
+
+    with open_db_file(get_db_file()) as file:
+        return DriverDB.read_support_index(file)
+
+
+def load_scl_overlays(driver_db: DriverDB, scl_dirs: List[Path]) -> None:
+    """Merge the drivers of the SCL blocks in `scl_dirs` into `driver_db`. A directory may
+    use the drivers of the ones before it."""
+    fingerprint = get_db_fingerprint()
+
+    # The diagnostics of the SCL loader must not be mixed into the answer of the query
+    with redirect_stdout(sys.stderr):
+        for scl_dir in scl_dirs:
+            overlay, fingerprint = load_overlay(scl_dir, driver_db, fingerprint, get_cache_dir())
+            for context in overlay.contexts:
+                for driver in overlay.get_drivers_in_context(context):
+                    driver_db.adopt_driver(driver)
+
+
+def open_db_with_overlays(scl_dirs: List[Path]) -> QueriedDatabase:
+    driver_db = open_db()
+    if not scl_dirs:
+        return driver_db
+
+    # The overlays are merged into the drivers in memory
+    full_driver_db = driver_db.to_driver_db() if isinstance(driver_db, SQLiteDriverDB) else driver_db
+    load_scl_overlays(full_driver_db, scl_dirs)
+
+    return full_driver_db
+
+
+def open_support_index(scl_dirs: List[Path]) -> SupportIndex:
+    """The SupportIndex stored in the database. It is built from the drivers if the
+    database has none, or if the drivers of SCL overlays are queried, too."""
+    if not scl_dirs:
+        support_index = read_support_index()
+        if support_index is not None:
+            return support_index
+
+    driver_db = open_db_with_overlays(scl_dirs)
+    return (driver_db.to_driver_db() if isinstance(driver_db, SQLiteDriverDB) else driver_db).to_support_index()
+
+
+def print_global_options(driver_db: QueriedDatabase, colored: bool) -> None:
     driver = driver_db.get_driver("options", DriverDB.GLOBAL_OPTIONS_DRIVER_NAME)
     global_options_str = driver.colored_str() if colored else str(driver)
     global_options_str = unindent(global_options_str)
@@ -54,24 +164,26 @@ def print_global_options(driver_db: DriverDB, colored: bool) -> None:
     print("\n".join(global_options_str_lines[1:-1]))
 
 
-def print_options(driver_db: DriverDB, context_name: str, driver_name: str, colored: bool) -> None:
+def print_options(driver_db: QueriedDatabase, context_name: str, driver_name: str, colored: bool) -> None:
     if context_name not in driver_db.contexts:
         print(f"The context '{context_name}' is not in the database.")
         print_contexts(driver_db, colored)
         return
 
-    try:
-        driver = driver_db.get_driver(context_name, driver_name)
-        print(driver.colored_str() if colored else str(driver))
-    except KeyError:
+    # the names typed by the user may use underscores instead of hyphens, like in the configuration
+    driver = driver_db.find_driver_normalized(context_name, driver_name)
+    if driver is None:
         print(
             f"The driver '{Driver.colorize_name(driver_name, colored)}' is not in the drivers of context "
             f"'{colorize_context_name(context_name, colored)}'."
         )
         print_drivers(driver_db, context_name, colored)
+        return
+
+    print(driver.colored_str() if colored else str(driver))
 
 
-def print_drivers(driver_db: DriverDB, context_name: str, colored: bool) -> None:
+def print_drivers(driver_db: QueriedDatabase, context_name: str, colored: bool) -> None:
     if context_name not in driver_db.contexts:
         print(f"The context '{colorize_context_name(context_name, colored)}' is not in the database.")
         print_contexts(driver_db, colored)
@@ -87,14 +199,52 @@ def print_drivers(driver_db: DriverDB, context_name: str, colored: bool) -> None
     )
 
 
-def print_contexts(driver_db: DriverDB, colored: bool) -> None:
+def print_contexts(driver_db: QueriedDatabase, colored: bool) -> None:
     print("Valid contexts:")
     for context_name in sorted(driver_db.contexts):
         print(f"  {colorize_context_name(context_name, colored)}")
     print(f"Print the drivers of {colorize_context_name('CONTEXT', colored)} with `--context CONTEXT`.")
 
 
-def query(driver_db: DriverDB, context: Optional[str], driver: Optional[str], colored: bool) -> None:
+def print_drivers_supporting(
+    support_index: SupportIndex, option_paths: List[str], context_name: Optional[str], colored: bool
+) -> None:
+    quoted_paths = ", ".join(f"'{option_path}'" for option_path in option_paths)
+    drivers = support_index.get_drivers_supporting(option_paths, context_name)
+    if not drivers:
+        print(f"No driver supports {quoted_paths}.")
+        return
+
+    print(f"Drivers supporting {quoted_paths}:")
+    for driver_context_name, driver_name in drivers:
+        print(f"  {colorize_context_name(driver_context_name, colored)} {Driver.colorize_name(driver_name, colored)}")
+
+
+def print_options_shared_by(
+    support_index: SupportIndex, context_name: str, driver_names: List[str], colored: bool
+) -> None:
+    # the names typed by the user may use underscores instead of hyphens, like in the configuration
+    drivers = {name: (context, name) for context, name in support_index.drivers if context == context_name}
+    normalized_drivers = {normalize_name(name): driver for name, driver in reversed(drivers.items())}
+
+    driver_keys = []
+    for driver_name in driver_names:
+        driver_key = drivers.get(driver_name) or normalized_drivers.get(normalize_name(driver_name))
+        if driver_key is None:
+            print(
+                f"The driver '{Driver.colorize_name(driver_name, colored)}' is not in the drivers of context "
+                f"'{colorize_context_name(context_name, colored)}'."
+            )
+            return
+        driver_keys.append(driver_key)
+
+    quoted_drivers = ", ".join(f"'{Driver.colorize_name(name, colored)}'" for _, name in driver_keys)
+    print(f"Options shared by {quoted_drivers} of context '{colorize_context_name(context_name, colored)}':")
+    for option_path in support_index.get_shared_paths(driver_keys):
+        print(f"  {option_path}")
+
+
+def query(driver_db: QueriedDatabase, context: Optional[str], driver: Optional[str], colored: bool) -> None:
     if context == "options":
         print_global_options(driver_db, colored)
         return
@@ -118,6 +268,19 @@ def query(driver_db: DriverDB, context: Optional[str], driver: Optional[str], co
 
 def run():
     args = parse_args()
-    driver_db = open_db()
+    scl_dirs = [Path(scl_path) for scl_path in args.scl_path]
     use_color = not args.no_color and sys.stdout.isatty()
-    query(driver_db, args.context, args.driver, use_color)
+
+    # The set queries read only the SupportIndex, not the drivers
+    if args.drivers_supporting is not None:
+        option_paths = [
+            option_path.strip() for option_path in args.drivers_supporting.split(",") if option_path.strip()
+        ]
+        print_drivers_supporting(open_support_index(scl_dirs), option_paths, args.context, use_color)
+        return
+    if args.options_shared_by is not None:
+        driver_names = [driver_name.strip() for driver_name in args.options_shared_by.split(",") if driver_name.strip()]
+        print_options_shared_by(open_support_index(scl_dirs), args.context, driver_names, use_color)
+        return
+
+    query(open_db_with_overlays(scl_dirs), args.context, args.driver, use_color)
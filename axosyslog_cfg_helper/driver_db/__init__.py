@@ -1,13 +1,18 @@
 from .driver_db import DriverDB
+from .driver_db_builder import DriverDBBuilder
 from .driver import Driver
+from .inheriting_driver import InheritingDriver
 from .block import Block
 from .option import Option
-from .exceptions import MergeException
+from .exceptions import BuilderFinishedException, MergeException
 
 __all__ = [
     "DriverDB",
+    "DriverDBBuilder",
     "Driver",
+    "InheritingDriver",
     "Block",
     "Option",
     "MergeException",
+    "BuilderFinishedException",
 ]
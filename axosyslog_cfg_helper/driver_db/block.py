@@ -1,10 +1,10 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional, ValuesView
+from typing import Any, Dict, Iterable, Optional, ValuesView
 
 from .exceptions import DiffException, MergeException
 from .option import Option, OptionDiff
-from .utils import color_purple, diff_indent, indent, prepend_each_line, sorted_with_none
+from .utils import color_purple, diff_indent, indent, normalize_name, prepend_each_line, sorted_with_none
 
 
 @dataclass
@@ -50,11 +50,17 @@ class BlockDiff:
         return string
 
 
-class Block:
+class Block:  # pylint: disable=too-many-public-methods
     def __init__(self, name: str):
         self.__name = name
         self.__blocks: Dict[str, Block] = {}
         self.__options: Dict[Optional[str], Option] = {}
+        # The to_dict() the blocks and options are built from on access, see _materialize()
+        self.__unbuilt_dict: Optional[Dict[str, Any]] = None
+        # normalized name -> name of the first block/option with that normalized name,
+        # built by the first find_*_normalized() call and kept up to date afterwards
+        self.__normalized_block_names: Optional[Dict[str, str]] = None
+        self.__normalized_option_names: Optional[Dict[str, str]] = None
 
     @property
     def name(self) -> str:
@@ -62,35 +68,103 @@ class Block:
 
     @property
     def blocks(self) -> ValuesView[Block]:
-        return self.__blocks.values()
+        return self.__block_dict.values()
 
     def get_block(self, name: str) -> Block:
-        return self.__blocks[name]
+        return self.__block_dict[name]
+
+    def find_block_normalized(self, name: str) -> Optional[Block]:
+        """Find a block by its name, treating hyphens and underscores as equal."""
+        if self.__normalized_block_names is None:
+            self.__normalized_block_names = {}
+            for existing_name in self.__block_dict:
+                self.__index_name(self.__normalized_block_names, existing_name)
+
+        block_name = self.__normalized_block_names.get(normalize_name(name))
+        return None if block_name is None else self.__block_dict[block_name]
 
     def add_block(self, block: Block) -> None:
-        if block.name not in self.__blocks:
-            self.__blocks[block.name] = block.copy()
+        blocks = self.__block_dict
+        if block.name not in blocks:
+            blocks[block.name] = block.copy()
+            self.__index_name(self.__normalized_block_names, block.name)
         else:
-            self.get_block(block.name).merge(block)
+            blocks[block.name].merge(block)
+
+    def adopt_block(self, block: Block) -> None:
+        """Like add_block(), but takes ownership of `block` instead of copying it."""
+        blocks = self.__block_dict
+        if block.name not in blocks:
+            blocks[block.name] = block
+            self.__index_name(self.__normalized_block_names, block.name)
+        else:
+            blocks[block.name].adopt(block)
 
     def remove_block(self, name) -> None:
-        self.__blocks.pop(name)
+        blocks = self.__block_dict
+        blocks.pop(name)
+        self.__unindex_name(self.__normalized_block_names, name, blocks)
 
     @property
     def options(self) -> ValuesView[Option]:
-        return self.__options.values()
+        return self.__option_dict.values()
 
     def get_option(self, name: Optional[str]) -> Option:
-        return self.__options[name]
+        return self.__option_dict[name]
+
+    def find_option_normalized(self, name: str) -> Optional[Option]:
+        """Find a named option by its name, treating hyphens and underscores as equal."""
+        if self.__normalized_option_names is None:
+            self.__normalized_option_names = {}
+            for existing_name in self.__option_dict:
+                self.__index_name(self.__normalized_option_names, existing_name)
+
+        option_name = self.__normalized_option_names.get(normalize_name(name))
+        return None if option_name is None else self.__option_dict[option_name]
 
     def add_option(self, option: Option) -> None:
-        if option.name not in self.__options:
-            self.__options[option.name] = option.copy()
+        options = self.__option_dict
+        if option.name not in options:
+            options[option.name] = option.copy()
+            self.__index_name(self.__normalized_option_names, option.name)
+        else:
+            options[option.name].merge(option)
+
+    def adopt_option(self, option: Option) -> None:
+        """Like add_option(), but takes ownership of `option` instead of copying it."""
+        options = self.__option_dict
+        if option.name not in options:
+            options[option.name] = option
+            self.__index_name(self.__normalized_option_names, option.name)
         else:
-            self.get_option(option.name).merge(option)
+            options[option.name].merge(option)
 
     def remove_option(self, name: Optional[str]) -> None:
-        self.__options.pop(name)
+        options = self.__option_dict
+        options.pop(name)
+        self.__unindex_name(self.__normalized_option_names, name, options)
+
+    @staticmethod
+    def __index_name(normalized_names: Optional[Dict[str, str]], name: Optional[str]) -> None:
+        if normalized_names is not None and name:
+            normalized_names.setdefault(normalize_name(name), name)
+
+    @staticmethod
+    def __unindex_name(
+        normalized_names: Optional[Dict[str, str]], name: Optional[str], remaining_names: Iterable[Optional[str]]
+    ) -> None:
+        if normalized_names is None or not name:
+            return
+
+        normalized_name = normalize_name(name)
+        if normalized_names.get(normalized_name) != name:
+            return
+
+        del normalized_names[normalized_name]
+        for remaining_name in remaining_names:
+            if remaining_name and normalize_name(remaining_name) == normalized_name:
+                normalized_names[normalized_name] = remaining_name
+                break
 
     def merge(self, other: Block) -> None:
         if self.name != other.name:
@@ -102,12 +176,58 @@ class Block:
         for option in other.options:
             self.add_option(option)
 
+    def adopt(self, other: Block) -> None:
+        """Like merge(), but takes ownership of the blocks and options of `other`
+        instead of copying them. `other` must not be used afterwards."""
+        if self.name != other.name:
+            raise MergeException(f"Cannot merge two Blocks with different names: '{self.name}' and '{other.name}'")
+
+        for block in other.blocks:
+            self.adopt_block(block)
+
+        for option in other.options:
+            self.adopt_option(option)
+
     def copy(self) -> Block:
         clone = Block(self.name)
         clone.merge(self)
 
         return clone
 
+    def _materialize(self) -> None:
+        """Build the blocks and options, if they are built on access. Every access of them goes
+        through __block_dict and __option_dict, which call this first. The subclasses building
+        their blocks and options on access extend it."""
+        if self.__unbuilt_dict is None:
+            return
+
+        as_dict = self.__unbuilt_dict
+        self.__unbuilt_dict = None
+        for block in as_dict["blocks"].values():
+            self.adopt_block(Block.from_dict(block, lazy=True))
+        for option in as_dict["options"].values():
+            self.adopt_option(Option.from_dict(option))
+
+    @property
+    def materialized(self) -> bool:
+        """Whether the blocks and options are built, see _materialize()."""
+        return self.__unbuilt_dict is None
+
+    @property
+    def __block_dict(self) -> Dict[str, Block]:
+        self._materialize()
+        return self.__blocks
+
+    @property
+    def __option_dict(self) -> Dict[Optional[str], Option]:
+        self._materialize()
+        return self.__options
+
+    def _build_on_access(self, as_dict: Dict[str, Any]) -> None:
+        """Keep the to_dict() of the blocks and options, and build them only when they are
+        first accessed. Their blocks are built on access, too."""
+        self.__unbuilt_dict = as_dict
+
     def __process_option_to_block_transform_diff(
         self,
         their_option_name: str,
@@ -122,9 +242,9 @@ class Block:
         diff.changed_blocks[their_option_name] = our_block.diff(their_block_from_option)
 
     def __gather_option_diffs(self, compared_to: Block, diff: BlockDiff) -> None:
-        for their_option_name, their_option in compared_to.__options.items():
-            if their_option_name not in self.__options:
-                if their_option_name not in self.__blocks:
+        for their_option_name, their_option in compared_to.__option_dict.items():
+            if their_option_name not in self.__option_dict:
+                if their_option_name not in self.__block_dict:
                     diff.removed_options[their_option_name] = their_option.copy()
                 else:
                     self.__process_option_to_block_transform_diff(their_option_name, their_option, diff)
@@ -136,8 +256,8 @@ class Block:
 
             diff.changed_options[their_option_name] = our_option.diff(their_option)
 
-        for our_option_name, our_option in self.__options.items():
-            if our_option_name not in compared_to.__options:
+        for our_option_name, our_option in self.__option_dict.items():
+            if our_option_name not in compared_to.__option_dict:
                 diff.added_options[our_option_name] = our_option.copy()
                 continue
 
@@ -155,9 +275,9 @@ class Block:
         diff.changed_blocks[their_block_name] = our_block_from_option.diff(their_block)
 
     def __gather_block_diffs(self, compared_to: Block, diff: BlockDiff) -> None:
-        for their_block_name, their_block in compared_to.__blocks.items():
-            if their_block_name not in self.__blocks:
-                if their_block_name not in self.__options:
+        for their_block_name, their_block in compared_to.__block_dict.items():
+            if their_block_name not in self.__block_dict:
+                if their_block_name not in self.__option_dict:
                     diff.removed_blocks[their_block_name] = their_block.copy()
                 else:
                     self.__process_block_to_option_transform_diff(their_block_name, their_block, diff)
@@ -169,8 +289,8 @@ class Block:
 
             diff.changed_blocks[their_block_name] = our_block.diff(their_block)
 
-        for our_block_name, our_block in self.__blocks.items():
-            if our_block_name not in compared_to.__blocks:
+        for our_block_name, our_block in self.__block_dict.items():
+            if our_block_name not in compared_to.__block_dict:
                 diff.added_blocks[our_block_name] = our_block.copy()
                 continue
 
@@ -188,8 +308,12 @@ class Block:
         return diff
 
     @staticmethod
-    def from_dict(as_dict: Dict[str, Any]) -> Block:
+    def from_dict(as_dict: Dict[str, Any], lazy: bool = False) -> Block:
+        """With `lazy`, the blocks and options are built from `as_dict` when they are first accessed."""
         self = Block(as_dict["name"])
+        if lazy:
+            self._build_on_access(as_dict)
+            return self
 
         for block in as_dict["blocks"].values():
             self.add_block(Block.from_dict(block))
@@ -206,27 +330,27 @@ class Block:
             "options": {},
         }
 
-        for block_name, block in self.__blocks.items():
+        for block_name, block in self.__block_dict.items():
             as_dict["blocks"][block_name] = block.to_dict()
 
-        for option_name, option in self.__options.items():
+        for option_name, option in self.__option_dict.items():
             as_dict["options"][option_name or ""] = option.to_dict()
 
         return as_dict
 
     def __repr__(self) -> str:
-        return f"Block({repr(self.__name)}, {repr(self.__blocks)}, {repr(self.__options)})"
+        return f"Block({repr(self.__name)}, {repr(self.__block_dict)}, {repr(self.__option_dict)})"
 
     def __str(self, colored: bool = False) -> str:
         string = f"{self.colorize_name(self.name, colored)}(\n"
 
         block_and_option_strs: Dict[Optional[str], str] = {}
 
-        for block_name, block in self.__blocks.items():
+        for block_name, block in self.__block_dict.items():
             block_and_option_strs.setdefault(block_name, "")
             block_and_option_strs[block_name] += f"{indent(block.colored_str() if colored else str(block))}\n"
 
-        for option_name, option in self.__options.items():
+        for option_name, option in self.__option_dict.items():
             block_and_option_strs.setdefault(option_name, "")
             block_and_option_strs[option_name] += f"{indent(option.colored_str() if colored else str(option))}\n"
 
@@ -251,4 +375,8 @@ class Block:
         if not isinstance(other, Block):
             return False
 
-        return self.__name == other.__name and self.__blocks == other.__blocks and self.__options == other.__options
+        return (
+            self.__name == other.__name
+            and self.__block_dict == other.__block_dict
+            and self.__option_dict == other.__option_dict
+        )
@@ -0,0 +1,72 @@
+import gzip
+import io
+import lzma
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, TextIO
+
+# The compressions of the database, with the magic bytes starting their files
+COMPRESSIONS: Dict[str, bytes] = {
+    "gzip": b"\x1f\x8b",
+    "lzma": b"\xfd7zXZ\x00",
+}
+
+
+def get_compression(path: Path) -> Optional[str]:
+    """The compression of the database file at `path`, detected from its magic bytes. None if it is not compressed."""
+    with path.open("rb") as file:
+        magic_bytes = file.read(max(len(magic) for magic in COMPRESSIONS.values()))
+
+    for compression, magic in COMPRESSIONS.items():
+        if magic_bytes.startswith(magic):
+            return compression
+
+    return None
+
+
+def _compress(file: BinaryIO, compression: str) -> BinaryIO:
+    if compression == "gzip":
+        # Without a file name and timestamp in the header, the same database is always compressed to the same bytes
+        return gzip.GzipFile(filename="", mode="wb", fileobj=file, mtime=0)  # type: ignore[return-value]
+    if compression == "lzma":
+        return lzma.LZMAFile(file, "wb")  # type: ignore[return-value]
+
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def _decompress(file: BinaryIO, compression: str) -> BinaryIO:
+    if compression == "gzip":
+        return gzip.GzipFile(mode="rb", fileobj=file)  # type: ignore[return-value]
+    if compression == "lzma":
+        return lzma.LZMAFile(file, "rb")  # type: ignore[return-value]
+
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+@contextmanager
+def open_db_file(path: Path) -> Iterator[TextIO]:
+    """Open the database file at `path` for reading, decompressing it while it is read, if it is compressed."""
+    compression = get_compression(path)
+    if compression is None:
+        with path.open("r", encoding="utf-8") as file:
+            yield file
+        return
+
+    with path.open("rb") as binary_file, _decompress(binary_file, compression) as decompressed_file:
+        yield io.TextIOWrapper(decompressed_file, encoding="utf-8")
+
+
+@contextmanager
+def create_db_file(path: Path, compression: Optional[str] = None) -> Iterator[TextIO]:
+    """Open the database file at `path` for writing, compressing it with `compression`, one of COMPRESSIONS."""
+    if compression is None:
+        with path.open("w", encoding="utf-8") as file:
+            yield file
+        return
+
+    with path.open("wb") as binary_file, _compress(binary_file, compression) as compressed_file:
+        text_file = io.TextIOWrapper(compressed_file, encoding="utf-8")
+        yield text_file
+        text_file.flush()
+        text_file.detach()
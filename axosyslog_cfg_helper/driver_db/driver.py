@@ -37,6 +37,14 @@ class Driver(Block):
 
         super().merge(other)
 
+    def adopt(self, other: Block) -> None:
+        if isinstance(other, Driver) and self.context != other.context:
+            raise MergeException(
+                f"Cannot merge two drivers with different contexts: '{self.context}' and '{other.context}'"
+            )
+
+        super().adopt(other)
+
     def to_block(self) -> Block:
         block = Block(self.name)
         block.merge(self)
@@ -66,8 +74,12 @@ class Driver(Block):
         )
 
     @staticmethod
-    def from_dict(as_dict: Dict[str, Any]) -> Driver:
+    def from_dict(as_dict: Dict[str, Any], lazy: bool = False) -> Driver:
+        """With `lazy`, the blocks and options are built from `as_dict` when they are first accessed."""
         self = Driver(as_dict["context"], as_dict["name"])
+        if lazy:
+            self._build_on_access(as_dict)
+            return self
 
         for block in as_dict["blocks"].values():
             self.add_block(Block.from_dict(block))
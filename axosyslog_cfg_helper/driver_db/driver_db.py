@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import hashlib
 import json
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, IO, KeysView, ValuesView
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, KeysView, List, Optional, Set, Tuple, ValuesView
 
 from .driver import Driver, DriverDiff
-from .utils import prepend_each_line
+from .inheriting_driver import InheritingDriver, to_resolved_dict
+from .json_stream import JSONStreamReader
+from .node_table import NodeTable
+from .support_index import SupportIndex
+from .utils import normalize_name, prepend_each_line
 
 
 @dataclass
@@ -79,39 +84,152 @@ class DriverDBDiff:
         return string
 
 
-class DriverDB:
+DriverDict = Tuple[str, str, Dict[str, Any]]
+
+
+def _iter_driver_dicts(file: IO, plugin_names: Dict[str, List[str]]) -> Iterator[DriverDict]:
+    """The (context name, driver name, driver dict) of the drivers of a dumped DB, decoding one driver at a time.
+    The plugin names of the DB are read into `plugin_names`, they are dumped after the drivers."""
+    reader = JSONStreamReader(file)
+
+    for key in reader.read_members():
+        if key == DriverDB.PLUGINS_KEY:
+            plugin_names.update(reader.read_value())
+            continue
+        if key != "contexts":
+            reader.read_value()
+            continue
+        for context_name in reader.read_members():
+            for driver_name in reader.read_members():
+                yield context_name, driver_name, reader.read_value()
+
+    reader.read_end()
+
+
+def _canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+class DriverDB:  # pylint: disable=too-many-public-methods
     GLOBAL_OPTIONS_DRIVER_NAME = "global-options"
+    CONTENT_HASH_KEY = "content-hash"
+    SUPPORT_INDEX_KEY = "support-index"
+    PLUGINS_KEY = "plugins"
 
     def __init__(self) -> None:
         self.__contexts: Dict[str, Dict[str, Driver]] = {}
+        # the InheritingDrivers not resolved yet, by their id()
+        self.__unresolved_drivers: Dict[int, InheritingDriver] = {}
+        # the names of the plugins connected to the drivers of each context, as blocks
+        self.__plugin_names: Dict[str, Set[str]] = {}
 
     @property
     def contexts(self) -> KeysView[str]:
         return self.__contexts.keys()
 
+    @property
+    def plugin_names(self) -> Dict[str, Set[str]]:
+        """The names of the plugins connected to the drivers of each context, see add_plugin_names()."""
+        return {context: set(plugin_names) for context, plugin_names in self.__plugin_names.items()}
+
+    def add_plugin_names(self, context: str, plugin_names: Iterable[str]) -> None:
+        """Record that the blocks named `plugin_names` of the drivers of `context` are plugins,
+        not defined by the drivers themselves, so they can be told apart when the drivers are rebuilt."""
+        plugin_names = set(plugin_names)
+        if plugin_names:
+            self.__plugin_names.setdefault(context, set()).update(plugin_names)
+
+    def get_plugin_names(self, context: str) -> Set[str]:
+        return set(self.__plugin_names.get(context, ()))
+
     def add_driver(self, driver: Driver) -> DriverDB:
         context = self.__contexts.setdefault(driver.context, {})
 
         if driver.name in context:
+            self.resolve_inheriting_drivers([context[driver.name], driver])
             context[driver.name].merge(driver)
         else:
             context[driver.name] = driver.copy()
+            self.__track_unresolved_driver(context[driver.name])
+
+        return self
+
+    def adopt_driver(self, driver: Driver) -> DriverDB:
+        """Like add_driver(), but takes ownership of `driver` instead of copying it."""
+        context = self.__contexts.setdefault(driver.context, {})
+
+        if driver.name in context:
+            self.resolve_inheriting_drivers([context[driver.name], driver])
+            context[driver.name].adopt(driver)
+        else:
+            context[driver.name] = driver
+            self.__track_unresolved_driver(driver)
 
         return self
 
+    def __track_unresolved_driver(self, driver: Driver) -> None:
+        if isinstance(driver, InheritingDriver) and not driver.resolved:
+            self.__unresolved_drivers[id(driver)] = driver
+
+    def resolve_inheriting_drivers(self, bases: Optional[Iterable[Driver]] = None) -> None:
+        """Resolve the InheritingDrivers inheriting from `bases`, directly or through other
+        unresolved InheritingDrivers, or every InheritingDriver without `bases`.
+        The drivers inheriting from a driver must be resolved before modifying it."""
+        base_ids = None if bases is None else {id(base) for base in bases}
+
+        for driver_id, driver in list(self.__unresolved_drivers.items()):
+            if base_ids is None or driver.resolved or driver.inherits_from(base_ids):
+                driver.resolve()
+                del self.__unresolved_drivers[driver_id]
+
+    def prepare_merge(self, other: DriverDB) -> None:
+        """Resolve the InheritingDrivers of both DriverDBs inheriting from the drivers
+        that merging `other` into this DriverDB modifies or merges."""
+        colliding_drivers: List[Driver] = []
+        for context in other.contexts:
+            drivers = self.__contexts.get(context, {})
+            for driver in other.get_drivers_in_context(context):
+                if driver.name in drivers:
+                    colliding_drivers.extend((drivers[driver.name], driver))
+
+        if colliding_drivers:
+            self.resolve_inheriting_drivers(colliding_drivers)
+            other.resolve_inheriting_drivers(colliding_drivers)
+
     def get_driver(self, context: str, driver_name: str) -> Driver:
         return self.__contexts[context][driver_name]
 
+    def find_driver_normalized(self, context: str, driver_name: str) -> Optional[Driver]:
+        """Find a driver by its name, treating hyphens and underscores as equal.
+        The driver named exactly `driver_name` is preferred."""
+        drivers = self.__contexts.get(context, {})
+        if driver_name in drivers:
+            return drivers[driver_name]
+
+        normalized_name = normalize_name(driver_name)
+        return next((driver for driver in drivers.values() if normalize_name(driver.name) == normalized_name), None)
+
     def get_drivers_in_context(self, context: str) -> ValuesView[Driver]:
         return self.__contexts[context].values()
 
+    def remove_driver(self, context: str, driver_name: str) -> None:
+        drivers = self.__contexts[context]
+        self.__unresolved_drivers.pop(id(drivers.pop(driver_name)), None)
+
+        if not drivers:
+            self.remove_context(context)
+
     def remove_context(self, context: str) -> None:
-        self.__contexts.pop(context)
+        for driver in self.__contexts.pop(context).values():
+            self.__unresolved_drivers.pop(id(driver), None)
 
     def merge(self, other: DriverDB) -> DriverDB:
+        self.prepare_merge(other)
         for context in other.contexts:
             for driver in other.get_drivers_in_context(context):
                 self.add_driver(driver)
+        for context, plugin_names in other.plugin_names.items():
+            self.add_plugin_names(context, plugin_names)
 
         return self
 
@@ -164,15 +282,60 @@ class DriverDB:
         return diff
 
     @staticmethod
-    def from_dict(as_dict: Dict[str, Any]) -> DriverDB:
-        self = DriverDB()
+    def from_dict(as_dict: Dict[str, Any], lazy: bool = False) -> DriverDB:
+        """With `lazy`, the blocks and options of each driver are built when they are first accessed."""
+        return DriverDB.__from_driver_dicts(
+            (
+                (context_name, driver_name, driver)
+                for context_name, drivers in as_dict["contexts"].items()
+                for driver_name, driver in drivers.items()
+            ),
+            lazy,
+            as_dict.get(DriverDB.PLUGINS_KEY, {}),
+        )
 
-        for _, drivers in as_dict["contexts"].items():
-            for _, driver in drivers.items():
-                self.add_driver(Driver.from_dict(driver))
+    @staticmethod
+    def __from_driver_dicts(
+        driver_dicts: Iterable[DriverDict], lazy: bool, plugin_names: Dict[str, List[str]]
+    ) -> DriverDB:
+        """`plugin_names` is read only after `driver_dicts`, the loaded DB fills it while they are read."""
+        self = DriverDB()
+        inheriting_drivers: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+        for context_name, driver_name, driver in driver_dicts:
+            if "base" in driver:
+                inheriting_drivers[(context_name, driver_name)] = driver
+            else:
+                self.adopt_driver(Driver.from_dict(driver, lazy))
+
+        # The base of an inheriting driver may inherit from another driver, too
+        while inheriting_drivers:
+            resolvable_keys = [
+                key for key, driver in inheriting_drivers.items() if (key[0], driver["base"]) not in inheriting_drivers
+            ]
+            if not resolvable_keys:
+                raise ValueError(f"Inheritance cycle among the drivers: {sorted(inheriting_drivers)}")
+            for context_name, driver_name in resolvable_keys:
+                driver = inheriting_drivers.pop((context_name, driver_name))
+                base = self.get_driver(context_name, driver["base"])
+                self.adopt_driver(InheritingDriver.from_inheritance_dict(driver, base))
+
+        for context_name, names in plugin_names.items():
+            self.add_plugin_names(context_name, names)
 
         return self
 
+    def __driver_to_dict(self, driver: Driver) -> Dict[str, Any]:
+        """A reference to the base driver is enough, if the base is stored too and the driver
+        still matches its inheritance. The driver is encoded the same way whether it is
+        resolved or not, so resolving the InheritingDrivers keeps the dumped bytes."""
+        if isinstance(driver, InheritingDriver):
+            if self.__contexts.get(driver.context, {}).get(driver.base.name) is driver.base:
+                if driver.matches_inheritance():
+                    return driver.to_inheritance_dict()
+
+        return driver.to_dict()
+
     def to_dict(self) -> Dict[str, Any]:
         as_dict: Dict[str, Any] = {"contexts": {}}
 
@@ -180,22 +343,118 @@ class DriverDB:
             context = as_dict["contexts"].setdefault(context_name, {})
 
             for driver_name, driver in drivers.items():
-                context[driver_name] = driver.to_dict()
+                context[driver_name] = self.__driver_to_dict(driver)
+
+        if self.__plugin_names:
+            as_dict[self.PLUGINS_KEY] = self.__canonical_plugin_names()
 
         return as_dict
 
+    def __canonical_plugin_names(self) -> Dict[str, List[str]]:
+        return {context: sorted(plugin_names) for context, plugin_names in self.__plugin_names.items()}
+
+    def to_node_table(self) -> NodeTable:
+        """The drivers flattened into a NodeTable, for scans over the whole DB."""
+        return NodeTable.from_drivers(
+            self.__contexts[context_name][driver_name]
+            for context_name in sorted(self.__contexts)
+            for driver_name in sorted(self.__contexts[context_name])
+        )
+
+    def to_support_index(self) -> SupportIndex:
+        return SupportIndex.from_node_table(self.to_node_table())
+
+    def __iter_canonical_contexts(
+        self, driver_to_dict: Optional[Callable[[Driver], Dict[str, Any]]] = None
+    ) -> Iterator[str]:
+        """The canonical JSON of `self.to_dict()["contexts"]`, building the dict of one driver at a time.
+        The drivers are encoded by `driver_to_dict` instead, if it is given."""
+        driver_to_dict = driver_to_dict or self.__driver_to_dict
+        yield "{"
+        for context_index, context_name in enumerate(sorted(self.__contexts)):
+            drivers = self.__contexts[context_name]
+            yield f'{"," if context_index else ""}{_canonical_json(context_name)}:{{'
+            for driver_index, driver_name in enumerate(sorted(drivers)):
+                yield f'{"," if driver_index else ""}{_canonical_json(driver_name)}:'
+                yield _canonical_json(driver_to_dict(drivers[driver_name]))
+            yield "}"
+        yield "}"
+
+    def content_hash(self) -> str:
+        """The hash of the canonical JSON of the drivers and the plugin names, stored in the header of the dumped DB.
+
+        The InheritingDrivers are hashed with their inherited options and blocks, like the plain drivers.
+        Their reference to the base driver is a detail of dump(), so equal DBs have the same hash,
+        whether their drivers are read from the JSON or the SQLite DB, or built from plain drivers."""
+        content_hash = hashlib.sha256()
+        for chunk in self.__iter_canonical_contexts(to_resolved_dict):
+            content_hash.update(chunk.encode("utf-8"))
+        if self.__plugin_names:
+            content_hash.update(_canonical_json(self.__canonical_plugin_names()).encode("utf-8"))
+
+        return f"sha256:{content_hash.hexdigest()}"
+
     @staticmethod
-    def load(file: IO) -> DriverDB:
-        return DriverDB.from_dict(json.load(file))
+    def read_content_hash(file: IO) -> Optional[str]:
+        """The content hash of a dumped DB, reading its header only. None if the DB was dumped without it."""
+        prefix = f'{{"{DriverDB.CONTENT_HASH_KEY}":'
+        header = file.read(len(prefix) + 128)
+        if not header.startswith(prefix):
+            return None
+
+        try:
+            content_hash, _ = json.JSONDecoder().raw_decode(header, len(prefix))
+        except ValueError:
+            return None
 
-    def dump(self, file: IO) -> None:
-        json.dump(self.to_dict(), file)
+        return content_hash if isinstance(content_hash, str) else None
+
+    @staticmethod
+    def read_support_index(file: IO) -> Optional[SupportIndex]:
+        """The SupportIndex of a dumped DB, reading its header only. None if the DB was dumped without it."""
+        reader = JSONStreamReader(file)
+        for key in reader.read_members():
+            if key == DriverDB.SUPPORT_INDEX_KEY:
+                return SupportIndex.from_dict(reader.read_value())
+            if key == "contexts":
+                break  # the header is written before the drivers
+            reader.read_value()
+
+        return None
+
+    @staticmethod
+    def load(file: IO, lazy: bool = False) -> DriverDB:
+        """Read the DB dumped by dump(). The file is read in chunks, and decoded one driver
+        at a time, so the whole file and the dict of the whole DB are never held at once.
+        With `lazy`, the blocks and options of each driver are built when they are first accessed."""
+        plugin_names: Dict[str, List[str]] = {}
+        return DriverDB.__from_driver_dicts(_iter_driver_dicts(file, plugin_names), lazy, plugin_names)
+
+    def dump(self, file: IO, content_hash: Optional[str] = None, support_index: Optional[SupportIndex] = None) -> None:
+        """Write the DB in its canonical encoding: the header, then the drivers, with sorted
+        keys and params, and without whitespace. The same DB is always written as the same bytes:
+
+            {"content-hash":"sha256:...","support-index":{...},"contexts":{...},"plugins":{...}}
+
+        The dict of one driver is built at a time, instead of the dict of the whole DB.
+        `content_hash` is the result of content_hash(), if it is already computed.
+        The header holds `support_index` only if it is given, it is read without reading the drivers.
+        """
+        file.write(f'{{"{self.CONTENT_HASH_KEY}":{_canonical_json(content_hash or self.content_hash())},')
+        if support_index is not None:
+            file.write(f'"{self.SUPPORT_INDEX_KEY}":{_canonical_json(support_index.to_dict())},')
+        file.write('"contexts":')
+        for chunk in self.__iter_canonical_contexts():
+            file.write(chunk)
+        if self.__plugin_names:
+            file.write(f',"{self.PLUGINS_KEY}":{_canonical_json(self.__canonical_plugin_names())}')
+        file.write("}")
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, DriverDB):
             return False
 
-        return self.__contexts == other.__contexts
+        return self.__contexts == other.__contexts and self.__plugin_names == other.__plugin_names
 
     def __repr__(self) -> str:
         return f"DriverDB({repr(self.__contexts)})"
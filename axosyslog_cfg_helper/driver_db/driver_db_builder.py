@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from .driver import Driver
+from .driver_db import DriverDB
+from .exceptions import BuilderFinishedException
+
+
+class DriverDBBuilder:
+    """Builds a DriverDB from drivers and other DriverDBs, taking ownership of them.
+
+    Unlike DriverDB.add_driver() and DriverDB.merge(), nothing is copied: the first
+    driver, block and option of each name is kept, and the later ones are merged into
+    it in place. Whatever is added must not be used afterwards.
+    """
+
+    def __init__(self) -> None:
+        self.__driver_db: Optional[DriverDB] = DriverDB()
+
+    @property
+    def driver_db(self) -> DriverDB:
+        """The DriverDB being built, for in place modifications."""
+        if self.__driver_db is None:
+            raise BuilderFinishedException("The DriverDB is already finished")
+
+        return self.__driver_db
+
+    def add_driver(self, driver: Driver) -> DriverDBBuilder:
+        self.driver_db.adopt_driver(driver)
+
+        return self
+
+    def merge(self, other: DriverDB) -> DriverDBBuilder:
+        self.driver_db.prepare_merge(other)
+        for context in other.contexts:
+            for driver in other.get_drivers_in_context(context):
+                self.driver_db.adopt_driver(driver)
+        for context, plugin_names in other.plugin_names.items():
+            self.driver_db.add_plugin_names(context, plugin_names)
+
+        return self
+
+    def finish(self) -> DriverDB:
+        """Hand over the DriverDB built. The builder cannot be used afterwards."""
+        driver_db = self.driver_db
+        self.__driver_db = None
+
+        return driver_db
@@ -4,3 +4,7 @@ class MergeException(Exception):
 
 class DiffException(Exception):
     pass
+
+
+class BuilderFinishedException(Exception):
+    pass
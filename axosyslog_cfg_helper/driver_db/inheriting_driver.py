@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .block import Block
+from .driver import Driver
+from .option import Option
+from .utils import normalize_name
+
+
+def walk_path(base: Block, path: List[str]) -> Optional[object]:
+    """Walk `path` inside `base`. Each segment is matched against sub-blocks
+    first, then options. Returns the leaf Block or Option, or None if the
+    path cannot be fully resolved.
+    """
+    node: Block = base
+    for idx, seg in enumerate(path):
+        nb = node.find_block_normalized(seg)
+        if nb is not None:
+            node = nb
+            if idx == len(path) - 1:
+                return nb
+            continue
+        no = node.find_option_normalized(seg)
+        if no is not None:
+            if idx == len(path) - 1:
+                return no
+            return None  # options cannot have sub-things
+        return None
+    return node
+
+
+def _inflate_option(driver: Driver, option_name: str, leaf: object) -> None:
+    """Replace the `option_name` option with content derived from `leaf`."""
+    if isinstance(leaf, Block):
+        try:
+            driver.remove_option(option_name)
+        except KeyError:
+            pass
+        new_block = Block(option_name)
+        for o in leaf.options:
+            new_block.add_option(o.copy())
+        for b in leaf.blocks:
+            new_block.add_block(b.copy())
+        driver.add_block(new_block)
+    elif isinstance(leaf, Option):
+        try:
+            driver.remove_option(option_name)
+        except KeyError:
+            pass
+        driver.add_option(Option(name=option_name, params=set(leaf.params)))
+
+
+def to_resolved_dict(driver: Driver) -> Dict[str, Any]:
+    """The to_dict() of the driver with its inherited options and blocks, without resolving
+    an InheritingDriver: only its copy is resolved, the driver keeps referencing its base."""
+    if isinstance(driver, InheritingDriver) and not driver.resolved:
+        return driver.copy().to_dict()
+
+    return driver.to_dict()
+
+
+class InheritingDriver(Driver):
+    """A driver inheriting the options and blocks of its base driver, like an SCL block
+    passing `__VARARGS__` to the driver it wraps. Its options are:
+      - the declared options, taking any value (`<empty>`),
+      - the options and blocks of the base driver, except the `excluded_names`,
+      - the declared options in `inflated_paths` replaced by the option or block
+        found at their path in the base driver.
+
+    Nothing is copied from the base driver until the options or blocks are accessed,
+    so a driver that is only stored never holds a copy of its base. The base driver must
+    not be modified until then, DriverDB resolves its inheriting drivers before modifying
+    their bases.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        context: str,
+        name: str,
+        base: Driver,
+        declared_names: Iterable[str] = (),
+        excluded_names: Iterable[str] = (),
+        inflated_paths: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        super().__init__(context, name)
+        self.__base = base
+        self.__declared_names = list(declared_names)
+        self.__excluded_names = {normalize_name(excluded_name) for excluded_name in excluded_names}
+        self.__inflated_paths = dict(inflated_paths or {})
+        self.__resolved = False
+
+    @property
+    def base(self) -> Driver:
+        return self.__base
+
+    @property
+    def resolved(self) -> bool:
+        return self.__resolved
+
+    def inherits_from(self, driver_ids: Set[int]) -> bool:
+        """Whether the base driver, or the base of an unresolved base driver, is in `driver_ids`."""
+        base: Driver = self
+        while isinstance(base, InheritingDriver) and not base.resolved:
+            base = base.base
+            if id(base) in driver_ids:
+                return True
+        return False
+
+    def resolve(self) -> None:
+        """Copy the options and blocks of the base driver, if not copied yet."""
+        if self.__resolved:
+            return
+
+        self.__resolved = True
+        for declared_name in self.__declared_names:
+            self.add_option(Option(name=declared_name, params={("<empty>",)}))
+        for option in self.__base.options:
+            if option.name is not None and normalize_name(option.name) in self.__excluded_names:
+                continue
+            self.add_option(option)
+        for block in self.__base.blocks:
+            if normalize_name(block.name) in self.__excluded_names:
+                continue
+            self.add_block(block)
+        for option_name, path in self.__inflated_paths.items():
+            leaf = walk_path(self.__base, path)
+            if leaf is not None:
+                _inflate_option(self, option_name, leaf)
+
+    def _materialize(self) -> None:
+        self.resolve()
+        super()._materialize()
+
+    @property
+    def materialized(self) -> bool:
+        return self.__resolved and super().materialized
+
+    def __inherit(self) -> InheritingDriver:
+        return InheritingDriver(
+            self.context,
+            self.name,
+            self.__base,
+            self.__declared_names,
+            self.__excluded_names,
+            self.__inflated_paths,
+        )
+
+    def matches_inheritance(self) -> bool:
+        """Whether the options and blocks are the ones resolve() copies from the base driver,
+        so to_inheritance_dict() describes the driver. A resolved driver may have been modified."""
+        return not self.__resolved or self == self.__inherit()
+
+    def copy(self) -> Driver:
+        """The copy keeps inheriting from the same base driver. The options and blocks
+        of a resolved driver are copied, as they may have been modified."""
+        copied = self.__inherit()
+        if self.__resolved:
+            copied.__resolved = True  # pylint: disable=unused-private-member
+            copied.merge(self)
+
+        return copied
+
+    @staticmethod
+    def from_inheritance_dict(as_dict: Dict[str, Any], base: Driver) -> InheritingDriver:
+        return InheritingDriver(
+            as_dict["context"], as_dict["name"], base, as_dict["declared"], as_dict["excluded"], as_dict["inflated"]
+        )
+
+    def to_inheritance_dict(self) -> Dict[str, Any]:
+        """The driver as a reference to its base driver, instead of the copied options and blocks."""
+        return {
+            "name": self.name,
+            "context": self.context,
+            "base": self.__base.name,
+            "declared": sorted(self.__declared_names),
+            "excluded": sorted(self.__excluded_names),
+            "inflated": dict(self.__inflated_paths),
+        }
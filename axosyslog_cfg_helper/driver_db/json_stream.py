@@ -0,0 +1,94 @@
+import json
+
+from typing import Any, IO, Iterator
+
+_WHITESPACE = " \t\n\r"
+
+
+class JSONStreamReader:
+    """Reads a JSON document from a file in chunks, one value or object member at a time,
+    instead of reading and decoding the whole file at once, like json.load() does.
+
+        reader = JSONStreamReader(file)
+        for key in reader.read_members():
+            value = reader.read_value()
+    """
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, file: IO) -> None:
+        self.__file = file
+        self.__buffer = ""
+        self.__position = 0
+        self.__decoder = json.JSONDecoder()
+
+    def __fill(self, size: int) -> bool:
+        chunk = self.__file.read(size)
+        if not chunk:
+            return False
+
+        self.__buffer = self.__buffer[self.__position :] + chunk
+        self.__position = 0
+        return True
+
+    def __peek_char(self) -> str:
+        """The next non-whitespace character, or "" at the end of the file."""
+        while True:
+            while self.__position < len(self.__buffer) and self.__buffer[self.__position] in _WHITESPACE:
+                self.__position += 1
+            if self.__position < len(self.__buffer):
+                return self.__buffer[self.__position]
+            if not self.__fill(self.CHUNK_SIZE):
+                return ""
+
+    def __read_char(self, expected: str) -> str:
+        char = self.__peek_char()
+        if not char or char not in expected:
+            raise ValueError(f"Expected one of {expected!r} at offset {self.__position}, got {char!r}")
+
+        self.__position += 1
+        return char
+
+    def read_value(self) -> Any:
+        self.__peek_char()
+        read_size = self.CHUNK_SIZE
+
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer, self.__position)
+            except json.JSONDecodeError:
+                # The value may continue in the next chunk, larger chunks are read for large values
+                if not self.__fill(read_size):
+                    raise
+                read_size *= 2
+                continue
+
+            # A number may continue in the next chunk, too
+            if end == len(self.__buffer) and isinstance(value, (int, float)) and self.__fill(read_size):
+                continue
+
+            self.__position = end
+            return value
+
+    def read_members(self) -> Iterator[str]:
+        """Read an object, yielding the key of each member. The value of a member must be read before the next key."""
+        self.__read_char("{")
+        if self.__peek_char() == "}":
+            self.__position += 1
+            return
+
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise ValueError(f"Expected an object key, got {key!r}")
+            self.__read_char(":")
+
+            yield key
+
+            if self.__read_char(",}") == "}":
+                return
+
+    def read_end(self) -> None:
+        char = self.__peek_char()
+        if char:
+            raise ValueError(f"Extra data at offset {self.__position}: {char!r}")
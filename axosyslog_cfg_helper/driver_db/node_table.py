@@ -0,0 +1,255 @@
+"""The drivers of a DriverDB flattened into a table of nodes, one row per driver, block and option.
+
+Each column is an array of the same length, so a question about the whole DB is a scan over
+a few flat arrays, instead of a recursive walk over the Block and Option objects. The nodes
+are in depth-first order, so the nodes of a driver or block are the rows between the row of
+the driver or block and its `subtree_ends` value.
+
+Names and params are stored as symbols, indexes of `NodeTable.symbols` and `NodeTable.params`.
+The params of an option are the `params_symbols` between its `params_starts` and `params_ends`.
+
+The scans run on NumPy views of the columns when NumPy is installed, and loop over the columns otherwise.
+"""
+
+from __future__ import annotations
+
+import importlib
+
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .block import Block
+from .driver import Driver
+from .inheriting_driver import InheritingDriver
+from .option import Params
+from .utils import normalize_name
+
+KIND_DRIVER = 0
+KIND_BLOCK = 1
+KIND_OPTION = 2
+
+# The symbol of the name of the positional options
+NO_SYMBOL = -1
+# The parent of the drivers
+NO_NODE = -1
+
+
+def _import_numpy() -> Optional[ModuleType]:
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:
+        return None
+
+
+@dataclass
+class NodeTable:  # pylint: disable=too-many-instance-attributes
+    node_ids: array = field(default_factory=lambda: array("q"))
+    parent_ids: array = field(default_factory=lambda: array("q"))
+    driver_ids: array = field(default_factory=lambda: array("q"))
+    subtree_ends: array = field(default_factory=lambda: array("q"))
+    kinds: array = field(default_factory=lambda: array("b"))
+    context_symbols: array = field(default_factory=lambda: array("q"))
+    name_symbols: array = field(default_factory=lambda: array("q"))
+    params_starts: array = field(default_factory=lambda: array("q"))
+    params_ends: array = field(default_factory=lambda: array("q"))
+    params_symbols: array = field(default_factory=lambda: array("q"))
+
+    symbols: List[str] = field(default_factory=list)
+    params: List[Params] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.__symbol_ids = {symbol: symbol_id for symbol_id, symbol in enumerate(self.symbols)}
+        self.__params_ids = {params: params_id for params_id, params in enumerate(self.params)}
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def get_symbol(self, name: str) -> int:
+        """The symbol of `name`, or NO_SYMBOL if no node is named `name`."""
+        return self.__symbol_ids.get(name, NO_SYMBOL)
+
+    def __intern(self, name: Optional[str]) -> int:
+        if name is None:
+            return NO_SYMBOL
+
+        symbol_id = self.__symbol_ids.get(name)
+        if symbol_id is None:
+            symbol_id = self.__symbol_ids[name] = len(self.symbols)
+            self.symbols.append(name)
+        return symbol_id
+
+    def __intern_params(self, params: Params) -> int:
+        params_id = self.__params_ids.get(params)
+        if params_id is None:
+            params_id = self.__params_ids[params] = len(self.params)
+            self.params.append(params)
+        return params_id
+
+    def __add_node(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self, parent_id: int, driver_id: int, kind: int, context_symbol: int, name: Optional[str]
+    ) -> int:
+        node_id = len(self.node_ids)
+        self.node_ids.append(node_id)
+        self.parent_ids.append(parent_id)
+        self.driver_ids.append(node_id if kind == KIND_DRIVER else driver_id)
+        self.subtree_ends.append(node_id + 1)
+        self.kinds.append(kind)
+        self.context_symbols.append(context_symbol)
+        self.name_symbols.append(self.__intern(name))
+        self.params_starts.append(len(self.params_symbols))
+        self.params_ends.append(len(self.params_symbols))
+
+        return node_id
+
+    def __add_block_contents(self, block: Block, node_id: int, driver_id: int, context_symbol: int) -> None:
+        for option in sorted(block.options, key=lambda option: option.name or ""):
+            option_id = self.__add_node(node_id, driver_id, KIND_OPTION, context_symbol, option.name)
+            self.params_symbols.extend(self.__intern_params(params) for params in sorted(option.params))
+            self.params_ends[option_id] = len(self.params_symbols)
+
+        for inner_block in sorted(block.blocks, key=lambda inner_block: inner_block.name):
+            block_id = self.__add_node(node_id, driver_id, KIND_BLOCK, context_symbol, inner_block.name)
+            self.__add_block_contents(inner_block, block_id, driver_id, context_symbol)
+
+        self.subtree_ends[node_id] = len(self.node_ids)
+
+    def add_driver(self, driver: Driver) -> None:
+        if isinstance(driver, InheritingDriver) and not driver.resolved:
+            # Only the copy is resolved, the driver itself keeps referencing its base
+            driver = driver.copy()
+
+        context_symbol = self.__intern(driver.context)
+        driver_id = self.__add_node(NO_NODE, NO_NODE, KIND_DRIVER, context_symbol, driver.name)
+        self.__add_block_contents(driver, driver_id, driver_id, context_symbol)
+
+    @staticmethod
+    def from_drivers(drivers: Iterable[Driver]) -> NodeTable:
+        node_table = NodeTable()
+        for driver in drivers:
+            node_table.add_driver(driver)
+
+        return node_table
+
+    def get_name(self, node_id: int) -> Optional[str]:
+        symbol = self.name_symbols[node_id]
+        return None if symbol == NO_SYMBOL else self.symbols[symbol]
+
+    def get_driver_key(self, node_id: int) -> Tuple[str, str]:
+        """The (context, name) of the driver of a node."""
+        driver_id = self.driver_ids[node_id]
+        return self.symbols[self.context_symbols[driver_id]], self.symbols[self.name_symbols[driver_id]]
+
+    def get_path(self, node_id: int) -> List[Optional[str]]:
+        """The names of the blocks leading to a node in its driver, and its name, like ["tls", "ca-file"]."""
+        path = []
+        while self.kinds[node_id] != KIND_DRIVER:
+            path.append(self.get_name(node_id))
+            node_id = self.parent_ids[node_id]
+
+        return path[::-1]
+
+    def get_params(self, node_id: int) -> List[Params]:
+        return [
+            self.params[params_id]
+            for params_id in self.params_symbols[self.params_starts[node_id] : self.params_ends[node_id]]
+        ]
+
+    def select(
+        self, kind: Optional[int] = None, name: Optional[str] = None, context: Optional[str] = None
+    ) -> List[int]:
+        """The ids of the nodes of `kind`, named `name`, in the drivers of `context`. Names are compared normalized."""
+        symbols: Optional[Set[int]] = None
+        if name is not None:
+            normalized_name = normalize_name(name)
+            symbols = {
+                symbol_id for symbol_id, symbol in enumerate(self.symbols) if normalize_name(symbol) == normalized_name
+            }
+        context_symbol = None if context is None else self.get_symbol(context)
+
+        numpy = _import_numpy()
+        if numpy is not None:
+            columns = self.to_numpy()
+            selected = numpy.ones(len(self), dtype=bool)
+            if kind is not None:
+                selected &= columns["kinds"] == kind
+            if symbols is not None:
+                selected &= numpy.isin(columns["name_symbols"], numpy.fromiter(symbols, dtype="q"))
+            if context_symbol is not None:
+                selected &= columns["context_symbols"] == context_symbol
+            return columns["node_ids"][selected].tolist()
+
+        return [
+            node_id
+            for node_id, node_kind, name_symbol, node_context_symbol in zip(
+                self.node_ids, self.kinds, self.name_symbols, self.context_symbols
+            )
+            if (kind is None or node_kind == kind)
+            and (symbols is None or name_symbol in symbols)
+            and (context_symbol is None or node_context_symbol == context_symbol)
+        ]
+
+    def get_option_coverage(self, context: Optional[str] = None) -> Counter:
+        """The number of drivers supporting each option name, at any depth of the drivers."""
+        context_symbol = None if context is None else self.get_symbol(context)
+
+        numpy = _import_numpy()
+        if numpy is not None:
+            columns = self.to_numpy()
+            selected = (columns["kinds"] == KIND_OPTION) & (columns["name_symbols"] != NO_SYMBOL)
+            if context_symbol is not None:
+                selected &= columns["context_symbols"] == context_symbol
+            # Each (driver, name) pair as one number, so the pairs are made unique in one pass
+            symbol_count = max(len(self.symbols), 1)
+            driver_options = numpy.unique(
+                columns["driver_ids"][selected] * symbol_count + columns["name_symbols"][selected]
+            )
+            name_symbols, counts = numpy.unique(driver_options % symbol_count, return_counts=True)
+            return Counter(
+                {self.symbols[name_symbol]: count for name_symbol, count in zip(name_symbols.tolist(), counts.tolist())}
+            )
+
+        driver_options = {
+            (driver_id, name_symbol)
+            for driver_id, kind, name_symbol, node_context_symbol in zip(
+                self.driver_ids, self.kinds, self.name_symbols, self.context_symbols
+            )
+            if kind == KIND_OPTION
+            and name_symbol != NO_SYMBOL
+            and (context_symbol is None or node_context_symbol == context_symbol)
+        }
+
+        return Counter(self.symbols[name_symbol] for _, name_symbol in driver_options)
+
+    def get_params_usage(self) -> Counter:
+        """The number of options accepting each params, like ("<string>",)."""
+        numpy = _import_numpy()
+        if numpy is not None:
+            params_ids, counts = numpy.unique(self.to_numpy()["params_symbols"], return_counts=True)
+            return Counter(
+                {self.params[params_id]: count for params_id, count in zip(params_ids.tolist(), counts.tolist())}
+            )
+
+        return Counter(self.params[params_id] for params_id in self.params_symbols)
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """NumPy views of the columns, without copying them. Needs NumPy, which is not a dependency."""
+        numpy = importlib.import_module("numpy")
+
+        return {
+            column_name: numpy.frombuffer(getattr(self, column_name), dtype=getattr(self, column_name).typecode)
+            for column_name in (
+                "node_ids",
+                "parent_ids",
+                "driver_ids",
+                "subtree_ends",
+                "kinds",
+                "context_symbols",
+                "name_symbols",
+                "params_starts",
+                "params_ends",
+                "params_symbols",
+            )
+        }
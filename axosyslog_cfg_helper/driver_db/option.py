@@ -99,7 +99,7 @@ class Option:
         return Option(as_dict["name"], as_dict["params"])
 
     def to_dict(self) -> Dict[str, Any]:
-        return {"name": self.__name, "params": tuple(self.__params)}
+        return {"name": self.__name, "params": tuple(sorted(self.__params))}
 
     def __repr__(self) -> str:
         return f"Option({repr(self.name)}, {repr(self.params)})"
@@ -0,0 +1,252 @@
+"""The database stored in an SQLite file, see build_db.py --format=sqlite.
+
+The tables mirror the structure of DriverDB.to_dict(). Every block and option has a parent
+link, and a link to its driver, so a driver is fetched with a few indexed queries:
+
+    contexts(id, name)
+    drivers(id, context_id, name, normalized_name)
+    blocks(id, driver_id, parent_id, name, normalized_name)   parent_id is NULL at the top level of the driver
+    options(id, driver_id, block_id, name, normalized_name)   block_id is NULL at the top level of the driver
+    params(option_id, params)                                 params is a JSON array, like ["<string>", "<number>"]
+    meta(key, value)                                          the content hash, the SupportIndex and the plugin names
+
+For example, the drivers supporting a `tls()` block:
+
+    SELECT contexts.name, drivers.name FROM blocks
+    JOIN drivers ON drivers.id = blocks.driver_id JOIN contexts ON contexts.id = drivers.context_id
+    WHERE blocks.parent_id IS NULL AND blocks.normalized_name = 'tls'
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, KeysView, List, Optional, Tuple
+
+from .driver import Driver
+from .driver_db import DriverDB
+from .inheriting_driver import to_resolved_dict
+from .support_index import SupportIndex
+from .utils import normalize_name
+
+SQLITE_MAGIC_BYTES = b"SQLite format 3\x00"
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE contexts (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE drivers (
+    id INTEGER PRIMARY KEY,
+    context_id INTEGER NOT NULL REFERENCES contexts (id),
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    UNIQUE (context_id, name)
+);
+CREATE TABLE blocks (
+    id INTEGER PRIMARY KEY,
+    driver_id INTEGER NOT NULL REFERENCES drivers (id),
+    parent_id INTEGER REFERENCES blocks (id),
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL
+);
+CREATE TABLE options (
+    id INTEGER PRIMARY KEY,
+    driver_id INTEGER NOT NULL REFERENCES drivers (id),
+    block_id INTEGER REFERENCES blocks (id),
+    name TEXT,
+    normalized_name TEXT
+);
+CREATE TABLE params (option_id INTEGER NOT NULL REFERENCES options (id), params TEXT NOT NULL);
+
+CREATE INDEX drivers_normalized_name ON drivers (context_id, normalized_name);
+CREATE INDEX blocks_driver_id ON blocks (driver_id);
+CREATE INDEX blocks_parent_id ON blocks (parent_id);
+CREATE INDEX blocks_normalized_name ON blocks (normalized_name);
+CREATE INDEX options_driver_id ON options (driver_id);
+CREATE INDEX options_block_id ON options (block_id);
+CREATE INDEX options_normalized_name ON options (normalized_name);
+CREATE INDEX params_option_id ON params (option_id);
+"""
+
+
+def is_sqlite_db(path: Path) -> bool:
+    with path.open("rb") as file:
+        return file.read(len(SQLITE_MAGIC_BYTES)) == SQLITE_MAGIC_BYTES
+
+
+class _Writer:
+    """Inserts the blocks, options and params of the drivers in batches."""
+
+    BATCH_SIZE = 10000
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.__connection = connection
+        self.__block_count = 0
+        self.__option_count = 0
+        self.__blocks: List[Tuple[int, int, Optional[int], str, str]] = []
+        self.__options: List[Tuple[int, int, Optional[int], Optional[str], Optional[str]]] = []
+        self.__params: List[Tuple[int, str]] = []
+
+    def add_block_contents(self, driver_id: int, block_id: Optional[int], as_dict: Dict[str, Any]) -> None:
+        """Add the blocks and options of a block, or of a driver without `block_id`, from its to_dict()."""
+        for block in as_dict["blocks"].values():
+            self.__block_count += 1
+            child_block_id = self.__block_count
+            self.__blocks.append((child_block_id, driver_id, block_id, block["name"], normalize_name(block["name"])))
+            self.add_block_contents(driver_id, child_block_id, block)
+
+        for option in as_dict["options"].values():
+            self.__option_count += 1
+            name = option["name"]
+            normalized_name = None if name is None else normalize_name(name)
+            self.__options.append((self.__option_count, driver_id, block_id, name, normalized_name))
+            self.__params.extend((self.__option_count, json.dumps(list(params))) for params in option["params"])
+
+        if len(self.__params) >= self.BATCH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        self.__connection.executemany("INSERT INTO blocks VALUES (?, ?, ?, ?, ?)", self.__blocks)
+        self.__connection.executemany("INSERT INTO options VALUES (?, ?, ?, ?, ?)", self.__options)
+        self.__connection.executemany("INSERT INTO params VALUES (?, ?)", self.__params)
+        self.__blocks.clear()
+        self.__options.clear()
+        self.__params.clear()
+
+
+def dump_sqlite_db(
+    driver_db: DriverDB, path: Path, content_hash: Optional[str] = None, support_index: Optional[SupportIndex] = None
+) -> None:
+    """Write `driver_db` to a new SQLite file at `path`. `content_hash` is the result of
+    `driver_db.content_hash()`, if it is already computed. `support_index` is stored in the meta table."""
+    with closing(sqlite3.connect(path)) as connection:
+        connection.executescript(_SCHEMA)
+        connection.execute(
+            "INSERT INTO meta VALUES (?, ?)", (DriverDB.CONTENT_HASH_KEY, content_hash or driver_db.content_hash())
+        )
+        if support_index is not None:
+            connection.execute(
+                "INSERT INTO meta VALUES (?, ?)",
+                (
+                    DriverDB.SUPPORT_INDEX_KEY,
+                    json.dumps(support_index.to_dict(), sort_keys=True, separators=(",", ":")),
+                ),
+            )
+        if driver_db.plugin_names:
+            plugin_names = {context: sorted(names) for context, names in driver_db.plugin_names.items()}
+            connection.execute(
+                "INSERT INTO meta VALUES (?, ?)", (DriverDB.PLUGINS_KEY, json.dumps(plugin_names, sort_keys=True))
+            )
+
+        writer = _Writer(connection)
+        driver_id = 0
+        for context_id, context_name in enumerate(sorted(driver_db.contexts), start=1):
+            connection.execute("INSERT INTO contexts VALUES (?, ?)", (context_id, context_name))
+            for driver in sorted(driver_db.get_drivers_in_context(context_name), key=lambda driver: driver.name):
+                driver_id += 1
+                connection.execute(
+                    "INSERT INTO drivers VALUES (?, ?, ?, ?)",
+                    (driver_id, context_id, driver.name, normalize_name(driver.name)),
+                )
+                writer.add_block_contents(driver_id, None, to_resolved_dict(driver))
+        writer.flush()
+        connection.commit()
+
+
+class SQLiteDriverDB:
+    """The read-only queries of DriverDB, over an SQLite file written by dump_sqlite_db().
+    Only the drivers a query returns are read from the file."""
+
+    def __init__(self, path: Path) -> None:
+        self.__connection = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+        self.__context_ids: Dict[str, int] = dict(self.__connection.execute("SELECT name, id FROM contexts"))
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    @property
+    def contexts(self) -> KeysView[str]:
+        return self.__context_ids.keys()
+
+    def __get_meta(self, key: str) -> Optional[str]:
+        row = self.__connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def content_hash(self) -> Optional[str]:
+        return self.__get_meta(DriverDB.CONTENT_HASH_KEY)
+
+    def get_support_index(self) -> Optional[SupportIndex]:
+        support_index = self.__get_meta(DriverDB.SUPPORT_INDEX_KEY)
+        return None if support_index is None else SupportIndex.from_dict(json.loads(support_index))
+
+    def __fetch_drivers(  # pylint: disable=too-many-locals
+        self, driver_condition: str, arguments: Tuple[Any, ...]
+    ) -> List[Driver]:
+        """The drivers matching `driver_condition`, a condition on the columns of the drivers table."""
+        driver_ids = f"SELECT id FROM drivers WHERE {driver_condition}"
+        context_names = {context_id: context_name for context_name, context_id in self.__context_ids.items()}
+
+        driver_dicts: Dict[int, Dict[str, Any]] = {}
+        for driver_id, context_id, name in self.__connection.execute(
+            f"SELECT id, context_id, name FROM drivers WHERE {driver_condition} ORDER BY id", arguments
+        ):
+            driver_dicts[driver_id] = {"name": name, "context": context_names[context_id], "blocks": {}, "options": {}}
+
+        # The blocks are inserted after their parents, so the parents are always built first
+        block_dicts: Dict[int, Dict[str, Any]] = {}
+        for block_id, driver_id, parent_id, name in self.__connection.execute(
+            f"SELECT id, driver_id, parent_id, name FROM blocks WHERE driver_id IN ({driver_ids}) ORDER BY id",
+            arguments,
+        ):
+            parent = driver_dicts[driver_id] if parent_id is None else block_dicts[parent_id]
+            block_dicts[block_id] = parent["blocks"][name] = {"name": name, "blocks": {}, "options": {}}
+
+        option_dicts: Dict[int, Dict[str, Any]] = {}
+        for option_id, driver_id, block_id, name in self.__connection.execute(
+            f"SELECT id, driver_id, block_id, name FROM options WHERE driver_id IN ({driver_ids}) ORDER BY id",
+            arguments,
+        ):
+            parent = driver_dicts[driver_id] if block_id is None else block_dicts[block_id]
+            option_dicts[option_id] = parent["options"][name or ""] = {"name": name, "params": []}
+
+        for option_id, params in self.__connection.execute(
+            "SELECT option_id, params FROM params WHERE option_id IN "
+            f"(SELECT id FROM options WHERE driver_id IN ({driver_ids}))",
+            arguments,
+        ):
+            option_dicts[option_id]["params"].append(tuple(json.loads(params)))
+
+        return [Driver.from_dict(driver_dict) for driver_dict in driver_dicts.values()]
+
+    def get_driver(self, context: str, driver_name: str) -> Driver:
+        drivers = self.__fetch_drivers("context_id = ? AND name = ?", (self.__context_ids.get(context), driver_name))
+        if not drivers:
+            raise KeyError(driver_name)
+
+        return drivers[0]
+
+    def find_driver_normalized(self, context: str, driver_name: str) -> Optional[Driver]:
+        """Find a driver by its name, treating hyphens and underscores as equal.
+        The driver named exactly `driver_name` is preferred."""
+        drivers = self.__fetch_drivers(
+            "context_id = ? AND normalized_name = ?", (self.__context_ids.get(context), normalize_name(driver_name))
+        )
+        return next((driver for driver in drivers if driver.name == driver_name), drivers[0] if drivers else None)
+
+    def get_drivers_in_context(self, context: str) -> List[Driver]:
+        if context not in self.__context_ids:
+            raise KeyError(context)
+
+        return self.__fetch_drivers("context_id = ?", (self.__context_ids[context],))
+
+    def to_driver_db(self) -> DriverDB:
+        """Read every driver into a DriverDB."""
+        driver_db = DriverDB()
+        for driver in self.__fetch_drivers("1", ()):
+            driver_db.adopt_driver(driver)
+        for context, plugin_names in json.loads(self.__get_meta(DriverDB.PLUGINS_KEY) or "{}").items():
+            driver_db.add_plugin_names(context, plugin_names)
+
+        return driver_db
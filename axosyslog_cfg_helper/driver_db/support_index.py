@@ -0,0 +1,137 @@
+"""The drivers supporting each option, as bitsets, for set queries over the drivers.
+
+Every option and block of the drivers is identified by its path, the normalized names of
+the blocks leading to it and its own, like `tls/ca-file`. Bit `i` of the bitset of a path
+is set if the driver `drivers[i]` supports the path, so the drivers supporting several
+options are the AND of their bitsets. The reverse mapping, the paths supported by each
+driver, is a bitset over `paths`, so the options shared by several drivers are an AND, too.
+
+The index is built by build_db.py, and stored in the header of the database, see DriverDB.dump().
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .node_table import KIND_DRIVER, NO_SYMBOL, NodeTable
+from .utils import normalize_name
+
+DriverKey = Tuple[str, str]
+
+
+def _to_bitset(bit_ids: Iterable[int], size: int) -> int:
+    bits = bytearray((size + 7) // 8)
+    for bit_id in bit_ids:
+        bits[bit_id >> 3] |= 1 << (bit_id & 7)
+
+    return int.from_bytes(bits, "little")
+
+
+def _iter_bits(bitset: int) -> Iterable[int]:
+    while bitset:
+        lowest_bit = bitset & -bitset
+        yield lowest_bit.bit_length() - 1
+        bitset ^= lowest_bit
+
+
+class SupportIndex:
+    def __init__(self, drivers: List[DriverKey], driver_bitsets: Dict[str, int], path_bitsets: List[int]) -> None:
+        """`driver_bitsets` are the bitsets of the drivers supporting each path,
+        `path_bitsets` are the bitsets of the sorted paths supported by each driver."""
+        self.__drivers = drivers
+        self.__driver_ids = {driver: driver_id for driver_id, driver in enumerate(drivers)}
+        self.__driver_bitsets = driver_bitsets
+        self.__paths = sorted(driver_bitsets)
+        self.__path_bitsets = path_bitsets
+
+    @property
+    def drivers(self) -> List[DriverKey]:
+        return self.__drivers
+
+    @property
+    def paths(self) -> List[str]:
+        return self.__paths
+
+    @staticmethod
+    def normalize_path(path: str) -> str:
+        return "/".join(normalize_name(name) for name in path.split("/"))
+
+    def get_drivers_supporting(self, paths: Iterable[str], context: Optional[str] = None) -> List[DriverKey]:
+        """The (context, name) of the drivers supporting every path of `paths`. None without `paths`."""
+        paths = list(paths)
+        if not paths:
+            return []
+
+        bitset = (1 << len(self.__drivers)) - 1
+        for path in paths:
+            bitset &= self.__driver_bitsets.get(self.normalize_path(path), 0)
+
+        drivers = [self.__drivers[driver_id] for driver_id in _iter_bits(bitset)]
+        return [driver for driver in drivers if context is None or driver[0] == context]
+
+    def get_shared_paths(self, drivers: Iterable[DriverKey]) -> List[str]:
+        """The paths supported by every driver of `drivers`. Raises KeyError for an unknown driver."""
+        bitset = (1 << len(self.__paths)) - 1
+        for driver in drivers:
+            bitset &= self.__path_bitsets[self.__driver_ids[driver]]
+
+        return [self.__paths[path_id] for path_id in _iter_bits(bitset)]
+
+    @staticmethod
+    def from_node_table(node_table: NodeTable) -> SupportIndex:
+        drivers: List[DriverKey] = []
+        driver_ids: Dict[str, List[int]] = {}
+        driver_paths: List[List[str]] = []
+        # The nodes are in depth-first order, the path of the parent is always known
+        node_paths: Dict[int, str] = {}
+
+        for node_id, parent_id, kind, name_symbol in zip(
+            node_table.node_ids, node_table.parent_ids, node_table.kinds, node_table.name_symbols
+        ):
+            if kind == KIND_DRIVER:
+                drivers.append(node_table.get_driver_key(node_id))
+                driver_paths.append([])
+                node_paths = {node_id: ""}
+                continue
+            if name_symbol == NO_SYMBOL:
+                continue  # positional options have no path
+
+            name = normalize_name(node_table.symbols[name_symbol])
+            path = node_paths[node_id] = f"{node_paths[parent_id]}/{name}" if node_paths[parent_id] else name
+            driver_ids.setdefault(path, []).append(len(drivers) - 1)
+            driver_paths[-1].append(path)
+
+        path_ids = {path: path_id for path_id, path in enumerate(sorted(driver_ids))}
+        return SupportIndex(
+            drivers,
+            {path: _to_bitset(ids, len(drivers)) for path, ids in driver_ids.items()},
+            [_to_bitset((path_ids[path] for path in paths), len(path_ids)) for paths in driver_paths],
+        )
+
+    @staticmethod
+    def from_dict(as_dict: Dict[str, Any]) -> SupportIndex:
+        return SupportIndex(
+            [(driver[0], driver[1]) for driver in as_dict["drivers"]],
+            {path: int(bitset, 16) for path, bitset in as_dict["paths"].items()},
+            [int(driver[2], 16) for driver in as_dict["drivers"]],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The bitsets as hexadecimal strings:
+
+        {"drivers": [[context, name, bitset of paths], ...], "paths": {path: bitset of drivers, ...}}
+        """
+        return {
+            "drivers": [[*driver, format(bitset, "x")] for driver, bitset in zip(self.__drivers, self.__path_bitsets)],
+            "paths": {path: format(self.__driver_bitsets[path], "x") for path in self.__paths},
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SupportIndex):
+            return False
+
+        return (
+            self.__drivers == other.__drivers
+            and self.__driver_bitsets == other.__driver_bitsets
+            and self.__path_bitsets == other.__path_bitsets
+        )
@@ -3,6 +3,11 @@ from typing import Iterable
 __INDENTATION = 4
 
 
+def normalize_name(name: str) -> str:
+    """Normalize a name for hyphen/underscore-insensitive comparison, like AxoSyslog compares keywords."""
+    return name.replace("_", "-")
+
+
 def indent(string: str) -> str:
     lines = string.split("\n")
     indented_lines = [f"{' ' * __INDENTATION}{line}" for line in lines]
@@ -4,6 +4,8 @@ from argparse import ArgumentParser, Namespace
 from pathlib import Path
 
 from axosyslog_cfg_helper.driver_db import DriverDB
+from axosyslog_cfg_helper.driver_db.db_file import open_db_file
+from axosyslog_cfg_helper.driver_db.driver_db import DriverDBDiff
 
 
 def parse_args() -> Namespace:
@@ -32,10 +34,19 @@ def main() -> int:
     old_db_file = Path(args.old_db_file)
     new_db_file = Path(args.new_db_file)
 
-    with old_db_file.open("r", encoding="utf-8") as file:
+    with open_db_file(old_db_file) as file:
+        old_content_hash = DriverDB.read_content_hash(file)
+    with open_db_file(new_db_file) as file:
+        new_content_hash = DriverDB.read_content_hash(file)
+
+    if old_content_hash is not None and old_content_hash == new_content_hash:
+        print(DriverDBDiff())
+        return 0
+
+    with open_db_file(old_db_file) as file:
         old_driver_db = DriverDB.load(file)
 
-    with new_db_file.open("r", encoding="utf-8") as file:
+    with open_db_file(new_db_file) as file:
         new_driver_db = DriverDB.load(file)
 
     print(new_driver_db.diff(old_driver_db))
@@ -1,5 +1,11 @@
-from .load_modules import load_modules
+from .load_modules import ModuleMissingError, load_modules, patch_modules
+from .source_tree import DirectorySourceTree, SourceTree, TarballSourceTree
 
 __all__ = [
     "load_modules",
+    "patch_modules",
+    "ModuleMissingError",
+    "SourceTree",
+    "DirectorySourceTree",
+    "TarballSourceTree",
 ]
@@ -0,0 +1,64 @@
+"""The DriverDB slices loaded from the grammars, stored between builds.
+
+An artifact is keyed by the hash of every input file it was loaded from, and
+of the source code loading it, so a rebuild only reloads the grammars whose
+inputs changed. The artifacts of a slice are stored under its own directory:
+
+    <work-dir>/<slice-name>/<key>.json
+"""
+
+import hashlib
+
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from axosyslog_cfg_helper.driver_db import DriverDB
+from .source_tree import SourceTree
+
+
+def __get_loader_source_files() -> List[Path]:
+    package_dir = Path(__file__).parent.parent
+
+    return list((package_dir / "module_loader").glob("*.py")) + list((package_dir / "driver_db").glob("*.py"))
+
+
+def get_artifact_key(source_tree: SourceTree, input_files: Iterable[Path]) -> str:
+    """The input files are read from `source_tree`, the loader source files from the local filesystem."""
+    hasher = hashlib.sha256()
+
+    contents = [(file.name, file.read_bytes()) for file in sorted(set(__get_loader_source_files()))]
+    contents += [
+        (file.name, source_tree.read_bytes(file) if source_tree.is_file(file) else b"<missing>")
+        for file in sorted(set(input_files))
+    ]
+
+    # Only the names of the files are hashed, so moving the source tree, or building
+    # from its tarball, keeps the keys
+    for name, content in contents:
+        hasher.update(f"{name}\0".encode())
+        hasher.update(content)
+        hasher.update(b"\0")
+
+    return hasher.hexdigest()
+
+
+def load_artifact(work_dir: Path, name: str, key: str) -> Optional[DriverDB]:
+    artifact = work_dir / name / f"{key}.json"
+    if not artifact.is_file():
+        return None
+
+    with artifact.open("r", encoding="utf-8") as file:
+        return DriverDB.load(file)
+
+
+def store_artifact(work_dir: Path, name: str, key: str, driver_db: DriverDB) -> None:
+    artifact_dir = work_dir / name
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+
+    for stale_artifact in artifact_dir.glob("*.json"):
+        stale_artifact.unlink()
+
+    temporary_artifact = artifact_dir / f"{key}.json.tmp"
+    with temporary_artifact.open("w", encoding="utf-8") as file:
+        driver_db.dump(file)
+    temporary_artifact.replace(artifact_dir / f"{key}.json")
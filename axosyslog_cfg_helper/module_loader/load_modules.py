@@ -1,21 +1,50 @@
 import re
 
-from typing import Dict, List, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from itertools import repeat
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 from pathlib import Path
 from neologism import DCFG, Rule
 
-from axosyslog_cfg_helper.driver_db import Driver, DriverDB, Block, Option
+from axosyslog_cfg_helper.driver_db import Driver, DriverDB, DriverDBBuilder, Block, Option
 from axosyslog_cfg_helper.globals import EXCLUSIVE_PLUGINS, PLUGIN_CONTEXTS, TYPES
+from .build_artifacts import get_artifact_key, load_artifact, store_artifact
 from .load_scl import load_scl
+from .load_yacc_files import YaccFileLoader
 from .parse_sentence import parse_sentence, ParseError
+from .parse_sentences import ErrorCallback, parse_sentences
+from .source_tree import DirectorySourceTree, SourceTree
+from .split_grammar import split_grammar
+
+OPTIONS_STMT_START_SYMBOL = "__options_stmt_start"
+PARALLEL_ENUMERATION_MIN_SENTENCES = 10000
+
+SentencesTransformation = Callable[[Iterable[Tuple[str, ...]]], Iterable[Tuple[str, ...]]]
 
 
 class GrammarFileMissingError(Exception):
     pass
 
 
-def __find_grammar_files(driver_source_dir: Path) -> Set[Path]:
-    grammar_files = set(driver_source_dir.rglob("*-grammar.y"))
+class ModuleMissingError(Exception):
+    pass
+
+
+@dataclass
+class _GrammarSlice:
+    """The DriverDB slice loaded from `grammar_files`, stored as the build artifact `name`."""
+
+    name: str
+    header: Optional[str]
+    grammar_files: List[Path]
+    get_input_files: Callable[[], List[Path]]
+    load: Callable[[], DriverDB]
+
+
+def __find_grammar_files(source_tree: SourceTree, driver_source_dir: Path) -> Set[Path]:
+    grammar_files = set(source_tree.rglob(driver_source_dir, "*-grammar.y"))
 
     if len(grammar_files) == 0:
         raise GrammarFileMissingError()
@@ -36,17 +65,19 @@ def __remove_ifdef(grammar: DCFG) -> None:
             grammar.remove_symbol(symbol)
 
 
-def __find_file_upwards(file_to_find: Path, relative_to: Path) -> Optional[Path]:
+def __find_file_upwards(source_tree: SourceTree, file_to_find: Path, relative_to: Path) -> Optional[Path]:
     current_dir = relative_to
 
-    while True:
+    while current_dir != source_tree.root:
         current_dir = current_dir.parent
-        if current_dir == Path("/"):
+        if current_dir == current_dir.parent:
             return None
 
-        for found_file in current_dir.rglob(file_to_find.name):
+        for found_file in sorted(source_tree.rglob(current_dir, file_to_find.name)):
             return found_file
 
+    return None
+
 
 def __get_token_resolutions_from_struct(struct: str) -> Dict[str, Set[str]]:
     resolutions: Dict[str, Set[str]] = {}
@@ -61,55 +92,69 @@ def __get_token_resolutions_from_struct(struct: str) -> Dict[str, Set[str]]:
     return resolutions
 
 
-def __get_token_resolutions(parser_file: Path) -> Dict[str, Set[str]]:
+def __find_extra_parser_files(source_tree: SourceTree, parser_file: Path) -> Dict[Path, Optional[Path]]:
+    """Find the `*-parser.h` files included by the parser file, which may hold keywords as well.
+    The included files that cannot be found are mapped to None."""
+    extra_parser_files: Dict[Path, Optional[Path]] = {}
+    include_regex = re.compile(r'#include (<[^>]*|"[^"]*)')
+
+    file_content = source_tree.read_text(parser_file).replace("\n", "")
+    for include_match in include_regex.finditer(file_content):
+        included_file = Path(include_match.group(1)[1:])
+        if not included_file.name.endswith("-parser.h"):
+            continue
+
+        extra_parser_files[included_file] = __find_file_upwards(source_tree, included_file, parser_file.parent)
+
+    return extra_parser_files
+
+
+def __get_token_resolutions(source_tree: SourceTree, parser_file: Path) -> Dict[str, Set[str]]:
     resolutions: Dict[str, Set[str]] = {}
 
     struct_regex = re.compile(r"CfgLexerKeyword(.*?)};")
-    include_regex = re.compile(r'#include (<[^>]*|"[^"]*)')
 
-    with parser_file.open("r") as file:
-        file_content = file.read().replace("\n", "")
-        for include_match in include_regex.finditer(file_content):
-            included_file = Path(include_match.group(1)[1:])
-            if not included_file.name.endswith("-parser.h"):
-                continue
-
-            extra_parser_file = __find_file_upwards(included_file, parser_file.parent)
-            if extra_parser_file is None:
-                print(f"      Cannot find extra parser file: {str(extra_parser_file)}.")
-                continue
+    for extra_parser_file in __find_extra_parser_files(source_tree, parser_file).values():
+        if extra_parser_file is None:
+            print(f"      Cannot find extra parser file: {str(extra_parser_file)}.")
+            continue
 
-            extra_parser_file_content = extra_parser_file.read_text().replace("\n", "")
-            resolutions.update(__get_token_resolutions_from_struct(extra_parser_file_content))
+        extra_parser_file_content = source_tree.read_text(extra_parser_file).replace("\n", "")
+        resolutions.update(__get_token_resolutions_from_struct(extra_parser_file_content))
 
-        for struct_match in struct_regex.finditer(file_content):
-            resolutions.update(__get_token_resolutions_from_struct(struct_match.group(1)))
+    file_content = source_tree.read_text(parser_file).replace("\n", "")
+    for struct_match in struct_regex.finditer(file_content):
+        resolutions.update(__get_token_resolutions_from_struct(struct_match.group(1)))
 
     return resolutions
 
 
-def __resolve_tokens_to_keywords(grammar: DCFG, common_parser_file: Path, parser_file: Optional[Path] = None) -> None:
+def __resolve_tokens_to_keywords(
+    source_tree: SourceTree, grammar: DCFG, common_parser_file: Path, parser_file: Optional[Path] = None
+) -> None:
     parser_files: List[Path] = [common_parser_file]
     if parser_file:
         parser_files.append(parser_file)
 
     for file in parser_files:
-        for token, resolutions in __get_token_resolutions(file).items():
+        for token, resolutions in __get_token_resolutions(source_tree, file).items():
             for resolution in resolutions:
                 grammar.add_rule(Rule(token, (resolution,)))
 
 
-def __prepare_module_grammar(module_source_dir: Path, common_parser_file: Path) -> DCFG:
+def __prepare_module_grammar(
+    source_tree: SourceTree, yacc_loader: YaccFileLoader, module_source_dir: Path, common_parser_file: Path
+) -> DCFG:
     module_grammar = DCFG()
 
-    for grammar_file in __find_grammar_files(module_source_dir):
+    for grammar_file in sorted(__find_grammar_files(source_tree, module_source_dir)):
         parser_file = Path(str(grammar_file).replace("-grammar.y", "-parser.c"))
 
-        grammar = DCFG.from_yacc_file(grammar_file)
+        grammar = yacc_loader.load(grammar_file)
 
         __format_types(grammar)
         __remove_ifdef(grammar)
-        __resolve_tokens_to_keywords(grammar, common_parser_file, parser_file)
+        __resolve_tokens_to_keywords(source_tree, grammar, common_parser_file, parser_file)
 
         module_grammar.load_dcfg(grammar)
         module_grammar.start_symbol = grammar.start_symbol
@@ -117,6 +162,113 @@ def __prepare_module_grammar(module_source_dir: Path, common_parser_file: Path)
     return module_grammar
 
 
+def __get_rules_by_lhs(grammar: DCFG) -> Dict[str, List[Rule]]:
+    rules_by_lhs: Dict[str, List[Rule]] = {}
+    for rule in grammar.rules:
+        rules_by_lhs.setdefault(rule.lhs, []).append(rule)
+
+    return rules_by_lhs
+
+
+def __find_reachable_symbols(rules_by_lhs: Dict[str, List[Rule]], start_symbol: str) -> Set[str]:
+    reachable: Set[str] = set()
+    symbols_to_visit = [start_symbol]
+
+    while symbols_to_visit:
+        symbol = symbols_to_visit.pop()
+        if symbol in reachable:
+            continue
+
+        reachable.add(symbol)
+        for rule in rules_by_lhs.get(symbol, []):
+            symbols_to_visit.extend(rule.rhs)
+
+    return reachable
+
+
+def __find_loop_free_symbols(rules_by_lhs: Dict[str, List[Rule]]) -> Set[str]:
+    """Return the symbols whose expansion can not reach a loop."""
+    loop_free: Set[str] = set()
+    loopy: Set[str] = set()
+    on_stack: Set[str] = set()
+
+    def visit(symbol: str) -> bool:
+        if symbol in loop_free:
+            return True
+        if symbol in loopy or symbol in on_stack:
+            return False
+
+        on_stack.add(symbol)
+        is_loop_free = all(visit(rhs_symbol) for rule in rules_by_lhs.get(symbol, []) for rhs_symbol in rule.rhs)
+        on_stack.remove(symbol)
+
+        (loop_free if is_loop_free else loopy).add(symbol)
+        return is_loop_free
+
+    for symbol in rules_by_lhs:
+        visit(symbol)
+
+    return loop_free
+
+
+def __collapse_single_use_nonterminals(rules_by_lhs: Dict[str, List[Rule]], start_symbol: str) -> None:
+    """Inline the nonterminals having one rule and one occurrence into the rule using them.
+
+    Only loop-free nonterminals are collapsed into loop-free rules: the loops cut by
+    the sentence enumeration depend on the order of the rules, which must not change.
+    """
+    loop_free = __find_loop_free_symbols(rules_by_lhs)
+
+    usages: Dict[str, List[Rule]] = {}
+    for rules in rules_by_lhs.values():
+        for rule in rules:
+            for symbol in rule.rhs:
+                usages.setdefault(symbol, []).append(rule)
+
+    for symbol in sorted(loop_free):
+        if symbol == start_symbol or len(rules_by_lhs.get(symbol, [])) != 1 or len(usages.get(symbol, [])) != 1:
+            continue
+
+        expansion = rules_by_lhs[symbol][0]
+        using_rule = usages[symbol][0]
+        if using_rule.lhs not in loop_free:
+            continue
+
+        rules_by_lhs.pop(symbol)
+        usages.pop(symbol)
+
+        index = using_rule.rhs.index(symbol)
+        collapsed_rule = Rule(using_rule.lhs, using_rule.rhs[:index] + expansion.rhs + using_rule.rhs[index + 1 :])
+
+        lhs_rules = rules_by_lhs[using_rule.lhs]
+        lhs_rules[lhs_rules.index(using_rule)] = collapsed_rule
+        for rhs_symbol in collapsed_rule.rhs:
+            symbol_usages = usages[rhs_symbol]
+            symbol_usages[:] = [collapsed_rule if rule in (using_rule, expansion) else rule for rule in symbol_usages]
+
+
+def __prune_grammar(grammar: DCFG) -> int:
+    """Drop the rules that are not reachable from the start symbol and collapse the
+    single-use nonterminals, so the sentence enumeration has less to walk through.
+
+    Returns the number of rules removed.
+    """
+    rules_by_lhs = __get_rules_by_lhs(grammar)
+    original_rules = {rule for rules in rules_by_lhs.values() for rule in rules}
+
+    reachable = __find_reachable_symbols(rules_by_lhs, grammar.start_symbol)
+    rules_by_lhs = {lhs: rules for lhs, rules in rules_by_lhs.items() if lhs in reachable}
+    __collapse_single_use_nonterminals(rules_by_lhs, grammar.start_symbol)
+
+    pruned_rules = {rule for rules in rules_by_lhs.values() for rule in rules}
+    for rule in pruned_rules - original_rules:
+        grammar.add_rule(rule)
+    for rule in original_rules - pruned_rules:
+        grammar.remove_rule(rule)
+
+    return len(original_rules) - len(pruned_rules)
+
+
 def __merge_blocks_and_options_with_the_same_name(driver_db: DriverDB) -> None:
     def process(block: Block):
         for option in list(block.options):
@@ -128,7 +280,7 @@ def __merge_blocks_and_options_with_the_same_name(driver_db: DriverDB) -> None:
                 continue
 
             for params in option.params:
-                inner_block_with_same_name.add_option(Option(params={params}))
+                inner_block_with_same_name.adopt_option(Option(params={params}))
 
             block.remove_option(option.name)
 
@@ -178,96 +330,392 @@ def __connect_inner_plugins(driver_db: DriverDB) -> None:
                 if plugin.name in EXCLUSIVE_PLUGINS and driver.name not in EXCLUSIVE_PLUGINS[plugin.name]:
                     continue
 
-                driver.add_block(plugin.to_block())
+                driver.adopt_block(plugin.to_block())
 
+        # The plugin contexts are removed, the plugin blocks are told apart by their names when patching
+        driver_db.add_plugin_names(driver_context, (plugin.name for plugin in plugins))
         driver_db.remove_context(plugin_context)
 
 
+def __connect_reloaded_plugins(driver_db: DriverDB, driver_context: str, plugins: List[Driver]) -> None:
+    if driver_context not in driver_db.contexts:
+        return
+
+    for driver in driver_db.get_drivers_in_context(driver_context):
+        block_names = {block.name for block in driver.blocks}
+
+        for plugin in plugins:
+            if plugin.name in block_names:
+                driver.remove_block(plugin.name)
+                driver.adopt_block(plugin.to_block())
+
+
+def __connect_plugins_to_reloaded_driver(
+    driver: Driver, previous_driver: Optional[Driver], plugins: List[Driver], plugin_names: Set[str]
+) -> None:
+    __remove_plugin_param_from_driver(driver)
+
+    if previous_driver is not None:
+        # Only the plugin blocks are taken over, the other blocks are defined by the driver itself
+        block_names = {block.name for block in driver.blocks} | {plugin.name for plugin in plugins}
+        for block in previous_driver.blocks:
+            if block.name in plugin_names and block.name not in block_names:
+                driver.adopt_block(block.copy())
+
+    for plugin in plugins:
+        if plugin.name in EXCLUSIVE_PLUGINS and driver.name not in EXCLUSIVE_PLUGINS[plugin.name]:
+            continue
+
+        driver.adopt_block(plugin.to_block())
+
+
+def __connect_inner_plugins_of_patched_modules(driver_db: DriverDB, modules_db: DriverDB) -> None:
+    """Like __connect_inner_plugins(), for the drivers of the reloaded modules.
+
+    The plugin contexts are not part of `driver_db` anymore, so a reloaded driver
+    accepting plugins takes over the plugin blocks of its previous version, the blocks
+    named after the plugin names of `driver_db`. The plugins of the reloaded modules
+    replace their previous versions in every driver of `driver_db`.
+    """
+    for plugin_context, driver_context in PLUGIN_CONTEXTS.items():
+        plugins: List[Driver] = []
+        if plugin_context in modules_db.contexts:
+            plugins = list(modules_db.get_drivers_in_context(plugin_context))
+            modules_db.remove_context(plugin_context)
+
+        plugin_names = driver_db.get_plugin_names(driver_context)
+        driver_db.add_plugin_names(driver_context, (plugin.name for plugin in plugins))
+        __connect_reloaded_plugins(driver_db, driver_context, plugins)
+
+        if driver_context not in modules_db.contexts:
+            continue
+
+        for driver in modules_db.get_drivers_in_context(driver_context):
+            if not __accepts_plugins(driver):
+                continue
+
+            try:
+                previous_driver: Optional[Driver] = driver_db.get_driver(driver_context, driver.name)
+            except KeyError:
+                previous_driver = None
+
+            __connect_plugins_to_reloaded_driver(driver, previous_driver, plugins, plugin_names)
+
+
 def __post_process_driver_db(driver_db: DriverDB) -> None:
     __merge_blocks_and_options_with_the_same_name(driver_db)
     __connect_inner_plugins(driver_db)
 
 
-def __load_drivers_in_module(module_source_dir: Path, common_parser_file: Path) -> DriverDB:
-    drivers = DriverDB()
+def __print_parse_error(sentence: Tuple[str, ...], exception: ParseError) -> None:
+    print(f"    Cannot parse sentence '{' '.join(sentence)}': {exception}")
+
+
+def __parse_sentences(
+    sentences: Iterable[Tuple[str, ...]], batch_parse: bool, on_error: Optional[ErrorCallback]
+) -> DriverDB:
+    if batch_parse:
+        return parse_sentences(sentences, on_error)
+
+    builder = DriverDBBuilder()
+    for sentence in sentences:
+        try:
+            driver_slice = parse_sentence(sentence)
+            builder.add_driver(driver_slice)
+        except ParseError as exception:
+            if on_error is not None:
+                on_error(sentence, exception)
 
+    return builder.finish()
+
+
+def __parse_grammar_part(
+    grammar: DCFG,
+    batch_parse: bool,
+    on_error: Optional[ErrorCallback],
+    transform_sentences: Optional[SentencesTransformation],
+) -> DriverDB:
+    sentences: Iterable[Tuple[str, ...]] = grammar.iter_sentences() if batch_parse else grammar.sentences
+    if transform_sentences is not None:
+        sentences = transform_sentences(sentences)
+
+    return __parse_sentences(sentences, batch_parse, on_error)
+
+
+def __parse_grammar(
+    grammar: DCFG,
+    batch_parse: bool,
+    jobs: int,
+    on_error: Optional[ErrorCallback],
+    transform_sentences: Optional[SentencesTransformation] = None,
+) -> DriverDB:
+    """Enumerate and parse the sentences of `grammar`.
+
+    With more `jobs`, a large grammar is split by split_grammar(), and its parts
+    are enumerated and parsed in worker processes. Their DriverDBs are merged in
+    the order of the parts, so the result is the same as the serial one.
+    """
+    if jobs <= 1:
+        return __parse_grammar_part(grammar, batch_parse, on_error, transform_sentences)
+
+    parts = split_grammar(grammar, jobs, PARALLEL_ENUMERATION_MIN_SENTENCES)
+    if len(parts) == 1:
+        return __parse_grammar_part(parts[0], batch_parse, on_error, transform_sentences)
+
+    print(f"    Enumerating the sentences in {len(parts)} parts.")
+    builder = DriverDBBuilder()
+    with ProcessPoolExecutor(max_workers=len(parts)) as executor:
+        for driver_db in executor.map(
+            __parse_grammar_part, parts, repeat(batch_parse), repeat(on_error), repeat(transform_sentences)
+        ):
+            builder.merge(driver_db)
+
+    return builder.finish()
+
+
+def __load_drivers_in_module(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    source_tree: SourceTree,
+    yacc_loader: YaccFileLoader,
+    module_source_dir: Path,
+    common_parser_file: Path,
+    batch_parse: bool,
+    jobs: int,
+) -> DriverDB:
     try:
-        grammar = __prepare_module_grammar(module_source_dir, common_parser_file)
+        grammar = __prepare_module_grammar(source_tree, yacc_loader, module_source_dir, common_parser_file)
     except GrammarFileMissingError:
         print("    Skipping module: Grammar file is missing.")
         return DriverDB()
 
-    for sentence in grammar.sentences:
-        try:
-            driver_slice = parse_sentence(sentence)
-            drivers.add_driver(driver_slice)
-        except ParseError as exception:
-            print(f"    Cannot parse sentence '{' '.join(sentence)}': {exception}")
+    print(f"    Pruned {__prune_grammar(grammar)} grammar rules.")
+
+    return __parse_grammar(grammar, batch_parse, jobs, __print_parse_error)
+
+
+def __find_options_stmt_rules(grammar: DCFG) -> Set[Rule]:
+    """Find the statement productions starting with the `options` keyword,
+    e.g. `stmt: KW_OPTIONS options_stmt`."""
+    if "options" not in grammar.symbols:
+        return set()
+
+    options_tokens = {rule.lhs for rule in grammar.rules_containing("options") if rule.rhs == ("options",)}
+
+    return {
+        rule
+        for token in options_tokens
+        for rule in grammar.rules_containing(token)
+        if rule.lhs != token and rule.rhs[:1] == (token,)
+    }
+
+
+def __restrict_to_options_stmt(grammar: DCFG) -> bool:
+    """Point the start symbol at the `options` statement, so sentences of the other
+    statements (sources, destinations, log paths, templates, ...) are never enumerated.
+    The statement terminating `;` is appended, as parse_sentence expects it."""
+    options_stmt_rules = __find_options_stmt_rules(grammar)
+    if not options_stmt_rules:
+        return False
+
+    for rule in options_stmt_rules:
+        grammar.add_rule(Rule(OPTIONS_STMT_START_SYMBOL, rule.rhs + (";",)))
+    grammar.start_symbol = OPTIONS_STMT_START_SYMBOL
 
-    return drivers
+    return True
 
 
-def __load_common_grammar_file(lib_dir: Path, common_parser_file: Path) -> DriverDB:
-    grammar = DCFG.from_yacc_file(lib_dir / "cfg-grammar.y")
+def __select_options_sentences(sentences: Iterable[Tuple[str, ...]]) -> Iterable[Tuple[str, ...]]:
+    return (sentence for sentence in sentences if sentence and sentence[0] == "options")
+
+
+def __load_common_grammar_file(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    source_tree: SourceTree,
+    yacc_loader: YaccFileLoader,
+    lib_dir: Path,
+    common_parser_file: Path,
+    batch_parse: bool,
+    jobs: int,
+) -> DriverDB:
+    grammar = yacc_loader.load(lib_dir / "cfg-grammar.y")
     __format_types(grammar)
     __remove_ifdef(grammar)
-    __resolve_tokens_to_keywords(grammar, common_parser_file)
+    __resolve_tokens_to_keywords(source_tree, grammar, common_parser_file)
 
-    driver_db = DriverDB()
-    global_options = Driver("options", DriverDB.GLOBAL_OPTIONS_DRIVER_NAME)
-    driver_db.add_driver(global_options)
+    if not __restrict_to_options_stmt(grammar):
+        print("    Cannot find the options statement, enumerating the whole common grammar.")
+    print(f"    Pruned {__prune_grammar(grammar)} grammar rules.")
 
-    for sentence in grammar.sentences:
-        if not sentence or sentence[0] != "options":
-            continue
-        try:
-            driver_slice = parse_sentence(sentence)
-            driver_db.add_driver(driver_slice)
-        except ParseError as exception:
-            print(f"    Cannot parse sentence '{' '.join(sentence)}': {exception}")
+    driver_db = __parse_grammar(grammar, batch_parse, jobs, __print_parse_error, __select_options_sentences)
+    driver_db.adopt_driver(Driver("options", DriverDB.GLOBAL_OPTIONS_DRIVER_NAME))
 
     return driver_db
 
 
-def __load_sub_expr_grammar(
+def __prepend_context_token(context_token: str, sentences: Iterable[Tuple[str, ...]]) -> Iterable[Tuple[str, ...]]:
+    return ((context_token,) + tuple(sentence) for sentence in sentences)
+
+
+def __load_sub_expr_grammar(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    source_tree: SourceTree,
+    yacc_loader: YaccFileLoader,
     grammar_file: Path,
     parser_file: Path,
     common_parser_file: Path,
     start_symbol: str,
     context_token: str,
+    batch_parse: bool,
+    jobs: int,
 ) -> DriverDB:
     """Load a sub-expression grammar (filter-expr, rewrite-expr) whose drivers are
     enumerated under `start_symbol` and prepend `context_token` so the sentences
     look like top-level driver sentences to parse_sentence."""
-    grammar = DCFG.from_yacc_file(grammar_file)
+    grammar = yacc_loader.load(grammar_file)
     __format_types(grammar)
     __remove_ifdef(grammar)
-    __resolve_tokens_to_keywords(grammar, common_parser_file, parser_file)
+    __resolve_tokens_to_keywords(source_tree, grammar, common_parser_file, parser_file)
 
     if start_symbol not in grammar.symbols:
         print(f"    Sub-expression start symbol '{start_symbol}' not found in {grammar_file.name}.")
         return DriverDB()
 
     grammar.start_symbol = start_symbol
+    print(f"    Pruned {__prune_grammar(grammar)} grammar rules.")
 
-    driver_db = DriverDB()
-    for sentence in grammar.sentences:
-        prefixed = (context_token,) + tuple(sentence)
-        try:
-            driver_slice = parse_sentence(prefixed)
-            driver_db.add_driver(driver_slice)
-        except ParseError:
+    return __parse_grammar(grammar, batch_parse, jobs, None, partial(__prepend_context_token, context_token))
+
+
+def __get_parser_input_files(source_tree: SourceTree, parser_file: Path) -> List[Path]:
+    if not source_tree.is_file(parser_file):
+        return [parser_file]
+
+    extra_parser_files = __find_extra_parser_files(source_tree, parser_file).values()
+
+    return [parser_file] + [extra_parser_file for extra_parser_file in extra_parser_files if extra_parser_file]
+
+
+def __get_module_input_files(source_tree: SourceTree, module_source_dir: Path, common_parser_file: Path) -> List[Path]:
+    input_files = __get_parser_input_files(source_tree, common_parser_file)
+
+    for grammar_file in source_tree.rglob(module_source_dir, "*-grammar.y"):
+        input_files.append(grammar_file)
+        input_files += __get_parser_input_files(source_tree, Path(str(grammar_file).replace("-grammar.y", "-parser.c")))
+
+    return input_files
+
+
+def __get_sub_grammar_input_files(
+    source_tree: SourceTree, grammar_file: Path, parser_file: Path, common_parser_file: Path
+) -> List[Path]:
+    return (
+        [grammar_file]
+        + __get_parser_input_files(source_tree, parser_file)
+        + __get_parser_input_files(source_tree, common_parser_file)
+    )
+
+
+def __load_slices(
+    source_tree: SourceTree,
+    yacc_loader: YaccFileLoader,
+    work_dir: Optional[Path],
+    slices: List[_GrammarSlice],
+) -> List[DriverDB]:
+    """Load the slices, reusing their build artifacts when `work_dir` is given.
+
+    The grammar files of the slices which are not reused are queued in `yacc_loader`
+    first, so bison runs for the next ones while a slice is loaded.
+    """
+    keys: Dict[str, str] = {}
+    artifacts: Dict[str, DriverDB] = {}
+    if work_dir is not None:
+        for grammar_slice in slices:
+            keys[grammar_slice.name] = get_artifact_key(source_tree, grammar_slice.get_input_files())
+            artifact = load_artifact(work_dir, grammar_slice.name, keys[grammar_slice.name])
+            if artifact is not None:
+                artifacts[grammar_slice.name] = artifact
+
+    grammar_files = [
+        file for grammar_slice in slices if grammar_slice.name not in artifacts for file in grammar_slice.grammar_files
+    ]
+    if grammar_files:
+        print(f"Running bison for {len(grammar_files)} grammar files.")
+        yacc_loader.prefetch(grammar_files)
+
+    driver_dbs: List[DriverDB] = []
+    for grammar_slice in slices:
+        if grammar_slice.header is not None:
+            print(grammar_slice.header)
+
+        if grammar_slice.name in artifacts:
+            print("    Inputs did not change, reusing the build artifact.")
+            driver_dbs.append(artifacts.pop(grammar_slice.name))
             continue
 
-    return driver_db
+        driver_db = grammar_slice.load()
+        if work_dir is not None:
+            store_artifact(work_dir, grammar_slice.name, keys[grammar_slice.name], driver_db)
+        driver_dbs.append(driver_db)
 
+    return driver_dbs
 
-def load_modules(lib_dir: Path, modules_dir: Path) -> DriverDB:
-    common_parser_file = lib_dir / "cfg-parser.c"
-    driver_db = DriverDB()
-    module_source_dirs: List[Path] = list(filter(lambda path: path.is_dir(), modules_dir.glob("*")))
 
-    driver_db.merge(__load_common_grammar_file(lib_dir, common_parser_file))
+def __get_module_slice(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    source_tree: SourceTree,
+    yacc_loader: YaccFileLoader,
+    module_source_dir: Path,
+    common_parser_file: Path,
+    batch_parse: bool,
+    jobs: int,
+) -> _GrammarSlice:
+    return _GrammarSlice(
+        f"module-{module_source_dir.name}",
+        f"Loading module '{module_source_dir.name}'.",
+        sorted(source_tree.rglob(module_source_dir, "*-grammar.y")),
+        partial(__get_module_input_files, source_tree, module_source_dir, common_parser_file),
+        partial(
+            __load_drivers_in_module, source_tree, yacc_loader, module_source_dir, common_parser_file, batch_parse, jobs
+        ),
+    )
+
+
+def load_modules(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    lib_dir: Path,
+    modules_dir: Path,
+    batch_parse: bool = False,
+    work_dir: Optional[Path] = None,
+    source_tree: Optional[SourceTree] = None,
+    jobs: int = 1,
+) -> DriverDB:
+    """Build the DriverDB from the grammar files of the lib and modules directories.
+
+    With `batch_parse`, the sentences of each grammar are parsed together by
+    parse_sentences(), sharing the work on their common prefixes.
+
+    With more `jobs`, bison runs for that many grammar files at a time, and the
+    sentences of the large grammars are enumerated and parsed in that many
+    worker processes.
+
+    With `work_dir`, the DriverDB slice of each grammar is stored there as a build
+    artifact, and reused by the next builds until the inputs of the grammar change.
+    The slices are then linked, post-processed and extended with the SCL drivers.
+
+    The files are read through `source_tree`, which defaults to the local directory
+    containing `lib_dir`. A TarballSourceTree reads them from the release tarball.
+    """
+    if source_tree is None:
+        source_tree = DirectorySourceTree(lib_dir.parent)
+
+    common_parser_file = lib_dir / "cfg-parser.c"
+    yacc_loader = YaccFileLoader(source_tree, jobs)
+    slices: List[_GrammarSlice] = [
+        _GrammarSlice(
+            "common",
+            None,
+            [lib_dir / "cfg-grammar.y"],
+            lambda: [lib_dir / "cfg-grammar.y"] + __get_parser_input_files(source_tree, common_parser_file),
+            lambda: __load_common_grammar_file(
+                source_tree, yacc_loader, lib_dir, common_parser_file, batch_parse, jobs
+            ),
+        )
+    ]
 
     sub_grammars = (
         (
@@ -284,24 +732,116 @@ def load_modules(lib_dir: Path, modules_dir: Path) -> DriverDB:
         ),
     )
     for grammar_file, parser_file, start_symbol, context_token in sub_grammars:
-        if not grammar_file.is_file():
+        if not source_tree.is_file(grammar_file):
             continue
-        print(f"Loading sub-grammar '{grammar_file.parent.name}'.")
-        driver_db.merge(
-            __load_sub_expr_grammar(grammar_file, parser_file, common_parser_file, start_symbol, context_token)
+        slices.append(
+            _GrammarSlice(
+                f"sub-grammar-{grammar_file.parent.name}",
+                f"Loading sub-grammar '{grammar_file.parent.name}'.",
+                [grammar_file],
+                partial(__get_sub_grammar_input_files, source_tree, grammar_file, parser_file, common_parser_file),
+                partial(
+                    __load_sub_expr_grammar,
+                    source_tree,
+                    yacc_loader,
+                    grammar_file,
+                    parser_file,
+                    common_parser_file,
+                    start_symbol,
+                    context_token,
+                    batch_parse,
+                    jobs,
+                ),
+            )
         )
 
-    for module_source_dir in module_source_dirs:
-        print(f"Loading module '{module_source_dir.name}'.")
+    for module_source_dir in sorted(filter(source_tree.is_dir, source_tree.iterdir(modules_dir))):
+        slices.append(
+            __get_module_slice(source_tree, yacc_loader, module_source_dir, common_parser_file, batch_parse, jobs)
+        )
 
-        drivers = __load_drivers_in_module(module_source_dir, common_parser_file)
-        driver_db.merge(drivers)
+    builder = DriverDBBuilder()
+    with yacc_loader:
+        for driver_db in __load_slices(source_tree, yacc_loader, work_dir, slices):
+            builder.merge(driver_db)
 
-    __post_process_driver_db(driver_db)
+    __post_process_driver_db(builder.driver_db)
 
     scl_dir = lib_dir.parent / "scl"
-    if scl_dir.is_dir():
+    if source_tree.is_dir(scl_dir):
         print(f"Loading SCL from '{scl_dir}'.")
-        driver_db.merge(load_scl(scl_dir, driver_db))
+        builder.merge(load_scl(scl_dir, builder.driver_db, None, source_tree, work_dir, jobs))
+
+    return builder.finish()
+
+
+def __replace_drivers(driver_db: DriverDB, replacements: DriverDB) -> Set[Tuple[str, str]]:
+    replaced_drivers: Set[Tuple[str, str]] = set()
+
+    for context in replacements.contexts:
+        for driver in replacements.get_drivers_in_context(context):
+            try:
+                driver_db.remove_driver(context, driver.name)
+            except KeyError:
+                pass
+
+            driver_db.adopt_driver(driver)
+            replaced_drivers.add((context, driver.name))
+
+    return replaced_drivers
+
+
+def patch_modules(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    driver_db: DriverDB,
+    lib_dir: Path,
+    modules_dir: Path,
+    module_names: Iterable[str],
+    batch_parse: bool = False,
+    work_dir: Optional[Path] = None,
+    source_tree: Optional[SourceTree] = None,
+    jobs: int = 1,
+) -> DriverDB:
+    """Reload the given modules, and replace their drivers in `driver_db`, built by load_modules().
+
+    Only the reloaded drivers are post-processed, and only the SCL drivers inheriting
+    from them are resolved again. A driver that is removed from a module, or a plugin
+    that is new to `driver_db` and has to be connected to other drivers, needs a full build.
+
+    The reloaded drivers accepting plugins take over only the plugin blocks of their previous
+    versions, the blocks named after the plugin names recorded in `driver_db` by load_modules().
+    """
+    if source_tree is None:
+        source_tree = DirectorySourceTree(lib_dir.parent)
+
+    common_parser_file = lib_dir / "cfg-parser.c"
+    yacc_loader = YaccFileLoader(source_tree, jobs)
+    slices: List[_GrammarSlice] = []
+
+    for module_name in module_names:
+        module_source_dir = modules_dir / module_name
+        if not source_tree.is_dir(module_source_dir):
+            raise ModuleMissingError(f"Module directory is missing: {module_source_dir}")
+
+        slices.append(
+            __get_module_slice(source_tree, yacc_loader, module_source_dir, common_parser_file, batch_parse, jobs)
+        )
+
+    builder = DriverDBBuilder()
+    with yacc_loader:
+        for module_db in __load_slices(source_tree, yacc_loader, work_dir, slices):
+            builder.merge(module_db)
+
+    modules_db = builder.finish()
+    __merge_blocks_and_options_with_the_same_name(modules_db)
+    # The drivers of `driver_db` are modified in place, the SCL drivers must not see the changes of their bases
+    driver_db.resolve_inheriting_drivers()
+    __connect_inner_plugins_of_patched_modules(driver_db, modules_db)
+
+    patched_drivers = __replace_drivers(driver_db, modules_db)
+
+    scl_dir = lib_dir.parent / "scl"
+    if source_tree.is_dir(scl_dir):
+        print(f"Loading SCL from '{scl_dir}' for the patched drivers.")
+        __replace_drivers(driver_db, load_scl(scl_dir, driver_db, patched_drivers, source_tree, work_dir, jobs))
 
     return driver_db
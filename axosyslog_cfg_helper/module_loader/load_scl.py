@@ -21,12 +21,23 @@ See README / follow-up issue for the catalogued cases.
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import hashlib
+import pickle
+import re
+
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 
-from axosyslog_cfg_helper.driver_db import Block, Driver, DriverDB, Option
+from axosyslog_cfg_helper.driver_db import Driver, DriverDB, InheritingDriver, Option
+from axosyslog_cfg_helper.driver_db.utils import normalize_name
 from axosyslog_cfg_helper.globals import SCL_INHERITANCE_EXCLUDES
+from .source_tree import DirectorySourceTree, SourceTree
+
+# Parsing SCL files of fewer bytes in worker processes costs more than it saves
+PARALLEL_SCL_PARSING_MIN_BYTES = 512 * 1024
 
 _BLOCK_CONTEXTS = {"destination", "source", "parser", "rewrite", "filter"}
 _VARARGS_TOKEN = "__VARARGS__"
@@ -69,189 +80,165 @@ class _SclBlock:  # pylint: disable=too-many-instance-attributes
     refs: List[_BacktickRef]
     file_path: Path
     line: int
-    # populated during topological resolution
-    resolved: bool = field(default=False)
+    column: int
 
+    @property
+    def location(self) -> str:
+        return f"{self.file_path}:{self.line}:{self.column}"
 
-def _strip_comments(text: str) -> str:
-    """Replace `# ...` comments with spaces, leaving string contents untouched."""
-    out: List[str] = []
-    i = 0
-    n = len(text)
-    string_char: Optional[str] = None
-    while i < n:
-        ch = text[i]
-        if string_char:
-            out.append(ch)
-            if ch == "\\" and i + 1 < n:
-                out.append(text[i + 1])
-                i += 2
-                continue
-            if ch == string_char:
-                string_char = None
-            i += 1
-            continue
-        if ch in ('"', "'"):
-            string_char = ch
-            out.append(ch)
-            i += 1
-            continue
-        if ch == "#":
-            # comment runs to end of line
-            while i < n and text[i] != "\n":
-                i += 1
-            continue
-        out.append(ch)
-        i += 1
-    return "".join(out)
 
+# the kinds of the tokens, the numbers of their groups in _TOKEN_REGEX
+_COMMENT, _IDENT, _STRING, _BACKTICK, _PUNCT = range(1, 6)
 
-def _find_matching(text: str, start: int, open_ch: str, close_ch: str) -> int:
-    """Return index of the close char matching the open char at `start`.
+_TOKEN_REGEX = re.compile(
+    r"""
+    \s*
+    (?:
+          (\#[^\n]*)
+        | ([\w-]+)
+        | ("(?:[^"\\]|\\.)*"?|'(?:[^'\\]|\\.)*'?)
+        | (`[^`]*`)
+        | (.)
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_STRING_REF_REGEX = re.compile(r"`([^`]*)`")
+_OPENING_BRACKETS = {")": "(", "}": "{"}
 
-    `text[start]` must equal `open_ch`. Tracks string state. Raises ValueError
-    if unbalanced.
+
+@dataclass
+class _TokenStream:
+    """The tokens of an SCL file, read in one pass.
+
+    The i-th token is `text[starts[i]:ends[i]]` of kind `kinds[i]`. Whitespace
+    and `# ...` comments are dropped, the comments are kept as (start, end)
+    offsets only. `matching` maps the index of every balanced bracket token to
+    the index of its pair; parens and braces are matched independently of each
+    other. `line_starts` holds the offset of the first character of every line.
     """
-    if text[start] != open_ch:
-        raise ValueError(f"expected {open_ch!r} at offset {start}, got {text[start]!r}")
-    depth = 0
-    string_char: Optional[str] = None
-    i = start
-    while i < len(text):
-        ch = text[i]
-        if string_char:
-            if ch == "\\" and i + 1 < len(text):
-                i += 2
-                continue
-            if ch == string_char:
-                string_char = None
-            i += 1
-            continue
-        if ch in ('"', "'"):
-            string_char = ch
-            i += 1
+
+    text: str
+    kinds: List[int]
+    starts: List[int]
+    ends: List[int]
+    matching: Dict[int, int]
+    comments: List[Tuple[int, int]]
+    line_starts: List[int]
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def get_position(self, offset: int) -> Tuple[int, int]:
+        """The line and column of `offset`, both starting from 1."""
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+    def token_text(self, index: int) -> str:
+        return self.text[self.starts[index] : self.ends[index]]
+
+    def is_punct(self, index: int, char: str) -> bool:
+        return self.kinds[index] == _PUNCT and self.text[self.starts[index]] == char
+
+    def text_between(self, start: int, end: int) -> str:
+        """The text between the offsets `start` and `end`, without the comments."""
+        parts: List[str] = []
+        position = start
+        index = bisect_left(self.comments, (start, start))
+        while index < len(self.comments) and self.comments[index][0] < end:
+            parts.append(self.text[position : self.comments[index][0]])
+            position = self.comments[index][1]
+            index += 1
+        parts.append(self.text[position:end])
+        return "".join(parts)
+
+
+def _tokenize(text: str) -> _TokenStream:
+    line_starts = [0] + [newline.end() for newline in re.finditer("\n", text)]
+    stream = _TokenStream(text=text, kinds=[], starts=[], ends=[], matching={}, comments=[], line_starts=line_starts)
+    open_brackets: Dict[str, List[int]] = {"(": [], "{": []}
+
+    for match in _TOKEN_REGEX.finditer(text):
+        kind = match.lastindex or _PUNCT
+        start = match.start(kind)
+        if kind == _COMMENT:
+            stream.comments.append((start, match.end()))
             continue
-        if ch == open_ch:
-            depth += 1
-        elif ch == close_ch:
-            depth -= 1
-            if depth == 0:
-                return i
-        i += 1
-    raise ValueError(f"unbalanced {open_ch!r}{close_ch!r} starting at {start}")
+        if kind == _PUNCT:
+            char = text[start]
+            if char in open_brackets:
+                open_brackets[char].append(len(stream.kinds))
+            elif char in _OPENING_BRACKETS and open_brackets[_OPENING_BRACKETS[char]]:
+                stream.matching[open_brackets[_OPENING_BRACKETS[char]].pop()] = len(stream.kinds)
+        stream.kinds.append(kind)
+        stream.starts.append(start)
+        stream.ends.append(match.end())
+
+    return stream
 
 
-def _split_params(text: str) -> List[_Param]:
-    """Parse the parameter list between block header parens.
+def _split_params(stream: _TokenStream, start: int = 0, end: Optional[int] = None) -> List[_Param]:
+    """Parse the parameter list in the tokens between `start` and `end`.
 
     Entries are whitespace-separated `name(default)` forms. The literal `...`
     indicates the block accepts varargs.
     """
+    end = len(stream) if end is None else end
     params: List[_Param] = []
-    i = 0
-    n = len(text)
-    while i < n:
-        ch = text[i]
-        if ch.isspace() or ch == ",":
-            i += 1
-            continue
-        if text.startswith("...", i):
-            i += 3
-            continue
-        if ch == "(":
+    i = start
+    while i < end:
+        if stream.is_punct(i, "("):
             # Stray '(' without a name -- skip to its matching ')'.
-            close = _find_matching(text, i, "(", ")")
-            i = close + 1
+            i = stream.matching[i] + 1
             continue
-        # Read identifier
-        start = i
-        while i < n and (text[i].isalnum() or text[i] in "_-"):
-            i += 1
-        if i == start:
-            # unexpected; skip char
+        if stream.kinds[i] != _IDENT:
+            # separators, the dots of `...` and anything unexpected
             i += 1
             continue
-        name = text[start:i]
-        # Skip whitespace, then expect '('
-        while i < n and text[i].isspace():
-            i += 1
-        if i < n and text[i] == "(":
-            close = _find_matching(text, i, "(", ")")
-            default = text[i + 1 : close].strip()
+        name = stream.token_text(i)
+        if i + 1 < end and stream.is_punct(i + 1, "("):
+            close = stream.matching[i + 1]
+            default = stream.text_between(stream.ends[i + 1], stream.starts[close]).strip()
             params.append(_Param(name=name, default=default))
             i = close + 1
         else:
             params.append(_Param(name=name, default=None))
+            i += 1
     return params
 
 
-def _read_ident_before(body: str, paren_index: int) -> str:
+def _read_ident_before(stream: _TokenStream, paren_index: int, start: int) -> str:
     """Return the identifier (possibly backtick-wrapped) immediately preceding
-    the `(` at `paren_index`. Returns "" if there is none.
+    the `(` token at `paren_index`, not before the token `start`. Returns ""
+    if there is none.
     """
-    j = paren_index - 1
-    while j >= 0 and body[j].isspace():
-        j -= 1
-    if j >= 0 and body[j] == "`":
-        k = j - 1
-        while k >= 0 and body[k] != "`":
-            k -= 1
-        if k >= 0:
-            return "`" + body[k + 1 : j] + "`"
+    if paren_index <= start or stream.kinds[paren_index - 1] not in (_IDENT, _BACKTICK):
         return ""
-    end = j + 1
-    while j >= 0 and (body[j].isalnum() or body[j] in "_-"):
-        j -= 1
-    return body[j + 1 : end]
+    return stream.token_text(paren_index - 1)
 
 
-def _scan_body(body: str) -> List[_BacktickRef]:  # pylint: disable=too-many-branches,too-many-statements
-    """Walk `body` once and return every `name` backtick reference together
-    with the stack of enclosing driver-call identifiers at its position.
+def _scan_body(stream: _TokenStream, start: int = 0, end: Optional[int] = None) -> List[_BacktickRef]:
+    """Walk the tokens of a block body once and return every `name` backtick
+    reference together with the stack of enclosing driver-call identifiers at
+    its position.
     """
+    end = len(stream) if end is None else end
     refs: List[_BacktickRef] = []
     paren_stack: List[str] = []
-    in_string: Optional[str] = None
-    i = 0
-    n = len(body)
-    while i < n:
-        ch = body[i]
-        if in_string:
-            if ch == "\\" and i + 1 < n:
-                i += 2
-                continue
-            if ch == "`":
-                end = body.find("`", i + 1)
-                if end > 0:
-                    refs.append(_BacktickRef(name=body[i + 1 : end], stack=list(paren_stack), in_string=True))
-                    i = end + 1
-                    continue
-            if ch == in_string:
-                in_string = None
-            i += 1
-            continue
-        if ch in ('"', "'"):
-            in_string = ch
-            i += 1
-            continue
-        if ch == "`":
-            end = body.find("`", i + 1)
-            if end > 0:
-                refs.append(_BacktickRef(name=body[i + 1 : end], stack=list(paren_stack), in_string=False))
-                i = end + 1
-                continue
-            i += 1
-            continue
-        if ch == "(":
-            paren_stack.append(_read_ident_before(body, i))
-            i += 1
-            continue
-        if ch == ")":
-            if paren_stack:
+    text, kinds, starts, ends = stream.text, stream.kinds, stream.starts, stream.ends
+    for i in range(start, end):
+        kind = kinds[i]
+        if kind == _PUNCT:
+            char = text[starts[i]]
+            if char == "(":
+                paren_stack.append(_read_ident_before(stream, i, start))
+            elif char == ")" and paren_stack:
                 paren_stack.pop()
-            i += 1
-            continue
-        i += 1
+        elif kind == _BACKTICK:
+            refs.append(_BacktickRef(name=text[starts[i] + 1 : ends[i] - 1], stack=list(paren_stack), in_string=False))
+        elif kind == _STRING and "`" in text[starts[i] : ends[i]]:
+            for name in _STRING_REF_REGEX.findall(text, starts[i], ends[i]):
+                refs.append(_BacktickRef(name=name, stack=list(paren_stack), in_string=True))
     return refs
 
 
@@ -278,130 +265,157 @@ def _varargs_base(refs: List[_BacktickRef]) -> Optional[str]:
     return base if seen else None
 
 
-def _parse_file(path: Path) -> List[_SclBlock]:  # pylint: disable=too-many-branches,too-many-locals,too-many-statements
-    raw = path.read_text(encoding="utf-8")
-    text = _strip_comments(raw)
+def _is_block_keyword(stream: _TokenStream, index: int) -> bool:
+    end = stream.ends[index]
+    return (
+        stream.kinds[index] == _IDENT
+        and end - stream.starts[index] == len("block")
+        and stream.text.startswith("block", stream.starts[index])
+        and index + 1 < len(stream)
+        and (stream.text[end].isspace() or stream.text[end] == "#")
+    )
+
+
+def _parse_block(stream: _TokenStream, index: int, path: Path) -> Optional[Tuple[_SclBlock, int]]:
+    """Parse `block <context> <name> ( <params> ) { <body> }` starting at the
+    `block` token at `index`. Returns the block and the index of the first
+    token after it, or None if the tokens do not form a block.
+    """
+    if index + 3 >= len(stream) or stream.kinds[index + 1] != _IDENT or stream.kinds[index + 2] != _IDENT:
+        return None
+    context = stream.token_text(index + 1)
+    name = stream.token_text(index + 2)
+    if context not in _BLOCK_CONTEXTS or not stream.is_punct(index + 3, "(") or index + 3 not in stream.matching:
+        return None
+    params_close = stream.matching[index + 3]
+
+    # Find body braces
+    body_text = ""
+    body_start = body_end = next_index = params_close + 1
+    if next_index < len(stream) and stream.is_punct(next_index, "{") and next_index in stream.matching:
+        body_start, body_end = next_index + 1, stream.matching[next_index]
+        body_text = stream.text_between(stream.ends[next_index], stream.starts[body_end])
+        next_index = body_end + 1
+
+    refs = _scan_body(stream, body_start, body_end)
+    has_varargs = any(ref.name == _VARARGS_TOKEN for ref in refs)
+    line, column = stream.get_position(stream.starts[index])
+    block = _SclBlock(
+        context=context,
+        name=name,
+        params=_split_params(stream, index + 4, params_close),
+        has_varargs=has_varargs,
+        base_driver=_varargs_base(refs) if has_varargs else None,
+        body=body_text,
+        refs=refs,
+        file_path=path,
+        line=line,
+        column=column,
+    )
+    return block, next_index
+
+
+def _parse_file(path: Path, source_tree: Optional[SourceTree] = None) -> List[_SclBlock]:
+    raw = source_tree.read_text(path) if source_tree else path.read_text(encoding="utf-8")
+    return _parse_text(path, raw)
+
+
+def _parse_text(path: Path, text: str) -> List[_SclBlock]:
+    stream = _tokenize(text)
     blocks: List[_SclBlock] = []
     i = 0
-    n = len(text)
-    while i < n:
-        # Find the next occurrence of the keyword `block` at a word boundary.
-        idx = text.find("block", i)
-        if idx < 0:
-            break
-        # word-boundary check
-        if idx > 0 and (text[idx - 1].isalnum() or text[idx - 1] in "_-`"):
-            i = idx + 1
-            continue
-        after = idx + len("block")
-        if after >= n or not text[after].isspace():
-            i = idx + 1
-            continue
-        # Parse: block <context> <name> ( <params> ) { <body> }
-        j = after
-        while j < n and text[j].isspace():
-            j += 1
-        ctx_start = j
-        while j < n and (text[j].isalnum() or text[j] in "_-"):
-            j += 1
-        context = text[ctx_start:j]
-        if context not in _BLOCK_CONTEXTS:
-            i = idx + 1
-            continue
-        while j < n and text[j].isspace():
-            j += 1
-        name_start = j
-        while j < n and (text[j].isalnum() or text[j] in "_-"):
-            j += 1
-        name = text[name_start:j]
-        if not name:
-            i = idx + 1
-            continue
-        while j < n and text[j].isspace():
-            j += 1
-        if j >= n or text[j] != "(":
-            i = idx + 1
+    while i < len(stream):
+        if not _is_block_keyword(stream, i):
+            i += 1
             continue
-        try:
-            params_close = _find_matching(text, j, "(", ")")
-        except ValueError:
-            i = idx + 1
+        parsed = _parse_block(stream, i, path)
+        if parsed is None:
+            i += 1
             continue
-        params_text = text[j + 1 : params_close]
-        params = _split_params(params_text)
-        # Find body braces
-        k = params_close + 1
-        while k < n and text[k].isspace():
-            k += 1
-        body_text = ""
-        if k < n and text[k] == "{":
-            try:
-                body_close = _find_matching(text, k, "{", "}")
-                body_text = text[k + 1 : body_close]
-                next_pos = body_close + 1
-            except ValueError:
-                next_pos = params_close + 1
-        else:
-            next_pos = params_close + 1
-
-        refs = _scan_body(body_text)
-        has_varargs = any(ref.name == _VARARGS_TOKEN for ref in refs)
-        base_driver = _varargs_base(refs) if has_varargs else None
-
-        # Compute line number of the block keyword for diagnostics
-        line_no = text.count("\n", 0, idx) + 1
-        blocks.append(
-            _SclBlock(
-                context=context,
-                name=name,
-                params=params,
-                has_varargs=has_varargs,
-                base_driver=base_driver,
-                body=body_text,
-                refs=refs,
-                file_path=path,
-                line=line_no,
-            )
-        )
-        i = next_pos
+        block, i = parsed
+        blocks.append(block)
     return blocks
 
 
-def _norm(name: str) -> str:
-    """Normalize a name for hyphen/underscore-insensitive comparison."""
-    return name.replace("_", "-")
+def _get_cache_keys(texts: Dict[Path, str]) -> Dict[Path, str]:
+    """Key the parsed blocks of a file by the hash of its content, and of this loader."""
+    loader_hasher = hashlib.sha256(Path(__file__).read_bytes())
+    keys: Dict[Path, str] = {}
+    for path, text in texts.items():
+        hasher = loader_hasher.copy()
+        hasher.update(text.encode("utf-8"))
+        keys[path] = hasher.hexdigest()
+    return keys
 
 
-def _find_block(node: Block, name: str) -> Optional[Block]:
-    norm = _norm(name)
-    return next((b for b in node.blocks if _norm(b.name) == norm), None)
+def _get_cache_dir(work_dir: Path, scl_dir: Path) -> Path:
+    """The SCL directories sharing `work_dir` have their own caches, so their sweeps keep each other's files."""
+    return work_dir / "scl" / hashlib.sha256(str(scl_dir).encode("utf-8")).hexdigest()[:16]
 
 
-def _find_option(node: Block, name: str) -> Optional[Option]:
-    norm = _norm(name)
-    return next((o for o in node.options if o.name and _norm(o.name) == norm), None)
+def _load_cached_blocks(cache_dir: Path, key: str, path: Path) -> Optional[List[_SclBlock]]:
+    cache_file = cache_dir / f"{key}.pickle"
+    if not cache_file.is_file():
+        return None
+    try:
+        with cache_file.open("rb") as file:
+            blocks: List[_SclBlock] = pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError):
+        # A truncated cache file, or one pickled by an incompatible loader, is parsed again and overwritten
+        return None
+    # the same content may have been cached for another path
+    return [replace(block, file_path=path) for block in blocks]
 
 
-def _walk_path(base: Block, path: List[str]) -> Optional[object]:
-    """Walk `path` inside `base`. Each segment is matched against sub-blocks
-    first, then options. Returns the leaf Block or Option, or None if the
-    path cannot be fully resolved.
+def _store_cached_blocks(cache_dir: Path, key: str, blocks: List[_SclBlock]) -> None:
+    temporary_cache_file = cache_dir / f"{key}.pickle.tmp"
+    with temporary_cache_file.open("wb") as file:
+        pickle.dump(blocks, file)
+    temporary_cache_file.replace(cache_dir / f"{key}.pickle")
+
+
+def _parse_texts(texts: Dict[Path, str], jobs: int) -> Dict[Path, List[_SclBlock]]:
+    paths = sorted(texts)
+    if jobs <= 1 or sum(len(text) for text in texts.values()) < PARALLEL_SCL_PARSING_MIN_BYTES:
+        return {path: _parse_text(path, texts[path]) for path in paths}
+
+    print(f"    Parsing {len(paths)} SCL files in {jobs} worker processes.")
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        chunk_size = max(1, len(paths) // (jobs * 4))
+        parsed = executor.map(_parse_text, paths, [texts[path] for path in paths], chunksize=chunk_size)
+        return dict(zip(paths, parsed))
+
+
+def _parse_files(scl_dir: Path, texts: Dict[Path, str], work_dir: Optional[Path], jobs: int) -> List[_SclBlock]:
+    """Parse the SCL files of `scl_dir`, and return their blocks in the sorted order of the paths.
+
+    With `work_dir`, the blocks of each file are cached under `<work-dir>/scl/<scl-dir-hash>/`,
+    and only the files with a new content are parsed, in `jobs` worker processes.
     """
-    node: Block = base
-    for idx, seg in enumerate(path):
-        nb = _find_block(node, seg)
-        if nb is not None:
-            node = nb
-            if idx == len(path) - 1:
-                return nb
-            continue
-        no = _find_option(node, seg)
-        if no is not None:
-            if idx == len(path) - 1:
-                return no
-            return None  # options cannot have sub-things
-        return None
-    return node
+    if work_dir is None:
+        blocks_by_path = _parse_texts(texts, jobs)
+        return [block for path in sorted(texts) for block in blocks_by_path[path]]
+
+    cache_dir = _get_cache_dir(work_dir, scl_dir)
+    keys = _get_cache_keys(texts)
+    blocks_by_path = {}
+    for path, key in keys.items():
+        cached_blocks = _load_cached_blocks(cache_dir, key, path)
+        if cached_blocks is not None:
+            blocks_by_path[path] = cached_blocks
+
+    parsed_blocks_by_path = _parse_texts({path: texts[path] for path in texts if path not in blocks_by_path}, jobs)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for path, blocks in parsed_blocks_by_path.items():
+        _store_cached_blocks(cache_dir, keys[path], blocks)
+    blocks_by_path.update(parsed_blocks_by_path)
+
+    current_keys = set(keys.values())
+    for stale_cache_file in cache_dir.glob("*.pickle"):
+        if stale_cache_file.stem not in current_keys:
+            stale_cache_file.unlink()
+
+    return [block for path in sorted(texts) for block in blocks_by_path[path]]
 
 
 def _consumption(block: _SclBlock) -> Tuple[Set[str], Dict[str, List[str]]]:
@@ -429,7 +443,7 @@ def _consumption(block: _SclBlock) -> Tuple[Set[str], Dict[str, List[str]]]:
         path_in_base = ref.stack[1:]
         if not path_in_base:
             continue
-        consumed_top.add(_norm(path_in_base[0]))
+        consumed_top.add(normalize_name(path_in_base[0]))
         if ref.in_string:
             continue
         if ref.name in inflate and inflate[ref.name] != path_in_base:
@@ -441,106 +455,247 @@ def _consumption(block: _SclBlock) -> Tuple[Set[str], Dict[str, List[str]]]:
     return consumed_top, inflate
 
 
-def _inflate_param(driver: Driver, param_name: str, leaf: object) -> None:
-    """Replace declared `param_name` option with content derived from `leaf`."""
-    if isinstance(leaf, Block):
-        try:
-            driver.remove_option(param_name)
-        except KeyError:
-            pass
-        new_block = Block(param_name)
-        for o in leaf.options:
-            new_block.add_option(o.copy())
-        for b in leaf.blocks:
-            new_block.add_block(b.copy())
-        driver.add_block(new_block)
-    elif isinstance(leaf, Option):
-        try:
-            driver.remove_option(param_name)
-        except KeyError:
-            pass
-        driver.add_option(Option(name=param_name, params=set(leaf.params)))
-
-
 def _build_driver(block: _SclBlock, base_driver: Optional[Driver]) -> Driver:
     # Normalize underscores to hyphens on emit: axosyslog accepts both and
     # hyphens are the convention used everywhere else in the driver DB.
-    driver = Driver(block.context, _norm(block.name))
-    # Seed declared params with opaque <empty>; consumed ones get replaced.
-    for param in block.params:
-        driver.add_option(Option(name=_norm(param.name), params={("<empty>",)}))
+    declared_names = [normalize_name(param.name) for param in block.params]
     if base_driver is None:
+        driver = Driver(block.context, normalize_name(block.name))
+        # Seed declared params with opaque <empty>
+        for declared_name in declared_names:
+            driver.add_option(Option(name=declared_name, params={("<empty>",)}))
         return driver
     consumed_top, inflate = _consumption(block)
-    hard_excludes = {_norm(n) for n in SCL_INHERITANCE_EXCLUDES.get(block.base_driver or "", set())}
-    forbidden = consumed_top | hard_excludes
-    for opt in base_driver.options:
-        if opt.name is not None and _norm(opt.name) in forbidden:
-            continue
-        driver.add_option(opt.copy())
-    for blk in base_driver.blocks:
-        if _norm(blk.name) in forbidden:
-            continue
-        driver.add_block(blk.copy())
-    for param_name, path in inflate.items():
-        leaf = _walk_path(base_driver, path)
-        if leaf is not None:
-            _inflate_param(driver, _norm(param_name), leaf)
-    return driver
+    hard_excludes = {normalize_name(n) for n in SCL_INHERITANCE_EXCLUDES.get(block.base_driver or "", set())}
+    # The options of the base driver are copied when the driver is first accessed
+    return InheritingDriver(
+        block.context,
+        normalize_name(block.name),
+        base_driver,
+        declared_names,
+        consumed_top | hard_excludes,
+        {normalize_name(param_name): path for param_name, path in inflate.items()},
+    )
+
+
+def _find_scl_base(block: _SclBlock, by_key: Dict[Tuple[str, str], _SclBlock]) -> Optional[_SclBlock]:
+    if not block.has_varargs or not block.base_driver:
+        return None
+    return by_key.get((block.context, block.base_driver))
 
 
-def _resolve(blocks: List[_SclBlock], grammar_db: DriverDB) -> DriverDB:
-    by_key: Dict[Tuple[str, str], _SclBlock] = {(b.context, b.name): b for b in blocks}
-    out = DriverDB()
+def _find_cycles(blocks: List[_SclBlock], by_key: Dict[Tuple[str, str], _SclBlock]) -> List[List[_SclBlock]]:
+    """Return the inheritance cycles among `blocks`.
+
+    Every block inherits from at most one SCL block, so each cycle is found by
+    following the base blocks until a block already visited is reached.
+    """
+    cycles: List[List[_SclBlock]] = []
+    visited_by: Dict[int, int] = {}
+    for start_index, block in enumerate(blocks):
+        path: List[_SclBlock] = []
+        current: Optional[_SclBlock] = block
+        while current is not None and id(current) not in visited_by:
+            visited_by[id(current)] = start_index
+            path.append(current)
+            current = _find_scl_base(current, by_key)
+        if current is not None and visited_by[id(current)] == start_index:
+            cycle_start = next(i for i, path_block in enumerate(path) if path_block is current)
+            cycles.append(path[cycle_start:])
+    return cycles
+
+
+def _report_cycles(blocks: List[_SclBlock], by_key: Dict[Tuple[str, str], _SclBlock]) -> Set[int]:
+    """Print the inheritance cycles, and return the id() of their members."""
+    cycle_members: Set[int] = set()
+    for cycle in _find_cycles(blocks, by_key):
+        cycle_members.update(id(block) for block in cycle)
+        chain = " -> ".join(f"{block.context}/{block.name}" for block in cycle + cycle[:1])
+        print(f"    SCL cycle detected at {cycle[0].location}: {chain}; emitting declared params only")
+    return cycle_members
+
+
+def _topological_levels(
+    blocks: List[_SclBlock], by_key: Dict[Tuple[str, str], _SclBlock], cycle_members: Set[int]
+) -> List[List[_SclBlock]]:
+    """Group `blocks` into levels, each block inheriting from a block of the previous level only.
+
+    The blocks of a level do not depend on each other. The members of the
+    cycles are put into the first level, as if they had no SCL base.
+    """
+    level: List[_SclBlock] = []
+    dependents: Dict[int, List[_SclBlock]] = {}
+    for block in blocks:
+        base = _find_scl_base(block, by_key)
+        if base is None or id(block) in cycle_members:
+            level.append(block)
+        else:
+            dependents.setdefault(id(base), []).append(block)
+
+    levels: List[List[_SclBlock]] = []
+    while level:
+        levels.append(level)
+        level = [
+            dependent
+            for block in level
+            for dependent in dependents.get(id(block), [])
+            if id(dependent) not in cycle_members
+        ]
+    return levels
 
-    def resolve(block: _SclBlock, stack: Set[Tuple[str, str]]) -> Optional[Driver]:
-        key = (block.context, block.name)
-        if key in stack:
-            print(f"    SCL cycle detected at {block.file_path}:{block.line} for {key}")
+
+@dataclass
+class _PreviousResolution:
+    """The drivers resolved by an earlier load of the same SCL directory, and the
+    (context, normalized name) of the drivers defined by the files changed since,
+    before and after the change."""
+
+    driver_db: DriverDB
+    stale_keys: Set[Tuple[str, str]]
+    # the blocks whose drivers are reused, by their id()
+    reused: Set[int] = field(default_factory=set)
+
+    def find_reusable_driver(self, block: _SclBlock, by_key: Dict[Tuple[str, str], _SclBlock]) -> Optional[Driver]:
+        """The driver resolved earlier for `block`, if neither the block nor its bases changed since."""
+        if (block.context, normalize_name(block.name)) in self.stale_keys:
             return None
-        base_driver: Optional[Driver] = None
         if block.has_varargs and block.base_driver:
-            base_key = (block.context, block.base_driver)
-            if base_key in by_key:
-                base_driver = resolve(by_key[base_key], stack | {key})
-            else:
-                try:
-                    base_driver = grammar_db.get_driver(block.context, block.base_driver)
-                except KeyError:
-                    base_driver = None
-            if base_driver is None:
-                print(
-                    f"    SCL block {block.context}/{block.name} at "
-                    f"{block.file_path}:{block.line}: base driver {block.base_driver!r} not found"
-                )
-        elif block.has_varargs and not block.base_driver:
-            print(
-                f"    SCL block {block.context}/{block.name} at {block.file_path}:{block.line}: "
-                f"__VARARGS__ present but base driver not resolvable; emitting declared params only"
-            )
-        driver = _build_driver(block, base_driver)
-        out.add_driver(driver)
-        block.resolved = True
+            base = by_key.get((block.context, block.base_driver))
+            if base is not None and id(base) not in self.reused:
+                return None
+            if base is None and (block.context, normalize_name(block.base_driver)) in self.stale_keys:
+                return None  # the base was an SCL block of a changed file
+        try:
+            driver = self.driver_db.get_driver(block.context, normalize_name(block.name))
+        except KeyError:
+            return None
+        self.reused.add(id(block))
         return driver
 
-    for block in blocks:
-        if not block.resolved:
-            resolve(block, set())
+
+def _resolve(  # pylint: disable=too-many-locals
+    blocks: List[_SclBlock],
+    grammar_db: DriverDB,
+    inheriting_from: Optional[Set[Tuple[str, str]]] = None,
+    previous: Optional[_PreviousResolution] = None,
+) -> DriverDB:
+    by_key: Dict[Tuple[str, str], _SclBlock] = {(b.context, b.name): b for b in blocks}
+    out = DriverDB()
+    # keys of the SCL blocks inheriting, directly or through other SCL blocks, from `inheriting_from`
+    inheriting: Set[Tuple[str, str]] = set()
+    # the drivers built, by the id() of their blocks; each block is built exactly once
+    drivers: Dict[int, Driver] = {}
+    # The drivers of blocks with the same name are merged in `out`, so they cannot be reused one by one,
+    # and the drivers built are copied into `out`, as they may be the bases of other drivers
+    unique_names = len({(b.context, normalize_name(b.name)) for b in blocks}) == len(blocks)
+    if not unique_names:
+        previous = None
+    emit_driver = out.adopt_driver if unique_names else out.add_driver
+
+    cycle_members = _report_cycles(blocks, by_key)
+    for level in _topological_levels(blocks, by_key, cycle_members):
+        for block in level:
+            previous_driver = None if previous is None else previous.find_reusable_driver(block, by_key)
+            if previous_driver is not None:
+                drivers[id(block)] = previous_driver
+                out.adopt_driver(previous_driver)
+                continue
+            key = (block.context, block.name)
+            base_driver: Optional[Driver] = None
+            if block.has_varargs and block.base_driver and id(block) not in cycle_members:
+                base_key = (block.context, block.base_driver)
+                if base_key in by_key:
+                    base_driver = drivers[id(by_key[base_key])]
+                    if base_key in inheriting:
+                        inheriting.add(key)
+                else:
+                    if inheriting_from is not None and base_key in inheriting_from:
+                        inheriting.add(key)
+                    try:
+                        base_driver = grammar_db.get_driver(block.context, block.base_driver)
+                    except KeyError:
+                        print(
+                            f"    SCL block {block.context}/{block.name} at {block.location}: "
+                            f"base driver {block.base_driver!r} not found"
+                        )
+            elif block.has_varargs and not block.base_driver:
+                print(
+                    f"    SCL block {block.context}/{block.name} at {block.location}: "
+                    f"__VARARGS__ present but base driver not resolvable; emitting declared params only"
+                )
+            driver = _build_driver(block, base_driver)
+            drivers[id(block)] = driver
+            if inheriting_from is None or key in inheriting:
+                emit_driver(driver)
     return out
 
 
-def load_scl(scl_dir: Path, grammar_db: DriverDB) -> DriverDB:
+def _read_texts(scl_dir: Path, source_tree: SourceTree) -> Dict[Path, str]:
+    texts: Dict[Path, str] = {}
+    for conf in sorted(source_tree.rglob(scl_dir, "*.conf")):
+        try:
+            texts[conf] = source_tree.read_text(conf)
+        except (OSError, UnicodeDecodeError) as exc:  # pragma: no cover - defensive
+            print(f"    SCL parse error in {conf}: {exc}")
+    return texts
+
+
+def load_scl(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    scl_dir: Path,
+    grammar_db: DriverDB,
+    inheriting_from: Optional[Set[Tuple[str, str]]] = None,
+    source_tree: Optional[SourceTree] = None,
+    work_dir: Optional[Path] = None,
+    jobs: int = 1,
+) -> DriverDB:
     """Walk `scl_dir` for *.conf files, parse `block` definitions, and emit a
     DriverDB whose drivers include the SCL wrappers with options inherited
     from their VARARGS base driver (looked up in `grammar_db` or in another
     SCL block parsed in this pass).
+
+    If `inheriting_from` is given, only the SCL wrappers inheriting from one of
+    these (context, name) grammar drivers are emitted, directly or through
+    other SCL blocks.
+
+    `scl_dir` is read through `source_tree`, which defaults to the local directory.
+    With `work_dir`, the parsed blocks of the files are cached there, see _parse_files().
     """
-    if not scl_dir.is_dir():
+    if source_tree is None:
+        source_tree = DirectorySourceTree(scl_dir)
+    if not source_tree.is_dir(scl_dir):
         return DriverDB()
-    blocks: List[_SclBlock] = []
-    for conf in sorted(scl_dir.rglob("*.conf")):
-        try:
-            blocks.extend(_parse_file(conf))
-        except (ValueError, OSError, UnicodeDecodeError) as exc:  # pragma: no cover - defensive
-            print(f"    SCL parse error in {conf}: {exc}")
-    return _resolve(blocks, grammar_db)
+    return _resolve(
+        _parse_files(scl_dir, _read_texts(scl_dir, source_tree), work_dir, jobs), grammar_db, inheriting_from
+    )
+
+
+def reload_scl(
+    scl_dir: Path,
+    grammar_db: DriverDB,
+    previous_db: DriverDB,
+    stale_keys: Set[Tuple[str, str]],
+    work_dir: Optional[Path] = None,
+) -> DriverDB:
+    """Like load_scl(), but reuse the drivers of `previous_db`, that an earlier
+    load_scl() of `scl_dir` returned with the same `grammar_db`.
+
+    `stale_keys` are the (context, normalized name) of the drivers defined by the
+    files changed since, both before and after the change, see get_scl_driver_keys().
+    Only these drivers, and the ones inheriting from them, are resolved again.
+    `previous_db` must not be used afterwards, its drivers are moved to the returned DriverDB.
+    """
+    source_tree = DirectorySourceTree(scl_dir)
+    if not source_tree.is_dir(scl_dir):
+        return DriverDB()
+    blocks = _parse_files(scl_dir, _read_texts(scl_dir, source_tree), work_dir, 1)
+    return _resolve(blocks, grammar_db, previous=_PreviousResolution(previous_db, stale_keys))
+
+
+def get_scl_driver_keys(scl_dir: Path, work_dir: Optional[Path] = None) -> Dict[Path, Set[Tuple[str, str]]]:
+    """The (context, normalized name) of the drivers defined by each SCL file of `scl_dir`."""
+    source_tree = DirectorySourceTree(scl_dir)
+    texts = _read_texts(scl_dir, source_tree) if source_tree.is_dir(scl_dir) else {}
+    keys: Dict[Path, Set[Tuple[str, str]]] = {path: set() for path in texts}
+    for block in _parse_files(scl_dir, texts, work_dir, 1):
+        keys[block.file_path].add((block.context, normalize_name(block.name)))
+    return keys
@@ -0,0 +1,100 @@
+"""Load the grammar files with bison processes running concurrently.
+
+DCFG.from_yacc_file() blocks on its bison process, so loading the grammar files
+one after another keeps one CPU busy only. YaccFileLoader calls it in worker
+threads for the grammar files needed next, at most `max_concurrency` of them
+at a time, while the grammars already loaded are processed. Only that many
+loaded grammars wait in memory to be taken.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from types import TracebackType
+from typing import Deque, Dict, Iterable, Optional, Tuple, Type
+
+from neologism import DCFG
+
+from .source_tree import SourceTree
+
+
+class YaccFileLoader:
+    """Loads the grammar files of `source_tree` with DCFG.from_yacc_file().
+
+    The grammar files queued with prefetch() are loaded in the background, in the
+    order they are queued, so load() takes them without waiting for bison if they
+    are needed in that order. Any other grammar file is loaded when it is needed.
+    """
+
+    def __init__(self, source_tree: SourceTree, max_concurrency: int) -> None:
+        self.__source_tree = source_tree
+        self.__max_concurrency = max(max_concurrency, 1)
+        self.__executor: Optional[ThreadPoolExecutor] = None
+        self.__queue: Deque[Path] = deque()
+        # The local files are kept until the grammars are taken. They are created in the
+        # calling thread, as a source tree is not safe to read from several threads.
+        self.__running: Dict[Path, Tuple[Future[DCFG], ExitStack]] = {}
+
+    def __enter__(self) -> YaccFileLoader:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def __start(self, grammar_file: Path) -> None:
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(self.__max_concurrency, thread_name_prefix="bison")
+
+        local_file_stack = ExitStack()
+        local_file = local_file_stack.enter_context(self.__source_tree.local_file(grammar_file))
+        self.__running[grammar_file] = (self.__executor.submit(DCFG.from_yacc_file, local_file), local_file_stack)
+
+    def __fill(self) -> None:
+        while self.__queue and len(self.__running) < self.__max_concurrency:
+            grammar_file = self.__queue.popleft()
+            if grammar_file not in self.__running:
+                self.__start(grammar_file)
+
+    def prefetch(self, grammar_files: Iterable[Path]) -> None:
+        """Queue the grammar files to be loaded in the background."""
+        self.__queue.extend(grammar_files)
+        self.__fill()
+
+    def load(self, grammar_file: Path) -> DCFG:
+        """The grammar of `grammar_file`, like DCFG.from_yacc_file() loads it.
+
+        :raise ChildProcessError: If bison is not available on the system.
+        :raise YaccDecodeError: If bison fails to parse the grammar file.
+        """
+        if grammar_file not in self.__running:
+            if grammar_file in self.__queue:
+                self.__queue.remove(grammar_file)
+            self.__start(grammar_file)
+
+        future, local_file_stack = self.__running.pop(grammar_file)
+        try:
+            return future.result()
+        finally:
+            local_file_stack.close()
+            self.__fill()
+
+    def close(self) -> None:
+        """Drop the queued grammar files, and wait for the running bison processes."""
+        self.__queue.clear()
+        for future, local_file_stack in self.__running.values():
+            if not future.cancel():
+                future.exception()
+            local_file_stack.close()
+        self.__running.clear()
+
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
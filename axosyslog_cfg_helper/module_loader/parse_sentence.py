@@ -1,4 +1,9 @@
-from typing import Set, Tuple
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
 from axosyslog_cfg_helper.driver_db import Block, DriverDB, Driver, Option
 
 
@@ -6,229 +11,299 @@ class ParseError(Exception):
     pass
 
 
-def __is_type(symbol: str) -> bool:
-    return symbol.startswith("<") and symbol.endswith(">")
-
-
-def __is_block(sentence: Tuple[str, ...]) -> bool:
-    if len(sentence) < 3:
-        return False
-
-    if __is_type(sentence[0]):
-        return False
+class Undetermined(Exception):
+    """The known symbols of a sentence prefix are not enough to take the next parsing step."""
 
-    if sentence[1] != "(":
-        return False
 
-    for symbol in sentence[2:]:
-        if symbol == ")":
-            return False
+@dataclass
+class _ParenTable:
+    """Positions looked up while parsing, computed once per sentence.
 
-        if symbol == "(":
-            return True
+    Each list is indexed by symbol position. The value is the position of the
+    symbol in question, or `len(sentence)` if there is no such symbol. Every
+    lookup is bounded by the end of the block being parsed, so a position at or
+    after that end means "not found".
+    """
 
-    raise ParseError(f"Block is not closed: {sentence}")
+    matching_paren: List[int]
+    next_open_paren: List[int]
+    next_close_paren: List[int]
+    next_paren: List[int]
+    toplevel_arrow: List[int]
 
 
-def __is_arrowed_option(sentence: Tuple[str, ...]) -> bool:
-    if len(sentence) < 3:
-        return False
+def _build_paren_table(sentence: Tuple[str, ...]) -> _ParenTable:
+    length = len(sentence)
+    matching_paren = [length] * length
+    open_parens: List[int] = []
 
-    if sentence[1] != "=>":
-        return False
-
-    return True
-
-
-def __toplevel_arrow_index(sentence: Tuple[str, ...]) -> int:
-    depth = 0
     for index, symbol in enumerate(sentence):
         if symbol == "(":
-            depth += 1
+            open_parens.append(index)
+        elif symbol == ")" and open_parens:
+            matching_paren[open_parens.pop()] = index
+
+    next_open_paren = [length] * (length + 1)
+    next_close_paren = [length] * (length + 1)
+    next_paren = [length] * (length + 1)
+    toplevel_arrow = [length] * (length + 1)
+
+    for index in range(length - 1, -1, -1):
+        symbol = sentence[index]
+        next_open_paren[index] = index if symbol == "(" else next_open_paren[index + 1]
+        next_close_paren[index] = index if symbol == ")" else next_close_paren[index + 1]
+        next_paren[index] = index if symbol in ("(", ")") else next_paren[index + 1]
+
+        if symbol == "=>":
+            toplevel_arrow[index] = index
+        elif symbol == "(":
+            closing = matching_paren[index]
+            toplevel_arrow[index] = toplevel_arrow[closing + 1] if closing < length else length
         elif symbol == ")":
-            if depth == 0:
-                return -1
-            depth -= 1
-        elif symbol == "=>" and depth == 0:
-            return index
-
-    return -1
-
-
-def __arrowed_lhs_is_single_field(lhs: Tuple[str, ...]) -> bool:
-    if "(" not in lhs:
-        return True
-
-    open_index = lhs.index("(")
-    if ")" in lhs[:open_index]:
-        return False
+            toplevel_arrow[index] = length
+        else:
+            toplevel_arrow[index] = toplevel_arrow[index + 1]
 
-    depth = 0
-    for index in range(open_index, len(lhs)):
-        if lhs[index] == "(":
-            depth += 1
-        elif lhs[index] == ")":
-            depth -= 1
-            if depth == 0:
-                return index == len(lhs) - 1
-
-    return False
-
-
-def __is_multi_token_arrowed_option(sentence: Tuple[str, ...]) -> bool:
-    arrow_index = __toplevel_arrow_index(sentence)
-    if arrow_index < 2:
-        return False
-
-    return __arrowed_lhs_is_single_field(sentence[:arrow_index])
-
-
-def __is_named_option(sentence: Tuple[str, ...]) -> bool:
-    if len(sentence) < 3:
-        return False
-
-    if sentence[1] != "(":
-        return False
-
-    return True
-
-
-def __is_positional_option(sentence: Tuple[str, ...]) -> bool:
-    if len(sentence) < 1:
-        raise ParseError(f"Too short sentence: {sentence}")
-
-    return __is_type(sentence[0])
-
-
-def __get_block_content(sentence: Tuple[str, ...]) -> Tuple[str, ...]:
-    expected_number_of_right_braces = 0
-    number_of_right_braces = 0
-
-    for i, symbol in enumerate(sentence):
-        if symbol == "(":
-            expected_number_of_right_braces += 1
+    return _ParenTable(matching_paren, next_open_paren, next_close_paren, next_paren, toplevel_arrow)
 
-        if symbol == ")":
-            number_of_right_braces += 1
 
-        if number_of_right_braces == expected_number_of_right_braces and expected_number_of_right_braces != 0:
-            return sentence[2:i]
-
-    raise ParseError(f"Block is not closed: {sentence}")
-
-
-def __get_named_option_name(sentence: Tuple[str, ...]) -> str:
-    return sentence[0]
-
-
-def __get_named_option_params(sentence: Tuple[str, ...]) -> Tuple[str, ...]:
-    return sentence[2 : sentence.index(")")]
-
-
-def __parse_block(sentence: Tuple[str, ...]) -> Tuple[Block, int]:
-    block = Block(sentence[0])
-
-    block_content = __get_block_content(sentence)
-    __parse_options_in_block(block_content, block)
-
-    number_of_processed_symbols = len(block_content) + 3
-    return (block, number_of_processed_symbols)
-
-
-def __parse_arrowed_option(sentence: Tuple[str, ...]) -> Tuple[Option, int]:
-    if len(sentence) < 4 or sentence[3] != "(":
-        option_params = sentence[0:2]
-    else:
-        option_params = sentence[0 : sentence.index(")") + 1]
-
-    option = Option(params={option_params})
-    return (option, len(option_params))
-
-
-def __parse_multi_token_arrowed_option(sentence: Tuple[str, ...]) -> Tuple[Option, int]:
-    arrow_index = __toplevel_arrow_index(sentence)
-
-    if len(sentence) > arrow_index + 2 and sentence[arrow_index + 2] == "(":
-        end = sentence.index(")", arrow_index + 2) + 1
-    else:
-        end = arrow_index + 2
-
-    option_params = sentence[0:end]
-    return (Option(params={option_params}), len(option_params))
+def _is_type(symbol: str) -> bool:
+    return symbol.startswith("<") and symbol.endswith(">")
 
 
-def __parse_named_option(sentence: Tuple[str, ...]) -> Tuple[Option, int]:
-    option_name = __get_named_option_name(sentence)
-    option_params = __get_named_option_params(sentence)
-    number_of_processed_symbols = len(option_params) + 3
+BlockPath = Tuple[str, ...]
+# An option found in the block at the path, or None when the block at the path is entered
+ParseEvent = Tuple[BlockPath, Optional[Option]]
 
-    if len(option_params) == 0:
-        option_params = ("<empty>",)
 
-    option = Option(option_name, {option_params})
+class BlockRange(NamedTuple):
+    path: BlockPath
+    open_paren: int
+    # None while the closing paren is not among the known symbols, see CursorParser
+    end: Optional[int]
 
-    return (option, number_of_processed_symbols)
 
+@dataclass
+class ParseState:
+    cursor: int
+    ranges: List[BlockRange]
+    # the symbols after the options, e.g. the closing paren of a driver
+    number_of_closing_symbols: int = 0
 
-def __parse_positional_option(sentence: Tuple[str, ...]) -> Tuple[Option, int]:
-    run_length = 0
-    while run_length < len(sentence) and __is_type(sentence[run_length]):
-        run_length += 1
-    return (Option(params={tuple(sentence[:run_length])}), run_length)
+    def copy(self) -> ParseState:
+        return ParseState(self.cursor, list(self.ranges), self.number_of_closing_symbols)
 
 
-def __mark_n_symbols_as_processed(processed: Set[int], start_index: int, number_of_symbols: int) -> None:
-    processed |= set(range(start_index, start_index + number_of_symbols))
+class CursorParser(ABC):  # pylint: disable=too-few-public-methods
+    """Parses the options of a sentence with a single cursor.
 
+    The cursor moves over the symbols of the blocks in `ParseState.ranges`, the innermost
+    last. Each step parses an option at the cursor or enters a block, and is recorded as a
+    ParseEvent. The subclasses tell how the symbols are looked up: the lookups return None if
+    the symbol is not found before `end`. When only a prefix of the sentence is known, `end` is
+    None for the ranges not closed among the known symbols, and a lookup needing the unknown
+    symbols raises Undetermined. The steps taken until then are kept in the state and events,
+    so the parsing can be continued from a copy of the state for each continuation of the prefix.
+    """
 
-def __parse_options_in_block(sentence: Tuple[str, ...], target_block: Block) -> None:
-    processed: Set[int] = set()
+    def __init__(self, symbols: Sequence[str]) -> None:
+        self._symbols = symbols
 
-    for i in range(len(sentence)):
-        if i in processed:
-            continue
+    @abstractmethod
+    def _in_range(self, position: int, end: Optional[int]) -> bool:
+        pass
 
-        number_of_parsed_symbols = 0
-        rest_of_sentence = sentence[i:]
-        if __is_multi_token_arrowed_option(rest_of_sentence):
-            arrowed_option, number_of_parsed_symbols = __parse_multi_token_arrowed_option(rest_of_sentence)
-            target_block.add_option(arrowed_option)
-        elif __is_block(rest_of_sentence):
-            block, number_of_parsed_symbols = __parse_block(rest_of_sentence)
-            target_block.add_block(block)
-        elif __is_arrowed_option(rest_of_sentence):
-            arrowed_option, number_of_parsed_symbols = __parse_arrowed_option(rest_of_sentence)
-            target_block.add_option(arrowed_option)
-        elif __is_named_option(rest_of_sentence):
-            named_option, number_of_parsed_symbols = __parse_named_option(rest_of_sentence)
-            target_block.add_option(named_option)
-        elif __is_positional_option(rest_of_sentence):
-            positional_option, number_of_parsed_symbols = __parse_positional_option(rest_of_sentence)
-            target_block.add_option(positional_option)
+    @abstractmethod
+    def _find_close_paren(self, start: int, end: Optional[int]) -> Optional[int]:
+        pass
 
-        __mark_n_symbols_as_processed(processed, i, number_of_parsed_symbols)
+    @abstractmethod
+    def _find_paren(self, start: int, end: Optional[int]) -> Optional[int]:
+        pass
 
+    @abstractmethod
+    def _find_matching_paren(self, open_paren: int, end: Optional[int]) -> Optional[int]:
+        pass
 
-def __parse_common_global_options(sentence: Tuple[str, ...]) -> Driver:
-    if sentence[-1] != ";":
-        raise ParseError("Common global options sentence does not end with ';'.")
+    @abstractmethod
+    def _find_multi_token_arrow(self, start: int, end: Optional[int]) -> Optional[int]:
+        """The `=>` of an option like `a b => c`, or `a(b) => c`."""
 
-    if not (sentence[1] == "{" and sentence[-2] == "}"):
-        raise ParseError("Common global options curly braces are missing.")
+    def __find_closing_paren(self, start: int, end: Optional[int]) -> int:
+        closing = self._find_close_paren(start, end)
+        if closing is None:
+            raise ParseError(f"Option is not closed: {tuple(self._symbols[start:end])}")
 
-    driver = Driver("options", DriverDB.GLOBAL_OPTIONS_DRIVER_NAME)
-    option_sentence = sentence[1:-2]
-    __parse_options_in_block(option_sentence, driver)
+        return closing
 
-    return driver
+    def __is_block(self, start: int, end: Optional[int]) -> bool:
+        if not self._in_range(start + 2, end):
+            return False
 
+        if _is_type(self._symbols[start]) or self._symbols[start + 1] != "(":
+            return False
 
-def parse_sentence(sentence: Tuple[str, ...]) -> Driver:
+        paren = self._find_paren(start + 2, end)
+        if paren is None:
+            raise ParseError(f"Block is not closed: {tuple(self._symbols[start:end])}")
+
+        return self._symbols[paren] == "("
+
+    def __parse_option(self, start: int, end: Optional[int]) -> Tuple[Optional[Option], int]:
+        """The option at `start` and the position after it. No option and `start` at a block."""
+        symbols = self._symbols
+
+        arrow = self._find_multi_token_arrow(start, end)
+        if arrow is not None:
+            if self._in_range(arrow + 2, end) and symbols[arrow + 2] == "(":
+                option_end = self.__find_closing_paren(arrow + 2, end) + 1
+            else:
+                option_end = arrow + 2 if self._in_range(arrow + 1, end) else arrow + 1
+            return (Option(params={tuple(symbols[start:option_end])}), option_end)
+
+        if self.__is_block(start, end):
+            return (None, start)
+
+        if self._in_range(start + 2, end) and symbols[start + 1] == "=>":
+            if not self._in_range(start + 3, end) or symbols[start + 3] != "(":
+                option_end = start + 2
+            else:
+                option_end = self.__find_closing_paren(start, end) + 1
+            return (Option(params={tuple(symbols[start:option_end])}), option_end)
+
+        if self._in_range(start + 2, end) and symbols[start + 1] == "(":
+            params = tuple(symbols[start + 2 : self.__find_closing_paren(start, end)])
+            return (Option(symbols[start], {params or ("<empty>",)}), start + len(params) + 3)
+
+        if _is_type(symbols[start]):
+            option_end = start
+            while self._in_range(option_end, end) and _is_type(symbols[option_end]):
+                option_end += 1
+            return (Option(params={tuple(symbols[start:option_end])}), option_end)
+
+        return (None, start + 1)
+
+    def __enter_block(self, state: ParseState, events: List[ParseEvent]) -> None:
+        current = state.ranges[-1]
+        start = state.cursor
+        end: Optional[int]
+
+        if self._symbols[start] == ")":
+            open_paren, end = start, start + 2
+        else:
+            open_paren = start if self._symbols[start] == "(" else start + 1
+            try:
+                end = self._find_matching_paren(open_paren, current.end)
+                if end is None:
+                    raise ParseError(f"Block is not closed: {tuple(self._symbols[start:current.end])}")
+            except Undetermined:
+                end = None
+
+        path = current.path + (self._symbols[start],)
+        events.append((path, None))
+        state.ranges.append(BlockRange(path, open_paren, end))
+        state.cursor = start + 2
+
+    def __resolve_block_ends(self, state: ParseState) -> None:
+        """Look up the ends of the ranges not closed among the symbols known when they were entered."""
+        for index in range(1, len(state.ranges)):
+            block_range = state.ranges[index]
+            if block_range.end is not None:
+                continue
+
+            end = self._find_matching_paren(block_range.open_paren, state.ranges[index - 1].end)
+            if end is None:
+                raise ParseError(f"Block is not closed: {tuple(self._symbols[block_range.open_paren - 1 :])}")
+            state.ranges[index] = block_range._replace(end=end)
+
+    def advance(self, state: ParseState, events: List[ParseEvent]) -> None:
+        """Take parsing steps until every range of `state` is parsed. Raises Undetermined
+        at the first step needing unknown symbols."""
+        self.__resolve_block_ends(state)
+
+        while state.ranges:
+            current = state.ranges[-1]
+            if not self._in_range(state.cursor, current.end):
+                state.ranges.pop()
+                state.cursor = (current.end or 0) + 1
+                continue
+
+            option, option_end = self.__parse_option(state.cursor, current.end)
+            if option is None and option_end == state.cursor:
+                self.__enter_block(state, events)
+                continue
+
+            if option is not None:
+                events.append((current.path, option))
+            state.cursor = max(option_end, state.cursor + 1)
+
+
+class _SentenceParser(CursorParser):  # pylint: disable=too-few-public-methods
+    """Looks up the symbols of a whole sentence in its paren table."""
+
+    def __init__(self, sentence: Tuple[str, ...]) -> None:
+        super().__init__(sentence)
+        self.__length = len(sentence)
+        self.__table = _build_paren_table(sentence)
+
+    def __found(self, position: int, end: Optional[int]) -> Optional[int]:
+        return position if position < (self.__length if end is None else end) else None
+
+    def _in_range(self, position: int, end: Optional[int]) -> bool:
+        return position < (self.__length if end is None else end)
+
+    def _find_close_paren(self, start: int, end: Optional[int]) -> Optional[int]:
+        return self.__found(self.__table.next_close_paren[start], end)
+
+    def _find_paren(self, start: int, end: Optional[int]) -> Optional[int]:
+        return self.__found(self.__table.next_paren[start], end)
+
+    def _find_matching_paren(self, open_paren: int, end: Optional[int]) -> Optional[int]:
+        return self.__found(self.__table.matching_paren[open_paren], end)
+
+    def _find_multi_token_arrow(self, start: int, end: Optional[int]) -> Optional[int]:
+        arrow = self.__found(self.__table.toplevel_arrow[start], end)
+        if arrow is None or arrow < start + 2:
+            return None
+
+        open_paren = self.__table.next_open_paren[start]
+        if open_paren >= arrow or self.__table.matching_paren[open_paren] == arrow - 1:
+            return arrow
+
+        return None
+
+
+def add_parse_event(driver: Block, path: BlockPath, option: Optional[Option]) -> None:
+    """Add the block at `path`, relative to `driver`, and `option` into it."""
+    block = driver
+    for block_name in path:
+        try:
+            block = block.get_block(block_name)
+        except KeyError:
+            block.adopt_block(Block(block_name))
+            block = block.get_block(block_name)
+
+    if option is not None:
+        block.adopt_option(option)
+
+
+def get_sentence_frame(sentence: Tuple[str, ...]) -> Tuple[Driver, int, int]:
+    """Check the symbols around the options of the sentence.
+
+    Returns the (still empty) driver described by the sentence, and the range
+    of the symbols holding its options.
+    """
     if len(sentence) < 4:
         raise ParseError("Too short sentence.")
 
     if sentence[0] == "options":
-        return __parse_common_global_options(sentence)
+        if sentence[-1] != ";":
+            raise ParseError("Common global options sentence does not end with ';'.")
+
+        if not (sentence[1] == "{" and sentence[-2] == "}"):
+            raise ParseError("Common global options curly braces are missing.")
+
+        return (Driver("options", DriverDB.GLOBAL_OPTIONS_DRIVER_NAME), 1, len(sentence) - 2)
 
     if not sentence[0].startswith("LL_CONTEXT_"):
         raise ParseError("Context is missing.")
@@ -236,14 +311,24 @@ def parse_sentence(sentence: Tuple[str, ...]) -> Driver:
     if not (sentence[2] == "(" and sentence[-1] == ")"):
         raise ParseError("Braces are missing, probably not a driver.")
 
-    context = sentence[0].replace("LL_CONTEXT_", "").replace("_", "-").lower()
+    context = get_context_name(sentence[0])
     if context == "options":
-        driver = Driver(context, DriverDB.GLOBAL_OPTIONS_DRIVER_NAME)
-        option_sentence = sentence[1:]
-    else:
-        driver = Driver(context, sentence[1])
-        option_sentence = sentence[3:-1]
+        return (Driver(context, DriverDB.GLOBAL_OPTIONS_DRIVER_NAME), 1, len(sentence))
+
+    return (Driver(context, sentence[1]), 3, len(sentence) - 1)
+
+
+def get_context_name(context_symbol: str) -> str:
+    return context_symbol.replace("LL_CONTEXT_", "").replace("_", "-").lower()
+
+
+def parse_sentence(sentence: Tuple[str, ...]) -> Driver:
+    driver, options_start, options_end = get_sentence_frame(sentence)
 
-    __parse_options_in_block(option_sentence, driver)
+    events: List[ParseEvent] = []
+    state = ParseState(options_start, [BlockRange((), options_start - 1, options_end)])
+    _SentenceParser(sentence).advance(state, events)
+    for path, option in events:
+        add_parse_event(driver, path, option)
 
     return driver
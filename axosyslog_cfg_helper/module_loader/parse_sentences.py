@@ -0,0 +1,287 @@
+"""Parse a batch of sentences, sharing the work on their common prefixes.
+
+The sentences of a grammar share long prefixes and differ only in their tails:
+
+    LL_CONTEXT_DESTINATION http ( tls ( ca-file ( <path> ) ) )
+    LL_CONTEXT_DESTINATION http ( tls ( key-file ( <path> ) ) )
+
+They are inserted into a token trie (which also drops the exact duplicates),
+and the trie is walked depth first. At every branching point the parsing of
+the prefix is advanced as far as the known symbols determine it, and the
+children continue from there. A parsing step can look ahead past the current
+option (e.g. to find a top-level `=>`), so a step is only taken if every
+symbol it looks at is part of the prefix; otherwise it is left to the
+children. This way the result is exactly the merge of parse_sentence() over
+the sentences.
+
+The options found on a prefix are only applied to the result once a sentence
+under it parsed successfully, as a ParseError drops the whole sentence.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from axosyslog_cfg_helper.driver_db import Driver, DriverDB, DriverDBBuilder
+from .parse_sentence import (
+    BlockPath,
+    BlockRange,
+    CursorParser,
+    ParseError,
+    ParseEvent,
+    ParseState,
+    Undetermined,
+    add_parse_event,
+    get_context_name,
+    get_sentence_frame,
+)
+
+ErrorCallback = Callable[[Tuple[str, ...], ParseError], None]
+
+
+@dataclass
+class _TrieNode:
+    children: Dict[str, _TrieNode] = field(default_factory=dict)
+    is_sentence: bool = False
+
+    def insert(self, sentence: Tuple[str, ...]) -> None:
+        node = self
+        for symbol in sentence:
+            child = node.children.get(symbol)
+            if child is None:
+                child = node.children[symbol] = _TrieNode()
+            node = child
+        node.is_sentence = True
+
+    def iter_sentences(self, prefix: Tuple[str, ...]) -> Iterable[Tuple[str, ...]]:
+        if self.is_sentence:
+            yield prefix
+        for symbol, child in self.children.items():
+            yield from child.iter_sentences(prefix + (symbol,))
+
+
+@dataclass
+class _Segment:
+    depth: int
+    events: List[ParseEvent]
+    applied: bool = False
+
+
+class _PrefixParser(CursorParser):
+    """Looks up the known symbols of a sentence by scanning them. Ranges with an unknown end
+    may only be looked into before `known_end`, every other lookup raises Undetermined."""
+
+    def __init__(self, symbols: List[str], known_end: int) -> None:
+        super().__init__(symbols)
+        self.__known_end = known_end
+
+    def _in_range(self, position: int, end: Optional[int]) -> bool:
+        if end is not None:
+            return position < end
+
+        if position >= self.__known_end:
+            raise Undetermined()
+
+        return True
+
+    def __find(self, start: int, end: Optional[int], symbols: Tuple[str, ...]) -> Optional[int]:
+        position = start
+        while self._in_range(position, end):
+            if self._symbols[position] in symbols:
+                return position
+            position += 1
+
+        return None
+
+    def _find_close_paren(self, start: int, end: Optional[int]) -> Optional[int]:
+        return self.__find(start, end, (")",))
+
+    def _find_paren(self, start: int, end: Optional[int]) -> Optional[int]:
+        return self.__find(start, end, ("(", ")"))
+
+    def _find_matching_paren(self, open_paren: int, end: Optional[int]) -> Optional[int]:
+        depth = 0
+        position = open_paren
+        while self._in_range(position, end):
+            if self._symbols[position] == "(":
+                depth += 1
+            elif self._symbols[position] == ")":
+                depth -= 1
+                if depth == 0:
+                    return position
+            position += 1
+
+        return None
+
+    def _find_multi_token_arrow(self, start: int, end: Optional[int]) -> Optional[int]:
+        position = start
+        while self._in_range(position, end):
+            symbol = self._symbols[position]
+            if symbol == "=>":
+                return position if position >= start + 2 else None
+            if symbol == ")":
+                return None
+            if symbol == "(":
+                closing = self._find_matching_paren(position, end)
+                if closing is not None and self._in_range(closing + 1, end) and self._symbols[closing + 1] == "=>":
+                    return closing + 1
+                return None
+            position += 1
+
+        return None
+
+    def advance_known(self, state: ParseState, events: List[ParseEvent]) -> None:
+        """Take parsing steps until the ranges are all parsed or the next step is undetermined."""
+        try:
+            self.advance(state, events)
+        except Undetermined:
+            pass
+
+
+class _SentenceTrieParser:
+    def __init__(self, on_error: Optional[ErrorCallback]) -> None:
+        self.__on_error = on_error
+        self.__drivers: Dict[Tuple[str, str], Driver] = {}
+        self.__symbols: List[str] = []
+        self.__segments: List[_Segment] = []
+
+    @property
+    def drivers(self) -> Iterable[Driver]:
+        return self.__drivers.values()
+
+    def __report_error(self, sentence: Tuple[str, ...], exception: ParseError) -> None:
+        if self.__on_error is None:
+            return
+
+        try:
+            get_sentence_frame(sentence)
+        except ParseError as frame_exception:
+            exception = frame_exception
+
+        self.__on_error(sentence, exception)
+
+    def __report_errors(self, node: _TrieNode, exception: ParseError) -> None:
+        for sentence in node.iter_sentences(tuple(self.__symbols)):
+            self.__report_error(sentence, exception)
+
+    def __apply(self, events: List[ParseEvent]) -> None:
+        for path, option in events:
+            context, driver_name = path[0], path[1]
+            driver = self.__drivers.setdefault((context, driver_name), Driver(context, driver_name))
+            add_parse_event(driver, path[2:], option)
+
+    def __accept(self, events: List[ParseEvent]) -> None:
+        for segment in self.__segments:
+            if not segment.applied:
+                self.__apply(segment.events)
+                segment.applied = True
+
+        self.__apply(events)
+
+    def __start(self, events: List[ParseEvent]) -> Optional[ParseState]:
+        first_symbol = self.__symbols[0]
+
+        if first_symbol == "options":
+            path: BlockPath = ("options", DriverDB.GLOBAL_OPTIONS_DRIVER_NAME)
+            start, number_of_closing_symbols = 1, 2
+        elif not first_symbol.startswith("LL_CONTEXT_"):
+            return None
+        elif get_context_name(first_symbol) == "options":
+            path = ("options", DriverDB.GLOBAL_OPTIONS_DRIVER_NAME)
+            start, number_of_closing_symbols = 1, 0
+        else:
+            path = (get_context_name(first_symbol), self.__symbols[1])
+            start, number_of_closing_symbols = 3, 1
+
+        events.append((path, None))
+        return ParseState(start, [BlockRange(path, start - 1, None)], number_of_closing_symbols)
+
+    def __advance(self, node: _TrieNode, state: Optional[ParseState]) -> Optional[ParseState]:
+        """Parse the known symbols as far as they determine the result, for all the
+        sentences under `node`. Returns None if none of them can be parsed."""
+        events: List[ParseEvent] = []
+
+        if state is None:
+            state = self.__start(events)
+            if state is None:
+                self.__report_errors(node, ParseError("Context is missing."))
+                return None
+        else:
+            state = state.copy()
+
+        try:
+            known_end = len(self.__symbols) - state.number_of_closing_symbols
+            _PrefixParser(self.__symbols, known_end).advance_known(state, events)
+        except ParseError as exception:
+            self.__report_errors(node, exception)
+            return None
+
+        self.__segments.append(_Segment(len(self.__symbols), events))
+        return state
+
+    def __parse_sentence(self, state: Optional[ParseState]) -> None:
+        sentence = tuple(self.__symbols)
+        events: List[ParseEvent] = []
+
+        try:
+            _, _, options_end = get_sentence_frame(sentence)
+            state = state.copy() if state is not None else self.__start(events)
+            assert state is not None
+
+            state.ranges[0] = state.ranges[0]._replace(end=options_end)
+            _PrefixParser(self.__symbols, len(sentence)).advance(state, events)
+        except ParseError as exception:
+            self.__report_error(sentence, exception)
+            return
+
+        self.__accept(events)
+
+    def parse(self, root: _TrieNode) -> None:
+        stack: List[Tuple[int, str, _TrieNode, Optional[ParseState]]] = [
+            (1, symbol, child, None) for symbol, child in root.children.items()
+        ]
+        if root.is_sentence:
+            self.__parse_sentence(None)
+
+        while stack:
+            depth, symbol, node, state = stack.pop()
+
+            del self.__symbols[depth - 1 :]
+            self.__symbols.append(symbol)
+            while self.__segments and self.__segments[-1].depth >= depth:
+                self.__segments.pop()
+
+            # Parsing is only advanced where the sentences branch: a node with a single
+            # child is advanced together with its child, a leaf is parsed as a sentence.
+            # The driver and the beginning of its options are known from the third symbol.
+            is_branching = len(node.children) > 1 or (node.children and node.is_sentence)
+            if depth >= 3 and is_branching:
+                state = self.__advance(node, state)
+                if state is None:
+                    continue
+
+            if node.is_sentence:
+                self.__parse_sentence(state)
+
+            for child_symbol, child in node.children.items():
+                stack.append((depth + 1, child_symbol, child, state))
+
+
+def parse_sentences(sentences: Iterable[Tuple[str, ...]], on_error: Optional[ErrorCallback] = None) -> DriverDB:
+    """Parse the sentences into a DriverDB, like merging parse_sentence() of each.
+
+    `on_error` is called with the sentences that cannot be parsed.
+    """
+    root = _TrieNode()
+    for sentence in sentences:
+        root.insert(tuple(sentence))
+
+    parser = _SentenceTrieParser(on_error)
+    parser.parse(root)
+
+    builder = DriverDBBuilder()
+    for driver in parser.drivers:
+        builder.add_driver(driver)
+
+    return builder.finish()
@@ -0,0 +1,15 @@
+"""Find the source files changed between two polls of the source tree, see build_db.py --watch."""
+
+from pathlib import Path
+from typing import Dict, Set
+
+
+def get_changed_files(previous_mtimes: Dict[Path, float], current_mtimes: Dict[Path, float]) -> Set[Path]:
+    """The files added, removed or modified between the two polls of SourceTree.get_mtimes()."""
+    changed_files = set(previous_mtimes.keys() ^ current_mtimes.keys())
+
+    for path, mtime in current_mtimes.items():
+        if path in previous_mtimes and previous_mtimes[path] != mtime:
+            changed_files.add(path)
+
+    return changed_files
@@ -0,0 +1,218 @@
+"""Read access to the AxoSyslog sources, extracted to a directory or still in the release tarball.
+
+The files are addressed by paths under the root of the tree. For a tarball the
+root is the path of the tarball itself, and its top-level directory is stripped,
+like `tar --strip-components=1` would do:
+
+    axosyslog.tar.gz/lib/cfg-grammar.y
+"""
+
+import fnmatch
+import posixpath
+import tarfile
+import tempfile
+
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+SOURCE_FILE_SUFFIXES = ("-grammar.y", "-parser.c", "-parser.h", ".conf")
+# The number of links followed to the target of a link, like the limit of the kernel
+MAX_LINK_DEPTH = 40
+
+
+class SourceTree(ABC):
+    def __init__(self, root: Path) -> None:
+        self.__root = root
+
+    @property
+    def root(self) -> Path:
+        return self.__root
+
+    @abstractmethod
+    def is_dir(self, path: Path) -> bool:
+        pass
+
+    @abstractmethod
+    def is_file(self, path: Path) -> bool:
+        pass
+
+    @abstractmethod
+    def iterdir(self, directory: Path) -> List[Path]:
+        pass
+
+    @abstractmethod
+    def rglob(self, directory: Path, pattern: str) -> List[Path]:
+        pass
+
+    @abstractmethod
+    def read_bytes(self, path: Path) -> bytes:
+        pass
+
+    @abstractmethod
+    def get_mtimes(self, file_suffixes: Iterable[str] = SOURCE_FILE_SUFFIXES) -> Dict[Path, float]:
+        """The modification times of the files with `file_suffixes`."""
+
+    def read_text(self, path: Path) -> str:
+        return self.read_bytes(path).decode("utf-8")
+
+    @contextmanager
+    def local_file(self, path: Path) -> Iterator[Path]:
+        """The file on the local filesystem, for tools that need a path, like bison."""
+        with tempfile.TemporaryDirectory() as temporary_dir:
+            local_path = Path(temporary_dir) / path.name
+            local_path.write_bytes(self.read_bytes(path))
+            yield local_path
+
+
+class DirectorySourceTree(SourceTree):
+    def is_dir(self, path: Path) -> bool:
+        return path.is_dir()
+
+    def is_file(self, path: Path) -> bool:
+        return path.is_file()
+
+    def iterdir(self, directory: Path) -> List[Path]:
+        return list(directory.glob("*"))
+
+    def rglob(self, directory: Path, pattern: str) -> List[Path]:
+        return list(directory.rglob(pattern))
+
+    def read_bytes(self, path: Path) -> bytes:
+        return path.read_bytes()
+
+    def get_mtimes(self, file_suffixes: Iterable[str] = SOURCE_FILE_SUFFIXES) -> Dict[Path, float]:
+        suffixes = tuple(file_suffixes)
+        mtimes: Dict[Path, float] = {}
+
+        for path in self.root.rglob("*"):
+            if not path.name.endswith(suffixes):
+                continue
+            try:
+                if path.is_file():
+                    mtimes[path] = path.stat().st_mtime
+            except FileNotFoundError:
+                continue  # removed while walking the tree
+
+        return mtimes
+
+    @contextmanager
+    def local_file(self, path: Path) -> Iterator[Path]:
+        yield path
+
+
+class TarballSourceTree(SourceTree):
+    """Reads the tarball in one streaming pass, keeping the content of the files
+    with `file_suffixes` only. Every other file is known by its path only.
+
+    Links are resolved to their targets in the tarball: a link to a file is a file with
+    the content of its target. Links to directories, or to targets missing from the tarball,
+    are left out, like the members that are neither files nor directories."""
+
+    def __init__(self, tarball: Path, file_suffixes: Iterable[str] = SOURCE_FILE_SUFFIXES) -> None:
+        super().__init__(tarball)
+        self.__dirs: Set[Path] = {tarball}
+        self.__files: Set[Path] = set()
+        self.__contents: Dict[Path, bytes] = {}
+        self.__mtimes: Dict[Path, float] = {}
+        self.__children: Dict[Path, List[Path]] = {}
+
+        suffixes = tuple(file_suffixes)
+        links: Dict[Path, Path] = {}
+        with tarfile.open(tarball, "r|*") as archive:
+            for member in archive:
+                relative_parts = PurePosixPath(member.name).parts[1:]
+                if not relative_parts:
+                    continue
+
+                path = tarball.joinpath(*relative_parts)
+                self.__dirs.update(path.parents[: len(relative_parts) - 1])
+
+                if member.isdir():
+                    self.__dirs.add(path)
+                    continue
+
+                self.__mtimes[path] = member.mtime
+                if member.issym() or member.islnk():
+                    target = self.__get_link_target(member, path)
+                    if target is not None:
+                        links[path] = target
+                    continue
+                if not member.isfile():
+                    continue
+
+                self.__files.add(path)
+                if path.name.endswith(suffixes):
+                    extracted = archive.extractfile(member)
+                    if extracted is not None:
+                        self.__contents[path] = extracted.read()
+
+        self.__resolve_links(links)
+        self.__mtimes = {path: mtime for path, mtime in self.__mtimes.items() if path in self.__files}
+        for path in self.__dirs | self.__files:
+            if path != tarball:
+                self.__children.setdefault(path.parent, []).append(path)
+
+    def __get_link_target(self, member: tarfile.TarInfo, path: Path) -> Optional[Path]:
+        """The path of the target of a link member, if it is inside the tarball."""
+        if member.islnk():
+            # The target of a hard link is a member name, like the name of the link itself
+            target_parts = PurePosixPath(member.linkname).parts[1:]
+        else:
+            target = PurePosixPath(member.linkname)
+            if target.is_absolute():
+                return None
+            relative_path = PurePosixPath(*path.relative_to(self.root).parts)
+            target_parts = PurePosixPath(posixpath.normpath(relative_path.parent / target)).parts
+
+        if not target_parts or target_parts[0] == "..":
+            return None
+
+        return self.root.joinpath(*target_parts)
+
+    def __resolve_links(self, links: Dict[Path, Path]) -> None:
+        for path, target in links.items():
+            for _ in range(MAX_LINK_DEPTH):
+                if target not in links:
+                    break
+                target = links[target]
+
+            if target not in self.__files:
+                continue
+
+            self.__files.add(path)
+            if target in self.__contents:
+                self.__contents[path] = self.__contents[target]
+
+    def is_dir(self, path: Path) -> bool:
+        return path in self.__dirs
+
+    def is_file(self, path: Path) -> bool:
+        return path in self.__files
+
+    def iterdir(self, directory: Path) -> List[Path]:
+        return list(self.__children.get(directory, ()))
+
+    def rglob(self, directory: Path, pattern: str) -> List[Path]:
+        found: List[Path] = []
+        directories = [directory]
+        while directories:
+            for path in self.__children.get(directories.pop(), ()):
+                if fnmatch.fnmatchcase(path.name, pattern):
+                    found.append(path)
+                if path in self.__dirs:
+                    directories.append(path)
+
+        return found
+
+    def get_mtimes(self, file_suffixes: Iterable[str] = SOURCE_FILE_SUFFIXES) -> Dict[Path, float]:
+        suffixes = tuple(file_suffixes)
+
+        return {path: mtime for path, mtime in self.__mtimes.items() if path.name.endswith(suffixes)}
+
+    def read_bytes(self, path: Path) -> bytes:
+        try:
+            return self.__contents[path]
+        except KeyError as exception:
+            raise FileNotFoundError(f"File is not read from the tarball: {path}") from exception
@@ -0,0 +1,132 @@
+"""Split the sentence enumeration of a grammar into parts, that can be enumerated independently.
+
+The grammar is split by the alternatives of its first branching symbol, which
+is found by walking down from the start symbol through the symbols that have
+a single rule, e.g. `$accept -> start` and `start -> a | b | c`.
+
+The loops of the grammar are cut before splitting, exactly like
+DCFG.iter_sentences() cuts them, so the union of the sentences of the parts
+equals the sentences of the original grammar.
+"""
+
+from math import prod
+from typing import Dict, List, Optional, Set
+
+from neologism import DCFG, Rule
+from neologism.utils import remove_loops_from_multidigraph
+
+
+def __make_finite(grammar: DCFG) -> DCFG:
+    finite = grammar.copy()
+
+    if not finite.is_finite():
+        # DCFG.iter_sentences() cuts the loops of a temporary copy only, there is no public API for it.
+        # neologism is pinned, test_split_grammar.py checks that its graph is still there.
+        remove_loops_from_multidigraph(getattr(finite, "_DCFG__graph"), finite.start_symbol)
+
+    return finite
+
+
+def __count_sentences(rules_by_lhs: Dict[str, List[Rule]], symbol: str, counts: Dict[str, int]) -> int:
+    if symbol not in rules_by_lhs:
+        return 1
+
+    if symbol not in counts:
+        counts[symbol] = 1  # guards against the loops, which are cut already
+        counts[symbol] = sum(
+            prod(__count_sentences(rules_by_lhs, rhs_symbol, counts) for rhs_symbol in rule.rhs)
+            for rule in rules_by_lhs[symbol]
+        )
+
+    return counts[symbol]
+
+
+def __find_reachable_symbols(rules_by_lhs: Dict[str, List[Rule]], start_symbols: Set[str]) -> Set[str]:
+    reachable: Set[str] = set()
+    symbols_to_visit = list(start_symbols)
+
+    while symbols_to_visit:
+        symbol = symbols_to_visit.pop()
+        if symbol in reachable:
+            continue
+
+        reachable.add(symbol)
+        for rule in rules_by_lhs.get(symbol, []):
+            symbols_to_visit.extend(rule.rhs)
+
+    return reachable
+
+
+def __find_split_symbol(
+    rules_by_lhs: Dict[str, List[Rule]], start_symbol: str, counts: Dict[str, int]
+) -> Optional[str]:
+    """Find the first symbol having more alternatives, that occurs exactly once in every sentence."""
+    symbol = start_symbol
+    # the symbols next to the path walked down, the split symbol must not be reachable from them
+    siblings: Set[str] = set()
+
+    while len(rules_by_lhs.get(symbol, [])) == 1:
+        rhs = rules_by_lhs[symbol][0].rhs
+        branching = [rhs_symbol for rhs_symbol in rhs if __count_sentences(rules_by_lhs, rhs_symbol, counts) > 1]
+        if not branching:
+            return None
+
+        next_symbol = max(branching, key=lambda rhs_symbol: __count_sentences(rules_by_lhs, rhs_symbol, counts))
+        siblings.update(set(rhs) - {next_symbol})
+        if rhs.count(next_symbol) != 1 or next_symbol in __find_reachable_symbols(rules_by_lhs, siblings):
+            return None
+
+        symbol = next_symbol
+
+    return symbol if symbol in rules_by_lhs else None
+
+
+def __distribute_alternatives(
+    rules_by_lhs: Dict[str, List[Rule]], split_symbol: str, number_of_parts: int, counts: Dict[str, int]
+) -> List[List[Rule]]:
+    def count_rule_sentences(rule: Rule) -> int:
+        return prod(__count_sentences(rules_by_lhs, rhs_symbol, counts) for rhs_symbol in rule.rhs)
+
+    parts_rules: List[List[Rule]] = [[] for _ in range(number_of_parts)]
+    parts_sizes = [0] * number_of_parts
+    for rule in sorted(rules_by_lhs[split_symbol], key=lambda rule: (-count_rule_sentences(rule), rule.rhs)):
+        smallest_part = parts_sizes.index(min(parts_sizes))
+        parts_rules[smallest_part].append(rule)
+        parts_sizes[smallest_part] += count_rule_sentences(rule)
+
+    return parts_rules
+
+
+def split_grammar(grammar: DCFG, max_parts: int, min_sentences_per_part: int = 1) -> List[DCFG]:
+    """Split `grammar` into at most `max_parts` grammars with disjoint sentences.
+
+    The alternatives of the split symbol are distributed by the number of their
+    sentences. The parts are finite, so enumerating them does not copy them again.
+    """
+    finite = __make_finite(grammar)
+
+    rules_by_lhs: Dict[str, List[Rule]] = {}
+    for rule in finite.rules:
+        rules_by_lhs.setdefault(rule.lhs, []).append(rule)
+
+    counts: Dict[str, int] = {}
+    split_symbol = __find_split_symbol(rules_by_lhs, finite.start_symbol, counts)
+    if split_symbol is None:
+        return [finite]
+
+    total_sentences = __count_sentences(rules_by_lhs, split_symbol, counts)
+    number_of_parts = min(max_parts, len(rules_by_lhs[split_symbol]), total_sentences // min_sentences_per_part)
+    if number_of_parts <= 1:
+        return [finite]
+
+    parts_rules = __distribute_alternatives(rules_by_lhs, split_symbol, number_of_parts, counts)
+
+    parts: List[DCFG] = []
+    for part_rules in parts_rules:
+        part = finite.copy()
+        for rule in rules_by_lhs[split_symbol]:
+            if rule not in part_rules:
+                part.remove_rule(rule)
+        parts.append(part)
+
+    return parts
@@ -0,0 +1,176 @@
+"""The drivers of custom SCL directories, queried on top of the database with `--scl-path`.
+
+The SCL blocks of a directory are resolved against the database once, and the
+drivers are cached together with the stat and the hash of each *.conf file:
+
+    <cache dir>/<hash of the directory path>/
+        overlay.json     the drivers of the SCL blocks
+        manifest.json    the fingerprint of the database, the stat and hash of each file
+        scl/             the parsed blocks of the files, see load_scl()
+
+Files with an unchanged stat are not read again. When files change, only the
+blocks of the changed files, and the blocks inheriting from them, are resolved again.
+"""
+
+import hashlib
+import json
+import os
+
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, IO, List, Optional, Set, Tuple
+
+from axosyslog_cfg_helper.driver_db import DriverDB
+
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class _FileState:
+    mtime_ns: int
+    size: int
+    sha256: str
+    # the (context, normalized name) of the drivers defined by the file
+    drivers: List[Tuple[str, str]] = field(default_factory=list)
+
+
+def get_cache_dir() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "axosyslog-cfg-helper" / "scl-overlays"
+
+
+def _read_manifest(manifest_file: Path) -> Tuple[str, Dict[str, _FileState]]:
+    try:
+        with manifest_file.open("r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest["version"] != MANIFEST_VERSION:
+            return "", {}
+        states = {path: _FileState(**state) for path, state in manifest["files"].items()}
+        for state in states.values():
+            state.drivers = [(key[0], key[1]) for key in state.drivers]  # JSON has no tuples
+        return manifest["base"], states
+    except (OSError, ValueError, KeyError, TypeError):
+        return "", {}
+
+
+def _write_atomically(path: Path, write: Callable[[IO], None]) -> None:
+    temporary_path = path.with_name(f".{path.name}.tmp")
+    with temporary_path.open("w", encoding="utf-8") as file:
+        write(file)
+    temporary_path.replace(path)
+
+
+def _get_file_states(scl_dir: Path, cached_states: Dict[str, _FileState]) -> Dict[str, _FileState]:
+    """The state of each *.conf file in `scl_dir`, by relative path. Only the files with a changed stat are hashed."""
+    states: Dict[str, _FileState] = {}
+
+    for path in sorted(scl_dir.rglob("*.conf")):
+        try:
+            stat = path.stat()
+            relative_path = path.relative_to(scl_dir).as_posix()
+            cached_state = cached_states.get(relative_path)
+            if cached_state is not None and (cached_state.mtime_ns, cached_state.size) == (
+                stat.st_mtime_ns,
+                stat.st_size,
+            ):
+                states[relative_path] = cached_state
+            elif path.is_file():
+                state = _FileState(stat.st_mtime_ns, stat.st_size, hashlib.sha256(path.read_bytes()).hexdigest())
+                if cached_state is not None and cached_state.sha256 == state.sha256:
+                    state.drivers = cached_state.drivers  # only touched
+                states[relative_path] = state
+        except FileNotFoundError:
+            continue  # removed while walking the directory
+
+    return states
+
+
+def _load_cached_overlay(overlay_file: Path) -> Optional[DriverDB]:
+    try:
+        with overlay_file.open("r", encoding="utf-8") as file:
+            return DriverDB.load(file)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _get_changed_files(cached_states: Dict[str, _FileState], states: Dict[str, _FileState]) -> Set[str]:
+    return {
+        relative_path
+        for relative_path in states.keys() | cached_states.keys()
+        if relative_path not in states
+        or relative_path not in cached_states
+        or states[relative_path].sha256 != cached_states[relative_path].sha256
+    }
+
+
+def _resolve_overlay(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    scl_dir: Path,
+    driver_db: DriverDB,
+    cached_overlay: Optional[DriverDB],
+    cached_states: Dict[str, _FileState],
+    states: Dict[str, _FileState],
+    work_dir: Path,
+) -> DriverDB:
+    """Resolve the blocks of the changed files, or every block without `cached_overlay`,
+    and record the drivers defined by each file in `states`."""
+    # The module loader imports the grammar tooling, which takes longer than a query from the cache
+    from axosyslog_cfg_helper.module_loader.load_scl import (  # pylint: disable=import-outside-toplevel
+        get_scl_driver_keys,
+        load_scl,
+        reload_scl,
+    )
+
+    driver_keys = get_scl_driver_keys(scl_dir, work_dir)
+    for relative_path, state in states.items():
+        state.drivers = sorted(driver_keys.get(scl_dir / relative_path, set()))
+
+    if cached_overlay is None:
+        return load_scl(scl_dir, driver_db, work_dir=work_dir)
+
+    stale_keys: Set[Tuple[str, str]] = set()
+    for relative_path in _get_changed_files(cached_states, states):
+        for file_states in (cached_states, states):
+            if relative_path in file_states:
+                stale_keys.update(file_states[relative_path].drivers)
+    return reload_scl(scl_dir, driver_db, cached_overlay, stale_keys, work_dir)
+
+
+def load_overlay(scl_dir: Path, driver_db: DriverDB, base_fingerprint: str, cache_dir: Path) -> Tuple[DriverDB, str]:
+    """The drivers of the SCL blocks in `scl_dir`, inheriting the options of the drivers of `driver_db`.
+
+    `base_fingerprint` identifies `driver_db`, every block is resolved again when it changes.
+    The fingerprint of `driver_db` merged with the returned drivers is returned too, for the
+    overlay of the next directory.
+    """
+    scl_dir = scl_dir.resolve()
+    overlay_dir = cache_dir / hashlib.sha256(str(scl_dir).encode("utf-8")).hexdigest()[:16]
+    manifest_file = overlay_dir / "manifest.json"
+
+    cached_base_fingerprint, cached_states = _read_manifest(manifest_file)
+    states = _get_file_states(scl_dir, cached_states)
+    hashes = {relative_path: state.sha256 for relative_path, state in states.items()}
+    fingerprint = hashlib.sha256(json.dumps([base_fingerprint, hashes], sort_keys=True).encode("utf-8")).hexdigest()
+
+    cached_overlay = (
+        _load_cached_overlay(overlay_dir / "overlay.json") if cached_base_fingerprint == base_fingerprint else None
+    )
+    if cached_overlay is not None and not _get_changed_files(cached_states, states):
+        overlay = cached_overlay
+    else:
+        overlay = _resolve_overlay(scl_dir, driver_db, cached_overlay, cached_states, states, overlay_dir)
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "base": base_fingerprint,
+        "files": {relative_path: asdict(state) for relative_path, state in states.items()},
+    }
+    try:
+        overlay_dir.mkdir(parents=True, exist_ok=True)
+        if overlay is not cached_overlay:
+            _write_atomically(overlay_dir / "overlay.json", overlay.dump)
+        if overlay is not cached_overlay or states != cached_states:
+            _write_atomically(manifest_file, lambda file: json.dump(manifest, file))
+    except OSError:
+        pass  # the overlay is resolved again next time
+
+    return overlay, fingerprint
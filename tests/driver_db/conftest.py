@@ -0,0 +1,39 @@
+from typing import List
+
+import pytest
+
+from axosyslog_cfg_helper.driver_db import Block, Driver, DriverDB, InheritingDriver, Option
+
+
+def _driver(context: str, name: str, option_names: List[str]) -> Driver:
+    driver = Driver(context, name)
+    for option_name in option_names:
+        driver.add_option(Option(option_name, {("<string>",)}))
+    driver.add_option(Option(params={("<string>",)}))
+    tls = Block("tls")
+    tls.add_option(Option("ca-file", {("<path>",)}))
+    driver.add_block(tls)
+
+    return driver
+
+
+@pytest.fixture(name="driver_db")
+def fixture_driver_db() -> DriverDB:
+    """Destinations sharing option names, an InheritingDriver, an empty driver and a plugin name."""
+    driver_db = DriverDB()
+
+    http = _driver("destination", "http", ["url", "keep_alive"])
+    http.add_option(Option("url", {("<string-list>",)}))
+    http.add_option(Option(params={("<number>",)}))
+    http.get_block("tls").add_block(Block("sni"))
+    driver_db.add_driver(http)
+    driver_db.adopt_driver(
+        InheritingDriver("destination", "wrap", driver_db.get_driver("destination", "http"), ["url_2"], ["url"])
+    )
+    driver_db.add_driver(_driver("destination", "kafka", ["topic", "keep-alive"]))
+
+    driver_db.add_driver(_driver("source", "network", ["port"]))
+    driver_db.add_driver(Driver("source", "file"))
+    driver_db.add_plugin_names("destination", ["ebpf"])
+
+    return driver_db
@@ -62,6 +62,28 @@ def test_add_get_remove_block() -> None:
         block.get_block("inner-block")
 
 
+def test_find_normalized() -> None:
+    block = Block("block")
+    block.add_option(Option())
+    block.add_option(Option("batch_lines"))
+    block.add_block(Block("tls-options"))
+
+    assert block.find_option_normalized("batch-lines") == Option("batch_lines")
+    assert block.find_block_normalized("tls_options") == Block("tls-options")
+    assert block.find_option_normalized("tls-options") is None
+
+    block.adopt_block(Block("tls_options"))
+    block.remove_block("tls-options")
+    block.add_option(Option("batch-lines"))
+    block.remove_option("batch_lines")
+
+    assert block.find_block_normalized("tls-options") == Block("tls_options")
+    assert block.find_option_normalized("batch_lines") == Option("batch-lines")
+
+    block.remove_option("batch-lines")
+    assert block.find_option_normalized("batch-lines") is None
+
+
 def test_eq() -> None:
     block_1 = Block("block")
     inner_block_1 = Block("inner-block")
@@ -139,6 +161,28 @@ def test_merge() -> None:
     assert block_1 == expected_merged_block
 
 
+def test_adopt() -> None:
+    block_1 = Block("block")
+    block_1.add_option(Option("option-1", {("param-1-1",)}))
+
+    block_2 = Block("block")
+    block_2.add_option(Option("option-1", {("param-1-2",)}))
+    inner_block = Block("inner-block")
+    inner_block.add_option(Option(params={("param-2-1",)}))
+    block_2.adopt_block(inner_block)
+
+    expected_adopted_block = Block("block")
+    expected_adopted_block.add_option(Option("option-1", {("param-1-1",), ("param-1-2",)}))
+    expected_adopted_block.add_block(inner_block)
+
+    block_1.adopt(block_2)
+    assert block_1 == expected_adopted_block
+    assert block_1.get_block("inner-block") is inner_block
+
+    with pytest.raises(MergeException):
+        block_1.adopt(Block("block-2"))
+
+
 def test_merge_different() -> None:
     block_1 = Block("block-1")
     block_2 = Block("block-2")
@@ -194,6 +238,29 @@ def test_serialization() -> None:
     assert block == deserialized
 
 
+def test_lazy_deserialization() -> None:
+    block = Block("block")
+    block.add_block(Block("inner-block"))
+    block.get_block("inner-block").add_block(Block("inner-inner-block"))
+    block.get_block("inner-block").add_option(Option("a-option-1", {("param-1-1", "param-1-2")}))
+    block.add_option(Option(params={("positional-option-1",)}))
+
+    as_dict = json.loads(json.dumps(block.to_dict()))
+    deserialized = Block.from_dict(as_dict, lazy=True)
+    assert not deserialized.materialized
+
+    inner_block = deserialized.get_block("inner-block")
+    assert deserialized.materialized
+    assert not inner_block.materialized
+
+    assert deserialized == block
+    assert str(Block.from_dict(as_dict, lazy=True)) == str(block)
+    assert Block.from_dict(as_dict, lazy=True).diff(block) == BlockDiff("block")
+    assert block.find_block_normalized("inner_block") == Block.from_dict(as_dict, lazy=True).find_block_normalized(
+        "inner_block"
+    )
+
+
 def test_diff() -> None:
     old_block = Block("block")
     new_block = Block("block")
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+import pytest
+
+from axosyslog_cfg_helper.driver_db import Driver, DriverDB, Option
+from axosyslog_cfg_helper.driver_db.db_file import COMPRESSIONS, create_db_file, get_compression, open_db_file
+
+
+@pytest.mark.parametrize("compression", [None, *COMPRESSIONS])
+def test_compressed_db_file(tmp_path: Path, compression: str) -> None:
+    driver_db = DriverDB()
+    driver = Driver("destination", "http")
+    driver.add_option(Option("url", {("<string>",)}))
+    driver_db.add_driver(driver)
+
+    db_file = tmp_path / "axosyslog-cfg-helper.db"
+    with create_db_file(db_file, compression) as file:
+        driver_db.dump(file)
+    contents = db_file.read_bytes()
+
+    assert get_compression(db_file) == compression
+    with open_db_file(db_file) as file:
+        assert DriverDB.read_content_hash(file) == driver_db.content_hash()
+    with open_db_file(db_file) as file:
+        assert DriverDB.load(file) == driver_db
+
+    # The same database is compressed to the same bytes
+    with create_db_file(db_file, compression) as file:
+        driver_db.dump(file)
+    assert db_file.read_bytes() == contents
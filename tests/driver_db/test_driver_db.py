@@ -1,8 +1,23 @@
+import json
+
+from io import StringIO
 from tempfile import TemporaryFile
 
+import pytest
+
+from axosyslog_cfg_helper.driver_db.json_stream import JSONStreamReader
 from axosyslog_cfg_helper.driver_db.driver_db import ContextDiff, DriverDB, DriverDBDiff
 from axosyslog_cfg_helper.driver_db.driver import Driver, DriverDiff
 from axosyslog_cfg_helper.driver_db.option import Option
+from axosyslog_cfg_helper.driver_db.block import Block
+from axosyslog_cfg_helper.driver_db.inheriting_driver import InheritingDriver
+
+
+def _dumps(driver_db: DriverDB) -> str:
+    file = StringIO()
+    driver_db.dump(file)
+
+    return file.getvalue()
 
 
 def test_defaults() -> None:
@@ -33,6 +48,20 @@ def test_add_driver_get_driver_get_drivers_in_context() -> None:
     assert driver_db.get_driver("context-2", "driver-2-1") == expected_driver_2_1
 
 
+def test_find_driver_normalized() -> None:
+    driver_db = DriverDB()
+    driver_db.add_driver(Driver("destination", "kafka-c"))
+    driver_db.add_driver(Driver("destination", "python_fetcher"))
+    driver_db.add_driver(Driver("destination", "python-fetcher"))
+
+    assert driver_db.find_driver_normalized("destination", "kafka_c") == Driver("destination", "kafka-c")
+    assert driver_db.find_driver_normalized("destination", "python-fetcher") is driver_db.get_driver(
+        "destination", "python-fetcher"
+    )
+    assert driver_db.find_driver_normalized("destination", "http") is None
+    assert driver_db.find_driver_normalized("source", "kafka-c") is None
+
+
 def test_remove_context() -> None:
     driver_db = DriverDB()
     driver_db.add_driver(Driver("context", "driver"))
@@ -115,6 +144,69 @@ def test_serialize() -> None:
     assert driver_db == deserialized
 
 
+def _canonical_json(driver_db: DriverDB) -> str:
+    as_dict = {DriverDB.CONTENT_HASH_KEY: driver_db.content_hash(), **driver_db.to_dict()}
+    return json.dumps(as_dict, sort_keys=True, separators=(",", ":"))
+
+
+def test_dump_writes_the_canonical_json_of_to_dict() -> None:
+    driver_db = DriverDB()
+    assert _dumps(driver_db) == _canonical_json(driver_db)
+
+    driver = Driver("context-1", "driver-\u00e1")
+    driver.add_option(Option("option", {("<string>",), ("<number>",)}))
+    driver.add_option(Option(params={("<number>", "<string>")}))
+    driver_db.add_driver(driver)
+    driver_db.add_driver(Driver("context-1", "driver-1-2"))
+    driver_db.add_driver(Driver("context-2", "driver-2-1"))
+
+    assert _dumps(driver_db) == _canonical_json(driver_db)
+    assert DriverDB.load(StringIO(_dumps(driver_db))) == driver_db
+
+
+def test_content_hash() -> None:
+    driver_db_1 = DriverDB()
+    driver_db_1.add_driver(Driver("context-1", "driver-1"))
+    driver_1 = Driver("context-2", "driver-2")
+    driver_1.add_option(Option("option", {("<string>",), ("<number>",), ("<float>",)}))
+    driver_db_1.add_driver(driver_1)
+
+    driver_db_2 = DriverDB()
+    driver_2 = Driver("context-2", "driver-2")
+    driver_2.add_option(Option("option", {("<float>",), ("<number>",), ("<string>",)}))
+    driver_db_2.add_driver(driver_2)
+    driver_db_2.add_driver(Driver("context-1", "driver-1"))
+
+    assert driver_db_1.content_hash() == driver_db_2.content_hash()
+    assert _dumps(driver_db_1) == _dumps(driver_db_2)
+    assert DriverDB.read_content_hash(StringIO(_dumps(driver_db_1))) == driver_db_1.content_hash()
+
+    driver_db_2.get_driver("context-2", "driver-2").add_option(Option("option", {("<template>",)}))
+    assert driver_db_1.content_hash() != driver_db_2.content_hash()
+
+    assert DriverDB.read_content_hash(StringIO(json.dumps(driver_db_1.to_dict()))) is None
+
+
+def test_plugin_names() -> None:
+    driver_db = DriverDB()
+    driver_db.add_driver(Driver("destination", "http"))
+    content_hash = driver_db.content_hash()
+
+    driver_db.add_plugin_names("destination", ["tls-test-validation", "ebpf"])
+    driver_db.add_plugin_names("source", [])
+    assert driver_db.plugin_names == {"destination": {"ebpf", "tls-test-validation"}}
+    assert driver_db.get_plugin_names("source") == set()
+    assert driver_db.content_hash() != content_hash
+
+    assert _dumps(driver_db) == _canonical_json(driver_db)
+    assert DriverDB.load(StringIO(_dumps(driver_db))) == driver_db
+    assert DriverDB.from_dict(driver_db.to_dict()) == driver_db
+
+    merged = DriverDB()
+    merged.merge(driver_db)
+    assert merged.get_plugin_names("destination") == {"ebpf", "tls-test-validation"}
+
+
 def test_diff() -> None:
     old_driver_db = DriverDB()
     new_driver_db = DriverDB()
@@ -221,3 +313,40 @@ def test_diff_str() -> None:
 """[1:-1]
 
     assert str(new_driver_db.diff(old_driver_db)) == expected_str
+
+
+def test_load_reads_the_file_in_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(JSONStreamReader, "CHUNK_SIZE", 3)
+
+    driver_db = DriverDB()
+    driver = Driver("context-1", "driver-á")
+    driver.add_option(Option("option", {("<string>",), ("<number>",)}))
+    driver_db.add_driver(driver)
+    driver_db.add_driver(Driver("context-2", "driver-2"))
+    driver_db.add_driver(Driver("context-3", "driver-3"))
+
+    assert DriverDB.load(StringIO(_dumps(driver_db))) == driver_db
+    assert DriverDB.load(StringIO(json.dumps(driver_db.to_dict(), indent=2))) == driver_db
+    assert DriverDB.load(StringIO('{"contexts": {}}')) == DriverDB()
+
+    with pytest.raises(ValueError):
+        DriverDB.load(StringIO(_dumps(driver_db)[:-2]))
+    with pytest.raises(ValueError):
+        DriverDB.load(StringIO(_dumps(driver_db) + "{}"))
+
+
+def test_lazy_load() -> None:
+    driver_db = DriverDB()
+    driver = Driver("context-1", "driver-1")
+    driver.add_option(Option("option", {("<string>",)}))
+    driver.add_block(Block("block"))
+    driver_db.add_driver(driver)
+    driver_db.adopt_driver(InheritingDriver("context-1", "driver-2", driver_db.get_driver("context-1", "driver-1")))
+
+    loaded = DriverDB.load(StringIO(_dumps(driver_db)), lazy=True)
+    assert not loaded.get_driver("context-1", "driver-1").materialized
+
+    assert loaded == driver_db
+    assert loaded.diff(driver_db) == DriverDBDiff()
+    assert str(loaded.get_driver("context-1", "driver-2")) == str(driver_db.get_driver("context-1", "driver-2"))
+    assert _dumps(loaded) == _dumps(driver_db)
@@ -0,0 +1,45 @@
+import pytest
+
+from axosyslog_cfg_helper.driver_db.driver_db import DriverDB
+from axosyslog_cfg_helper.driver_db.driver_db_builder import DriverDBBuilder
+from axosyslog_cfg_helper.driver_db.driver import Driver
+from axosyslog_cfg_helper.driver_db.exceptions import BuilderFinishedException
+from axosyslog_cfg_helper.driver_db.option import Option
+
+
+def test_add_driver_merge_finish() -> None:
+    builder = DriverDBBuilder()
+
+    driver_1 = Driver("context-1", "driver-1")
+    driver_1.add_option(Option("option-name", {("param-1",)}))
+    builder.add_driver(driver_1)
+
+    driver_1_again = Driver("context-1", "driver-1")
+    driver_1_again.add_option(Option("option-name", {("param-2",)}))
+    builder.add_driver(driver_1_again)
+
+    other = DriverDB()
+    other.add_driver(Driver("context-2", "driver-2"))
+    builder.merge(other)
+
+    expected_driver_1 = Driver("context-1", "driver-1")
+    expected_driver_1.add_option(Option("option-name", {("param-1",), ("param-2",)}))
+    expected = DriverDB()
+    expected.add_driver(expected_driver_1)
+    expected.add_driver(Driver("context-2", "driver-2"))
+
+    driver_db = builder.finish()
+    assert driver_db == expected
+    assert driver_db.get_driver("context-1", "driver-1") is driver_1
+    assert driver_db.get_driver("context-2", "driver-2") is other.get_driver("context-2", "driver-2")
+
+
+def test_finished() -> None:
+    builder = DriverDBBuilder()
+    builder.finish()
+
+    with pytest.raises(BuilderFinishedException):
+        builder.add_driver(Driver("context", "driver"))
+
+    with pytest.raises(BuilderFinishedException):
+        builder.finish()
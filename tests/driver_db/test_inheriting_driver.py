@@ -0,0 +1,107 @@
+from axosyslog_cfg_helper.driver_db import Block, Driver, DriverDB, InheritingDriver, Option
+
+
+def _http() -> Driver:
+    http = Driver("destination", "http")
+    http.add_option(Option("url", {("<string>",)}))
+    http.add_option(Option("body", {("<template>",)}))
+    tls = Block("tls")
+    tls.add_option(Option("ca-dir", {("<path>",)}))
+    http.add_block(tls)
+
+    return http
+
+
+def test_resolved_on_first_access() -> None:
+    http = _http()
+    driver = InheritingDriver("destination", "wrap", http, ["host"], ["body"])
+
+    assert not driver.resolved
+    assert {option.name for option in driver.options} == {"host", "url"}
+    assert driver.resolved
+    assert driver.get_option("host") == Option("host", {("<empty>",)})
+    assert driver.get_block("tls") == http.get_block("tls")
+    assert driver.get_block("tls") is not http.get_block("tls")
+
+
+def test_inflated_paths() -> None:
+    driver = InheritingDriver("destination", "wrap", _http(), ["target", "ca"], [], {"target": ["url"], "ca": ["tls"]})
+
+    assert driver.get_option("target") == Option("target", {("<string>",)})
+    assert driver.get_block("ca").get_option("ca-dir") == Option("ca-dir", {("<path>",)})
+
+
+def test_copy_and_equality() -> None:
+    driver = InheritingDriver("destination", "wrap", _http(), ["host"], ["tls"])
+    copied = driver.copy()
+
+    assert isinstance(copied, InheritingDriver) and not copied.resolved
+    assert copied == driver
+
+    expected = Driver("destination", "wrap")
+    expected.add_option(Option("host", {("<empty>",)}))
+    expected.add_option(Option("url", {("<string>",)}))
+    expected.add_option(Option("body", {("<template>",)}))
+    assert driver == expected
+    assert str(driver) == str(expected)
+
+
+def test_driver_db_stores_the_reference_to_the_base() -> None:
+    driver_db = DriverDB()
+    driver_db.add_driver(_http())
+    driver_db.adopt_driver(InheritingDriver("destination", "inner", driver_db.get_driver("destination", "http"), ["a"]))
+    driver_db.adopt_driver(
+        InheritingDriver("destination", "outer", driver_db.get_driver("destination", "inner"), ["b"])
+    )
+
+    as_dict = driver_db.to_dict()
+    assert as_dict["contexts"]["destination"]["outer"]["base"] == "inner"
+
+    loaded = DriverDB.from_dict(as_dict)
+    outer = loaded.get_driver("destination", "outer")
+    assert isinstance(outer, InheritingDriver) and not outer.resolved
+    assert loaded == driver_db
+    assert {option.name for option in outer.options} == {"a", "b", "body", "url"}
+
+
+def test_driver_db_resolves_inheriting_drivers_before_modifying_their_bases() -> None:
+    driver_db = DriverDB()
+    driver_db.add_driver(_http())
+    driver_db.adopt_driver(InheritingDriver("destination", "wrap", driver_db.get_driver("destination", "http")))
+
+    other = DriverDB()
+    other.adopt_driver(InheritingDriver("destination", "other-wrap", driver_db.get_driver("destination", "http")))
+    http = Driver("destination", "http")
+    http.add_option(Option("workers", {("<number>",)}))
+    other.add_driver(http)
+    driver_db.merge(other)
+
+    assert "workers" in {option.name for option in driver_db.get_driver("destination", "http").options}
+    for name in ("wrap", "other-wrap"):
+        assert "workers" not in {option.name for option in driver_db.get_driver("destination", name).options}
+
+
+def test_driver_db_content_hash_is_kept_by_resolving() -> None:
+    driver_db = DriverDB()
+    driver_db.add_driver(_http())
+    driver_db.adopt_driver(InheritingDriver("destination", "inner", driver_db.get_driver("destination", "http"), ["a"]))
+    driver_db.adopt_driver(
+        InheritingDriver("destination", "outer", driver_db.get_driver("destination", "inner"), ["b"])
+    )
+    content_hash = driver_db.content_hash()
+
+    driver_db.resolve_inheriting_drivers()
+    outer = driver_db.get_driver("destination", "outer")
+    assert isinstance(outer, InheritingDriver) and outer.resolved
+    assert driver_db.content_hash() == content_hash
+    assert driver_db.to_dict()["contexts"]["destination"]["outer"]["base"] == "inner"
+
+    copied = outer.copy()
+    assert isinstance(copied, InheritingDriver) and copied.resolved
+
+    driver_db.get_driver("destination", "inner").add_option(Option("c", {("<string>",)}))
+    as_dict = driver_db.to_dict()
+    assert "base" not in as_dict["contexts"]["destination"]["inner"]
+    assert "base" not in as_dict["contexts"]["destination"]["outer"]
+    assert driver_db.content_hash() != content_hash
+    assert DriverDB.from_dict(as_dict) == driver_db
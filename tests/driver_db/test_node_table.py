@@ -0,0 +1,87 @@
+import pytest
+
+from axosyslog_cfg_helper.driver_db import node_table as node_table_module
+from axosyslog_cfg_helper.driver_db import DriverDB
+from axosyslog_cfg_helper.driver_db.node_table import KIND_BLOCK, KIND_DRIVER, KIND_OPTION, NO_NODE
+
+
+@pytest.fixture(params=["numpy", "loops"])
+def scans(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run the test with the NumPy scans, and again with the loops used without NumPy."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(node_table_module, "_import_numpy", lambda: None)
+    return request.param
+
+
+@pytest.mark.usefixtures("scans")
+def test_node_table(driver_db: DriverDB) -> None:
+    node_table = driver_db.to_node_table()
+
+    assert len(node_table) == 26
+    drivers = node_table.select(kind=KIND_DRIVER)
+    assert [node_table.get_driver_key(node_id) for node_id in drivers] == [
+        ("destination", "http"),
+        ("destination", "kafka"),
+        ("destination", "wrap"),
+        ("source", "file"),
+        ("source", "network"),
+    ]
+    assert [node_table.parent_ids[node_id] for node_id in drivers] == [NO_NODE] * 5
+    assert [node_table.subtree_ends[node_id] for node_id in drivers] == drivers[1:] + [len(node_table)]
+
+    ca_files = node_table.select(kind=KIND_OPTION, name="ca_file")
+    assert [node_table.get_driver_key(node_id) for node_id in ca_files] == [
+        ("destination", "http"),
+        ("destination", "kafka"),
+        ("destination", "wrap"),
+        ("source", "network"),
+    ]
+    assert node_table.get_path(ca_files[0]) == ["tls", "ca-file"]
+    assert node_table.get_params(ca_files[0]) == [("<path>",)]
+    assert node_table.kinds[node_table.parent_ids[ca_files[0]]] == KIND_BLOCK
+
+    keep_alives = node_table.select(name="keep-alive", context="destination")
+    assert [node_table.get_name(node_id) for node_id in keep_alives] == ["keep_alive", "keep-alive", "keep_alive"]
+    assert [node_table.get_driver_key(node_id) for node_id in node_table.select(name="port", context="source")] == [
+        ("source", "network")
+    ]
+    assert node_table.select(name="port", context="destination") == []
+
+
+@pytest.mark.usefixtures("scans")
+def test_scans(driver_db: DriverDB) -> None:
+    node_table = driver_db.to_node_table()
+
+    assert node_table.get_option_coverage() == {
+        "ca-file": 4,
+        "keep_alive": 2,
+        "keep-alive": 1,
+        "port": 1,
+        "topic": 1,
+        "url": 1,
+        "url_2": 1,
+    }
+    assert node_table.get_option_coverage("destination")["ca-file"] == 3
+    assert node_table.get_params_usage() == {
+        ("<string>",): 10,
+        ("<path>",): 4,
+        ("<number>",): 2,
+        ("<string-list>",): 1,
+        ("<empty>",): 1,
+    }
+    assert all(isinstance(count, int) for count in node_table.get_params_usage().values())
+
+    empty_node_table = DriverDB().to_node_table()
+    assert empty_node_table.select() == []
+    assert not empty_node_table.get_option_coverage()
+    assert not empty_node_table.get_params_usage()
+
+
+def test_numpy_views(driver_db: DriverDB) -> None:
+    numpy = pytest.importorskip("numpy")
+    node_table = driver_db.to_node_table()
+
+    columns = node_table.to_numpy()
+    assert numpy.count_nonzero(columns["kinds"] == KIND_OPTION) == len(node_table.select(kind=KIND_OPTION))
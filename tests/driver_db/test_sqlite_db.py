@@ -0,0 +1,64 @@
+import sqlite3
+
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+
+from axosyslog_cfg_helper.driver_db import Driver, DriverDB, InheritingDriver
+from axosyslog_cfg_helper.driver_db.sqlite_db import SQLiteDriverDB, dump_sqlite_db, is_sqlite_db
+
+
+def test_sqlite_db(tmp_path: Path, driver_db: DriverDB) -> None:
+    db_file = tmp_path / "axosyslog-cfg-helper.db"
+    dump_sqlite_db(driver_db, db_file)
+    assert is_sqlite_db(db_file)
+
+    with closing(SQLiteDriverDB(db_file)) as sqlite_driver_db:
+        assert set(sqlite_driver_db.contexts) == {"destination", "source"}
+        assert sqlite_driver_db.content_hash() == driver_db.content_hash()
+
+        assert sqlite_driver_db.get_driver("destination", "http") == driver_db.get_driver("destination", "http")
+        assert sqlite_driver_db.get_driver("destination", "wrap") == driver_db.get_driver("destination", "wrap")
+        with pytest.raises(KeyError):
+            sqlite_driver_db.get_driver("destination", "file")
+
+        assert sqlite_driver_db.find_driver_normalized("source", "file") == Driver("source", "file")
+        assert sqlite_driver_db.find_driver_normalized("source", "fi-le") is None
+        assert {driver.name for driver in sqlite_driver_db.get_drivers_in_context("destination")} == {
+            "http",
+            "kafka",
+            "wrap",
+        }
+
+        assert sqlite_driver_db.to_driver_db() == driver_db
+
+
+def test_sqlite_db_can_be_queried_with_sql(tmp_path: Path, driver_db: DriverDB) -> None:
+    db_file = tmp_path / "axosyslog-cfg-helper.db"
+    dump_sqlite_db(driver_db, db_file)
+
+    with closing(sqlite3.connect(db_file)) as connection:
+        rows = connection.execute(
+            "SELECT drivers.name FROM options JOIN drivers ON drivers.id = options.driver_id "
+            "WHERE options.normalized_name = 'keep-alive' ORDER BY drivers.name"
+        ).fetchall()
+
+    assert rows == [("http",), ("kafka",), ("wrap",)]
+
+
+def test_equal_dbs_have_the_same_content_hash(tmp_path: Path, driver_db: DriverDB) -> None:
+    db_file = tmp_path / "axosyslog-cfg-helper.db"
+    dump_sqlite_db(driver_db, db_file)
+    with closing(SQLiteDriverDB(db_file)) as sqlite_driver_db:
+        read_back = sqlite_driver_db.to_driver_db()
+
+    plain_drivers = DriverDB()
+    for context in driver_db.contexts:
+        for driver in driver_db.get_drivers_in_context(context):
+            plain_drivers.adopt_driver(Driver.from_dict(driver.copy().to_dict()))
+    plain_drivers.add_plugin_names("destination", ["ebpf"])
+
+    assert not isinstance(read_back.get_driver("destination", "wrap"), InheritingDriver)
+    assert read_back == driver_db == plain_drivers
+    assert read_back.content_hash() == driver_db.content_hash() == plain_drivers.content_hash()
@@ -0,0 +1,61 @@
+from contextlib import closing
+from io import StringIO
+from pathlib import Path
+
+from axosyslog_cfg_helper.driver_db import DriverDB
+from axosyslog_cfg_helper.driver_db.sqlite_db import SQLiteDriverDB, dump_sqlite_db
+from axosyslog_cfg_helper.driver_db.support_index import SupportIndex
+
+
+def test_support_index(driver_db: DriverDB) -> None:
+    support_index = driver_db.to_support_index()
+
+    assert support_index.drivers == [
+        ("destination", "http"),
+        ("destination", "kafka"),
+        ("destination", "wrap"),
+        ("source", "file"),
+        ("source", "network"),
+    ]
+    assert support_index.paths == ["keep-alive", "port", "tls", "tls/ca-file", "tls/sni", "topic", "url", "url-2"]
+
+    assert support_index.get_drivers_supporting(["tls/ca_file", "keep-alive"]) == [
+        ("destination", "http"),
+        ("destination", "kafka"),
+        ("destination", "wrap"),
+    ]
+    assert support_index.get_drivers_supporting(["tls/sni"], "destination") == [
+        ("destination", "http"),
+        ("destination", "wrap"),
+    ]
+    assert support_index.get_drivers_supporting(["tls"], "source") == [("source", "network")]
+    assert support_index.get_drivers_supporting(["tls", "unknown"]) == []
+    assert support_index.get_drivers_supporting([]) == []
+
+    assert support_index.get_shared_paths([("destination", "http"), ("destination", "kafka")]) == [
+        "keep-alive",
+        "tls",
+        "tls/ca-file",
+    ]
+    assert support_index.get_shared_paths([("source", "network")]) == ["port", "tls", "tls/ca-file"]
+
+    assert SupportIndex.from_dict(support_index.to_dict()) == support_index
+
+
+def test_support_index_is_read_from_the_header(tmp_path: Path, driver_db: DriverDB) -> None:
+    support_index = driver_db.to_support_index()
+
+    file = StringIO()
+    driver_db.dump(file, support_index=support_index)
+    assert DriverDB.read_support_index(StringIO(file.getvalue())) == support_index
+    assert DriverDB.read_content_hash(StringIO(file.getvalue())) == driver_db.content_hash()
+    assert DriverDB.load(StringIO(file.getvalue())) == driver_db
+
+    file = StringIO()
+    driver_db.dump(file)
+    assert DriverDB.read_support_index(StringIO(file.getvalue())) is None
+
+    db_file = tmp_path / "axosyslog-cfg-helper.db"
+    dump_sqlite_db(driver_db, db_file, support_index=support_index)
+    with closing(SQLiteDriverDB(db_file)) as sqlite_driver_db:
+        assert sqlite_driver_db.get_support_index() == support_index
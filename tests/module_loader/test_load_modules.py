@@ -0,0 +1,232 @@
+import importlib
+import shutil
+import tarfile
+
+from pathlib import Path
+
+import pytest
+from neologism import DCFG, Rule
+
+from axosyslog_cfg_helper.driver_db import Block, Driver, DriverDB, Option
+from axosyslog_cfg_helper.module_loader import ModuleMissingError, TarballSourceTree, load_modules, patch_modules
+
+load_modules_mod = importlib.import_module("axosyslog_cfg_helper.module_loader.load_modules")
+
+pytestmark = pytest.mark.skipif(shutil.which("bison") is None, reason="bison is not installed")
+
+COMMON_GRAMMAR = """
+%token KW_OPTIONS KW_SOURCE KW_LOG KW_FILE KW_TIME_REOPEN KW_STATS KW_LEVEL
+%token LL_IDENTIFIER LL_NUMBER LL_STRING
+%%
+start : stmts ;
+stmts : stmt ';' stmts | ;
+stmt : KW_SOURCE source_stmt | KW_LOG log_stmt | KW_OPTIONS options_stmt ;
+source_stmt : string '{' KW_FILE '(' string ')' ';' '}' ;
+log_stmt : '{' KW_SOURCE '(' string ')' ';' '}' ;
+options_stmt : '{' options_items '}' ;
+options_items : options_item ';' options_items | ;
+options_item : KW_TIME_REOPEN '(' positive_integer ')' | KW_STATS '(' KW_LEVEL '(' positive_integer ')' ')' ;
+string : LL_IDENTIFIER | LL_STRING ;
+positive_integer : LL_NUMBER ;
+%%
+"""
+
+COMMON_PARSER = """
+static CfgLexerKeyword main_keywords[] =
+{
+  { "options", KW_OPTIONS },
+  { "source", KW_SOURCE },
+  { "log", KW_LOG },
+  { "file", KW_FILE },
+  { "time_reopen", KW_TIME_REOPEN },
+  { "stats", KW_STATS },
+  { "level", KW_LEVEL },
+  { NULL }
+};
+"""
+
+MODULE_GRAMMAR = """
+%token LL_CONTEXT_DESTINATION KW_MYDEST KW_HOST KW_TLS KW_CA_FILE LL_IDENTIFIER LL_STRING LL_NUMBER
+%%
+start : LL_CONTEXT_DESTINATION KW_MYDEST '(' mydest_options ')' ;
+mydest_options : mydest_option mydest_options | ;
+mydest_option : KW_HOST '(' string ')' | KW_TLS '(' tls_options ')' ;
+tls_options : KW_CA_FILE '(' path ')' tls_options | ;
+expr : expr '+' LL_NUMBER | LL_NUMBER ;
+string : LL_IDENTIFIER | LL_STRING ;
+path : LL_STRING ;
+%%
+"""
+
+MODULE_PARSER = """
+static CfgLexerKeyword mydest_keywords[] =
+{
+  { "mydest", KW_MYDEST },
+  { "host", KW_HOST },
+  { "tls", KW_TLS },
+  { "ca_file", KW_CA_FILE },
+  { NULL }
+};
+"""
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def _create_source_tree(root: Path) -> Path:
+    _write(root / "lib" / "cfg-grammar.y", COMMON_GRAMMAR)
+    _write(root / "lib" / "cfg-parser.c", COMMON_PARSER)
+    _write(root / "modules" / "mydest" / "mydest-grammar.y", MODULE_GRAMMAR)
+    _write(root / "modules" / "mydest" / "mydest-parser.c", MODULE_PARSER)
+    (root / "modules" / "no-grammar").mkdir(parents=True)
+
+    return root
+
+
+def _expected_global_options() -> Driver:
+    expected = Driver("options", DriverDB.GLOBAL_OPTIONS_DRIVER_NAME)
+    expected.add_option(Option("time-reopen", {("<positive-integer>",)}))
+    stats = Block("stats")
+    stats.add_option(Option("level", {("<positive-integer>",)}))
+    expected.add_block(stats)
+
+    return expected
+
+
+def test_load_modules_global_options(tmp_path: Path) -> None:
+    source_dir = _create_source_tree(tmp_path)
+
+    driver_db = load_modules(source_dir / "lib", source_dir / "modules")
+
+    assert driver_db.get_driver("options", DriverDB.GLOBAL_OPTIONS_DRIVER_NAME) == _expected_global_options()
+    assert "source" not in driver_db.contexts
+
+
+def test_load_modules_module_drivers(tmp_path: Path) -> None:
+    source_dir = _create_source_tree(tmp_path)
+
+    driver_db = load_modules(source_dir / "lib", source_dir / "modules")
+
+    mydest = driver_db.get_driver("destination", "mydest")
+    assert mydest.get_option("host") == Option("host", {("<string>",)})
+    assert mydest.get_block("tls").get_option("ca-file") == Option("ca-file", {("<path>",)})
+
+
+def test_prune_grammar_keeps_sentences() -> None:
+    grammar = DCFG()
+    grammar.add_rule(Rule("start", ("LL_CONTEXT_DESTINATION", "driver", "(", "options", ")")))
+    grammar.add_rule(Rule("driver", ("mydest",)))
+    grammar.add_rule(Rule("options", ("option", "options")))
+    grammar.add_rule(Rule("options", ()))
+    grammar.add_rule(Rule("option", ("host", "(", "string", ")")))
+    grammar.add_rule(Rule("option", ("port", "(", "<number>", ")")))
+    grammar.add_rule(Rule("string", ("<string>",)))
+    grammar.add_rule(Rule("expr", ("expr", "+", "<number>")))
+    grammar.add_rule(Rule("expr", ("<number>",)))
+    grammar.start_symbol = "start"
+    sentences = grammar.sentences
+
+    number_of_removed_rules = load_modules_mod.__prune_grammar(grammar)
+
+    assert number_of_removed_rules == 3
+    assert "expr" not in grammar.symbols
+    # `start` reaches a loop, so its rules are left intact
+    assert "driver" in grammar.symbols
+    assert "string" not in grammar.symbols
+    assert grammar.sentences == sentences
+
+
+def test_load_modules_reuses_build_artifacts(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    source_dir = _create_source_tree(tmp_path / "source")
+    work_dir = tmp_path / "work"
+
+    driver_db = load_modules(source_dir / "lib", source_dir / "modules", work_dir=work_dir)
+    assert "reusing" not in capsys.readouterr().out
+
+    assert load_modules(source_dir / "lib", source_dir / "modules", work_dir=work_dir) == driver_db
+    assert capsys.readouterr().out.count("reusing") == 3
+
+    _write(source_dir / "modules" / "mydest" / "mydest-grammar.y", MODULE_GRAMMAR.replace("KW_HOST", "KW_TLS"))
+    patched_driver_db = load_modules(source_dir / "lib", source_dir / "modules", work_dir=work_dir)
+    output = capsys.readouterr().out
+    assert output.count("reusing") == 2
+    assert "Loading module 'mydest'.\n    Pruned" in output
+    assert "host" not in [option.name for option in patched_driver_db.get_driver("destination", "mydest").options]
+    assert len(list((work_dir / "module-mydest").iterdir())) == 1
+
+
+def test_load_modules_parallel_enumeration(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    source_dir = _create_source_tree(tmp_path)
+    driver_db = load_modules(source_dir / "lib", source_dir / "modules")
+
+    monkeypatch.setattr(load_modules_mod, "PARALLEL_ENUMERATION_MIN_SENTENCES", 1)
+
+    assert load_modules(source_dir / "lib", source_dir / "modules", jobs=2) == driver_db
+    assert load_modules(source_dir / "lib", source_dir / "modules", batch_parse=True, jobs=2) == driver_db
+
+
+def test_load_modules_from_tarball(tmp_path: Path) -> None:
+    source_dir = _create_source_tree(tmp_path / "axosyslog-1.2.3")
+    _write(
+        source_dir / "scl" / "mydest" / "mydest.conf",
+        "block destination mydest-wrapper(...) { mydest(`__VARARGS__`); };",
+    )
+    tarball = tmp_path / "axosyslog.tar.gz"
+    with tarfile.open(tarball, "w:gz") as archive:
+        archive.add(source_dir, arcname=source_dir.name)
+
+    source_tree = TarballSourceTree(tarball)
+    driver_db = load_modules(tarball / "lib", tarball / "modules", source_tree=source_tree)
+
+    assert driver_db == load_modules(source_dir / "lib", source_dir / "modules")
+    assert driver_db.get_driver("destination", "mydest-wrapper").get_option("host") == Option("host", {("<string>",)})
+    assert source_tree.is_dir(tarball / "modules" / "no-grammar")
+
+
+PLUGIN_GRAMMAR = """
+%token LL_CONTEXT_INNER_DEST KW_MYPLUGIN KW_LEVEL LL_NUMBER
+%%
+start : LL_CONTEXT_INNER_DEST KW_MYPLUGIN '(' KW_LEVEL '(' LL_NUMBER ')' ')' ;
+%%
+"""
+
+PLUGIN_PARSER = """
+static CfgLexerKeyword myplugin_keywords[] =
+{
+  { "myplugin", KW_MYPLUGIN },
+  { "level", KW_LEVEL },
+  { NULL }
+};
+"""
+
+
+def test_patch_modules(tmp_path: Path) -> None:
+    source_dir = _create_source_tree(tmp_path)
+    module_grammar = MODULE_GRAMMAR.replace("%token ", "%token LL_PLUGIN ").replace(
+        "mydest_option : ", "mydest_option : LL_PLUGIN | "
+    )
+    _write(source_dir / "modules" / "mydest" / "mydest-grammar.y", module_grammar)
+    _write(source_dir / "modules" / "myplugin" / "myplugin-grammar.y", PLUGIN_GRAMMAR)
+    _write(source_dir / "modules" / "myplugin" / "myplugin-parser.c", PLUGIN_PARSER)
+    driver_db = load_modules(source_dir / "lib", source_dir / "modules")
+    assert driver_db.get_driver("destination", "mydest").get_block("myplugin")
+
+    _write(source_dir / "modules" / "mydest" / "mydest-grammar.y", module_grammar.replace("KW_HOST", "KW_TLS"))
+    patch_modules(driver_db, source_dir / "lib", source_dir / "modules", ["mydest"])
+
+    assert driver_db == load_modules(source_dir / "lib", source_dir / "modules")
+
+    # The blocks removed from the module are not taken over from the previous version, only the plugins
+    _write(
+        source_dir / "modules" / "mydest" / "mydest-grammar.y",
+        module_grammar.replace(" | KW_TLS '(' tls_options ')'", ""),
+    )
+    patch_modules(driver_db, source_dir / "lib", source_dir / "modules", ["mydest"])
+
+    assert "tls" not in [block.name for block in driver_db.get_driver("destination", "mydest").blocks]
+    assert driver_db == load_modules(source_dir / "lib", source_dir / "modules")
+
+    with pytest.raises(ModuleMissingError):
+        patch_modules(driver_db, source_dir / "lib", source_dir / "modules", ["missing"])
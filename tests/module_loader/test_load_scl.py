@@ -6,9 +6,11 @@ from axosyslog_cfg_helper.module_loader.load_scl import (
     _parse_file,
     _scan_body,
     _split_params,
-    _strip_comments,
+    _tokenize,
     _varargs_base,
+    get_scl_driver_keys,
     load_scl,
+    reload_scl,
 )
 
 
@@ -21,48 +23,58 @@ def _write(tmp_path: Path, name: str, content: str) -> Path:
 
 def test_strip_comments_keeps_string_contents() -> None:
     text = '# this is a comment\nblock destination foo(opt("a # b")) { }'
-    stripped = _strip_comments(text)
+    stripped = _tokenize(text).text_between(0, len(text))
     assert "# this is a comment" not in stripped
     assert '"a # b"' in stripped
 
 
+def test_tokenize_matches_brackets_outside_strings_and_comments() -> None:
+    text = 'block destination foo(a(")") # (\n b()) { http(url("{") `__VARARGS__`); }'
+    stream = _tokenize(text)
+    params_open, body_open = 3, stream.matching[3] + 1
+
+    assert stream.is_punct(params_open, "(") and stream.is_punct(body_open, "{")
+    assert stream.text_between(stream.ends[params_open], stream.starts[body_open - 1]) == 'a(")") \n b()'
+    assert stream.matching[body_open] == len(stream) - 1
+
+
 def test_split_params_basic() -> None:
-    params = _split_params('url() index("") workers(4) ...')
+    params = _split_params(_tokenize('url() index("") workers(4) ...'))
     assert [p.name for p in params] == ["url", "index", "workers"]
     assert [p.default for p in params] == ["", '""', "4"]
 
 
 def test_split_params_nested_parens_in_default() -> None:
-    params = _split_params('tmpl("$(format-json --scope all)") timeout(10)')
+    params = _split_params(_tokenize('tmpl("$(format-json --scope all)") timeout(10)'))
     assert params[0].name == "tmpl"
     assert "format-json" in (params[0].default or "")
     assert params[1].name == "timeout"
 
 
 def test_varargs_base_simple() -> None:
-    refs = _scan_body("http(url(`u`) `__VARARGS__`)")
+    refs = _scan_body(_tokenize("http(url(`u`) `__VARARGS__`)"))
     assert _varargs_base(refs) == "http"
 
 
 def test_varargs_base_nested() -> None:
-    refs = _scan_body("parser { app-parser(topic(syslog) `__VARARGS__`); };")
+    refs = _scan_body(_tokenize("parser { app-parser(topic(syslog) `__VARARGS__`); };"))
     assert _varargs_base(refs) == "app-parser"
 
 
 def test_varargs_base_backticked_name() -> None:
-    refs = _scan_body("`kafka-implementation`(`__VARARGS__`);")
+    refs = _scan_body(_tokenize("`kafka-implementation`(`__VARARGS__`);"))
     # backticked driver names are pattern E; treat as unresolvable
     assert _varargs_base(refs) is None
 
 
 def test_varargs_base_no_enclosing() -> None:
-    refs = _scan_body("destination { pipe(p); `__VARARGS__`; };")
+    refs = _scan_body(_tokenize("destination { pipe(p); `__VARARGS__`; };"))
     assert _varargs_base(refs) is None
 
 
 def test_scan_body_captures_refs_with_string_state() -> None:
     body = 'http(url("`a`/x") body(`b`) cloud-auth(azure(monitor(`c`))) `__VARARGS__`);'
-    refs = {r.name: r for r in _scan_body(body)}
+    refs = {r.name: r for r in _scan_body(_tokenize(body))}
     assert refs["a"].in_string is True
     assert refs["a"].stack == ["http", "url"]
     assert refs["b"].in_string is False
@@ -106,6 +118,20 @@ def test_parse_file_direct_driver_wrap(tmp_path: Path) -> None:
     assert blocks[0].base_driver == "http"
 
 
+def test_parse_file_block_positions(tmp_path: Path, capsys) -> None:
+    path = _write(
+        tmp_path,
+        "x.conf",
+        "# header\nblock rewrite a() {};\n\n"
+        "  block rewrite b() {}; block destination c(...) { http(`__VARARGS__`); };\n",
+    )
+    blocks = _parse_file(path)
+    assert [(b.line, b.column) for b in blocks] == [(2, 1), (4, 3), (4, 25)]
+
+    load_scl(tmp_path, DriverDB())
+    assert f"{path}:4:25: base driver 'http' not found" in capsys.readouterr().out
+
+
 def test_parse_file_scl_to_scl_chain(tmp_path: Path) -> None:
     _write(
         tmp_path,
@@ -132,6 +158,53 @@ def test_parse_file_scl_to_scl_chain(tmp_path: Path) -> None:
     assert "batch-lines" in option_names
 
 
+def test_shared_scl_base_is_built_once(tmp_path: Path, monkeypatch) -> None:
+    _write(
+        tmp_path,
+        "x.conf",
+        """
+        block destination inner(a() ...) { http(`__VARARGS__`); };
+        block destination left(b() ...) { inner(`__VARARGS__`); };
+        block destination right(c() ...) { inner(`__VARARGS__`); };
+        block destination outer(d() ...) { left(`__VARARGS__`); };
+        """,
+    )
+    grammar_db = DriverDB()
+    grammar_db.add_driver(_http_with_auth_and_url(template_params=True))
+
+    built = []
+    build_driver = load_scl_mod._build_driver
+
+    def counting_build_driver(block, base_driver):
+        built.append(block.name)
+        return build_driver(block, base_driver)
+
+    monkeypatch.setattr(load_scl_mod, "_build_driver", counting_build_driver)
+    out = load_scl(tmp_path, grammar_db)
+
+    assert sorted(built) == ["inner", "left", "outer", "right"]
+    assert built.index("inner") < built.index("left") < built.index("outer")
+    assert "batch-lines" in {o.name for o in out.get_driver("destination", "outer").options}
+
+
+def test_scl_cycle_is_reported_and_emitted_with_declared_params_only(tmp_path: Path, capsys) -> None:
+    _write(
+        tmp_path,
+        "x.conf",
+        """
+        block destination ping(a() ...) { pong(`__VARARGS__`); };
+        block destination pong(b() ...) { ping(`__VARARGS__`); };
+        block destination wrap(c() ...) { ping(`__VARARGS__`); };
+        """,
+    )
+    out = load_scl(tmp_path, DriverDB())
+
+    assert "destination/ping -> destination/pong -> destination/ping" in capsys.readouterr().out
+    assert {o.name for o in out.get_driver("destination", "ping").options} == {"a"}
+    assert {o.name for o in out.get_driver("destination", "pong").options} == {"b"}
+    assert {o.name for o in out.get_driver("destination", "wrap").options} == {"a", "c"}
+
+
 def test_unresolvable_block_emitted_with_declared_params_only(tmp_path: Path) -> None:
     _write(
         tmp_path,
@@ -144,6 +217,116 @@ def test_unresolvable_block_emitted_with_declared_params_only(tmp_path: Path) ->
     assert option_names == {"only-this"}
 
 
+def test_load_scl_caches_parsed_files(tmp_path: Path, monkeypatch) -> None:
+    scl_dir, work_dir = tmp_path / "scl", tmp_path / "work"
+    _write(scl_dir, "a/a.conf", "block destination inner(a() ...) { http(`__VARARGS__`); };")
+    conf = _write(scl_dir, "b/b.conf", "block destination outer(b() ...) { inner(`__VARARGS__`); };")
+    grammar_db = DriverDB()
+    grammar_db.add_driver(_http_with_auth_and_url(template_params=True))
+    expected = load_scl(scl_dir, grammar_db)
+
+    assert load_scl(scl_dir, grammar_db, work_dir=work_dir) == expected
+    assert len(list((work_dir / "scl").rglob("*.pickle"))) == 2
+
+    parsed = []
+    parse_text = load_scl_mod._parse_text
+
+    def recording_parse_text(path, text):
+        parsed.append(path)
+        return parse_text(path, text)
+
+    monkeypatch.setattr(load_scl_mod, "_parse_text", recording_parse_text)
+    assert load_scl(scl_dir, grammar_db, work_dir=work_dir) == expected
+    assert not parsed
+
+    conf.write_text("block destination outer(c() ...) { inner(`__VARARGS__`); };", encoding="utf-8")
+    out = load_scl(scl_dir, grammar_db, work_dir=work_dir)
+    option_names = {o.name for o in out.get_driver("destination", "outer").options}
+    assert parsed == [conf]
+    assert "c" in option_names and "b" not in option_names
+    assert len(list((work_dir / "scl").rglob("*.pickle"))) == 2
+
+
+def test_load_scl_parses_the_files_with_broken_caches_again(tmp_path: Path, monkeypatch) -> None:
+    scl_dir, work_dir = tmp_path / "scl", tmp_path / "work"
+    _write(scl_dir, "a/a.conf", "block destination inner(a() ...) { http(`__VARARGS__`); };")
+    _write(scl_dir, "b/b.conf", "block destination outer(b() ...) { inner(`__VARARGS__`); };")
+    grammar_db = DriverDB()
+    grammar_db.add_driver(_http_with_auth_and_url(template_params=True))
+    expected = load_scl(scl_dir, grammar_db, work_dir=work_dir)
+
+    truncated_cache_file, incompatible_cache_file = sorted((work_dir / "scl").rglob("*.pickle"))
+    truncated_cache_file.write_bytes(truncated_cache_file.read_bytes()[:10])
+    # a class the loader does not have any more
+    incompatible_cache_file.write_bytes(b"caxosyslog_cfg_helper.module_loader.load_scl\n_RemovedBlock\n.")
+    assert load_scl(scl_dir, grammar_db, work_dir=work_dir) == expected
+
+    parsed = []
+    parse_text = load_scl_mod._parse_text
+
+    def recording_parse_text(path, text):
+        parsed.append(path)
+        return parse_text(path, text)
+
+    monkeypatch.setattr(load_scl_mod, "_parse_text", recording_parse_text)
+    assert load_scl(scl_dir, grammar_db, work_dir=work_dir) == expected
+    assert not parsed
+
+
+def test_load_scl_keeps_the_caches_of_other_scl_dirs(tmp_path: Path, monkeypatch) -> None:
+    work_dir = tmp_path / "work"
+    first_scl_dir, second_scl_dir = tmp_path / "first" / "scl", tmp_path / "second" / "scl"
+    _write(first_scl_dir, "a/a.conf", "block destination first(a() ...) { http(`__VARARGS__`); };")
+    _write(second_scl_dir, "b/b.conf", "block destination second(b() ...) { http(`__VARARGS__`); };")
+    grammar_db = DriverDB()
+    grammar_db.add_driver(_http_with_auth_and_url(template_params=True))
+
+    load_scl(first_scl_dir, grammar_db, work_dir=work_dir)
+    load_scl(second_scl_dir, grammar_db, work_dir=work_dir)
+    assert len(list((work_dir / "scl").rglob("*.pickle"))) == 2
+
+    parsed = []
+    parse_text = load_scl_mod._parse_text
+
+    def recording_parse_text(path, text):
+        parsed.append(path)
+        return parse_text(path, text)
+
+    monkeypatch.setattr(load_scl_mod, "_parse_text", recording_parse_text)
+    load_scl(first_scl_dir, grammar_db, work_dir=work_dir)
+    load_scl(second_scl_dir, grammar_db, work_dir=work_dir)
+    assert not parsed
+
+
+def test_reload_scl_resolves_changed_blocks_only(tmp_path: Path) -> None:
+    _write(tmp_path, "a.conf", "block destination inner(a() ...) { http(`__VARARGS__`); };")
+    _write(tmp_path, "b.conf", "block destination outer(b() ...) { inner(`__VARARGS__`); };")
+    _write(tmp_path, "c.conf", "block destination other(c() ...) { http(`__VARARGS__`); };")
+    grammar_db = DriverDB()
+    grammar_db.add_driver(_http_with_auth_and_url(template_params=True))
+    previous_db = load_scl(tmp_path, grammar_db)
+    other = previous_db.get_driver("destination", "other")
+
+    conf = _write(tmp_path, "a.conf", "block destination inner(d() ...) { http(`__VARARGS__`); };")
+    stale_keys = get_scl_driver_keys(tmp_path)[conf]
+    out = reload_scl(tmp_path, grammar_db, previous_db, stale_keys)
+
+    assert out == load_scl(tmp_path, grammar_db)
+    assert out.get_driver("destination", "other") is other
+    assert "d" in {o.name for o in out.get_driver("destination", "outer").options}
+
+
+def test_load_scl_parallel(tmp_path: Path, monkeypatch) -> None:
+    for index in range(8):
+        _write(tmp_path, f"{index}.conf", f"block destination wrap{index}(a{index}() ...) {{ http(`__VARARGS__`); }};")
+    grammar_db = DriverDB()
+    grammar_db.add_driver(_http_with_auth_and_url(template_params=True))
+    expected = load_scl(tmp_path, grammar_db)
+
+    monkeypatch.setattr(load_scl_mod, "PARALLEL_SCL_PARSING_MIN_BYTES", 0)
+    assert load_scl(tmp_path, grammar_db, jobs=2) == expected
+
+
 def test_load_scl_missing_dir_returns_empty(tmp_path: Path) -> None:
     out = load_scl(tmp_path / "does-not-exist", DriverDB())
     assert not list(out.contexts)
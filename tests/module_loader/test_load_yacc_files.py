@@ -0,0 +1,45 @@
+import shutil
+
+from pathlib import Path
+
+import pytest
+from neologism import DCFG, YaccDecodeError
+
+from axosyslog_cfg_helper.module_loader.load_yacc_files import YaccFileLoader
+from axosyslog_cfg_helper.module_loader.source_tree import DirectorySourceTree
+
+from .test_load_modules import COMMON_GRAMMAR, MODULE_GRAMMAR
+
+pytestmark = pytest.mark.skipif(shutil.which("bison") is None, reason="bison is not installed")
+
+
+def test_load_yacc_files_same_as_from_yacc_file(tmp_path: Path) -> None:
+    grammar_files = []
+    for index in range(5):
+        grammar_files.append(tmp_path / f"common{index}-grammar.y")
+        grammar_files[-1].write_text(COMMON_GRAMMAR, encoding="utf-8")
+        grammar_files.append(tmp_path / f"module{index}-grammar.y")
+        grammar_files[-1].write_text(MODULE_GRAMMAR, encoding="utf-8")
+
+    with YaccFileLoader(DirectorySourceTree(tmp_path), 3) as yacc_loader:
+        yacc_loader.prefetch(grammar_files[1:])
+        # The grammar files not queued, or taken out of order, are loaded too
+        for grammar_file in grammar_files[::-1]:
+            grammar = yacc_loader.load(grammar_file)
+            expected = DCFG.from_yacc_file(grammar_file)
+            assert grammar.rules == expected.rules
+            assert grammar.start_symbol == expected.start_symbol
+            assert grammar.sentences == expected.sentences
+
+
+def test_load_yacc_files_error(tmp_path: Path) -> None:
+    valid_grammar_file = tmp_path / "valid-grammar.y"
+    valid_grammar_file.write_text(MODULE_GRAMMAR, encoding="utf-8")
+    invalid_grammar_file = tmp_path / "invalid-grammar.y"
+    invalid_grammar_file.write_text("%%\nstart : undefined_symbol ;\n", encoding="utf-8")
+
+    with YaccFileLoader(DirectorySourceTree(tmp_path), 2) as yacc_loader:
+        yacc_loader.prefetch([valid_grammar_file, invalid_grammar_file])
+        yacc_loader.load(valid_grammar_file)
+        with pytest.raises(YaccDecodeError, match="invalid-grammar.y"):
+            yacc_loader.load(invalid_grammar_file)
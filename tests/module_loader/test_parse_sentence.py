@@ -1,7 +1,7 @@
 from typing import List, Tuple
 import pytest
 
-from axosyslog_cfg_helper.module_loader.parse_sentence import parse_sentence
+from axosyslog_cfg_helper.module_loader.parse_sentence import parse_sentence, ParseError
 from axosyslog_cfg_helper.driver_db import Driver, Block, Option
 
 
@@ -282,3 +282,16 @@ def get_test_params() -> List[Tuple[Tuple[str, ...], Driver]]:
 @pytest.mark.parametrize("sentence, expected_driver", get_test_params(), ids=range(len(get_test_params())))
 def test_parse_sentence(sentence, expected_driver):
     assert parse_sentence(sentence) == expected_driver
+
+
+@pytest.mark.parametrize(
+    "sentence",
+    [
+        ("LL_CONTEXT_CTX", "driver", "(", "block", "(", "(", "option", ")"),
+        ("LL_CONTEXT_CTX", "driver", "(", "<key>", "=>", "<value>", "(", ")"),
+        ("LL_CONTEXT_CTX", "driver", "(", "<type>", "(", "<param>", ")"),
+    ],
+)
+def test_parse_sentence_not_closed(sentence):
+    with pytest.raises(ParseError):
+        parse_sentence(sentence)
@@ -0,0 +1,56 @@
+from typing import List, Tuple
+
+from axosyslog_cfg_helper.driver_db import DriverDB
+from axosyslog_cfg_helper.module_loader.parse_sentence import ParseError, parse_sentence
+from axosyslog_cfg_helper.module_loader.parse_sentences import parse_sentences
+
+from .test_parse_sentence import get_test_params
+
+
+def _merge_parse_sentence(sentences: List[Tuple[str, ...]]) -> DriverDB:
+    driver_db = DriverDB()
+    for sentence in sentences:
+        try:
+            driver_db.add_driver(parse_sentence(sentence))
+        except ParseError:
+            continue
+
+    return driver_db
+
+
+def test_parse_sentences_same_as_parse_sentence():
+    sentences = [sentence for sentence, _ in get_test_params()]
+
+    assert parse_sentences(sentences) == _merge_parse_sentence(sentences)
+
+
+def test_parse_sentences_common_prefixes():
+    sentences = [
+        ("LL_CONTEXT_DESTINATION", "http", "(", "tls", "(", "ca-file", "(", "<path>", ")", ")", ")"),
+        ("LL_CONTEXT_DESTINATION", "http", "(", "tls", "(", "key-file", "(", "<path>", ")", ")", ")"),
+        ("LL_CONTEXT_DESTINATION", "http", "(", "tls", "(", "key-file", "(", "<path>", ")", ")", ")"),
+        ("LL_CONTEXT_DESTINATION", "http", "(", "tls", "(", ")", "url", "(", "<string>", ")", ")"),
+        ("LL_CONTEXT_DESTINATION", "http", "(", "<key>", "=>", "<value>", ")"),
+        ("LL_CONTEXT_DESTINATION", "http", "(", "<key>", "<value>", ")"),
+        ("options", "{", "stats", "(", "level", "(", "<number>", ")", ")", "}", ";"),
+        ("options", "{", "stats", "(", "freq", "(", "<number>", ")", ")", "}", ";"),
+    ]
+
+    assert parse_sentences(sentences) == _merge_parse_sentence(sentences)
+
+
+def test_parse_sentences_errors():
+    valid = ("LL_CONTEXT_DESTINATION", "http", "(", "url", "(", "<string>", ")", ")")
+    not_closed = ("LL_CONTEXT_DESTINATION", "http", "(", "url", "(", "<string>", ")")
+    block_not_closed = ("LL_CONTEXT_DESTINATION", "http", "(", "tls", "(", "(", "url", ")")
+    no_context = ("destination", "http", "(", ")")
+    errors = {}
+
+    driver_db = parse_sentences(
+        [valid, not_closed, block_not_closed, no_context],
+        lambda sentence, exception: errors.update({sentence: str(exception)}),
+    )
+
+    assert driver_db == _merge_parse_sentence([valid])
+    assert errors.keys() == {not_closed, block_not_closed, no_context}
+    assert errors[no_context] == "Context is missing."
@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from axosyslog_cfg_helper.module_loader.source_changes import get_changed_files
+from axosyslog_cfg_helper.module_loader.source_tree import DirectorySourceTree
+
+
+def test_get_changed_files():
+    previous_mtimes = {Path("removed.conf"): 1.0, Path("modified.conf"): 1.0, Path("unchanged.conf"): 1.0}
+    current_mtimes = {Path("added.conf"): 2.0, Path("modified.conf"): 2.0, Path("unchanged.conf"): 1.0}
+
+    assert get_changed_files(previous_mtimes, current_mtimes) == {
+        Path("added.conf"),
+        Path("removed.conf"),
+        Path("modified.conf"),
+    }
+
+
+def test_directory_source_tree_get_mtimes(tmp_path: Path):
+    grammar_file = tmp_path / "modules" / "http" / "http-grammar.y"
+    grammar_file.parent.mkdir(parents=True)
+    grammar_file.write_text("%%\n", encoding="utf-8")
+    (tmp_path / "modules" / "http" / "http.c").write_text("", encoding="utf-8")
+
+    assert DirectorySourceTree(tmp_path).get_mtimes() == {grammar_file: grammar_file.stat().st_mtime}
@@ -0,0 +1,62 @@
+import io
+import tarfile
+
+from pathlib import Path
+
+import pytest
+
+from axosyslog_cfg_helper.module_loader.source_tree import TarballSourceTree
+
+
+def _add_file(archive: tarfile.TarFile, name: str, content: bytes) -> None:
+    member = tarfile.TarInfo(name)
+    member.size = len(content)
+    archive.addfile(member, io.BytesIO(content))
+
+
+def _add_link(archive: tarfile.TarFile, name: str, link_type: bytes, linkname: str) -> None:
+    member = tarfile.TarInfo(name)
+    member.type = link_type
+    member.linkname = linkname
+    archive.addfile(member)
+
+
+def test_tarball_source_tree(tmp_path: Path) -> None:
+    tarball = tmp_path / "axosyslog.tar"
+    with tarfile.open(tarball, "w") as archive:
+        _add_file(archive, "axosyslog-1.2.3/modules/http/http-grammar.y", b"%%\n")
+        _add_file(archive, "axosyslog-1.2.3/modules/http/http.c", b"")
+        _add_link(archive, "axosyslog-1.2.3/modules/http/link-grammar.y", tarfile.SYMTYPE, "http-grammar.y")
+        _add_link(
+            archive,
+            "axosyslog-1.2.3/modules/hard-grammar.y",
+            tarfile.LNKTYPE,
+            "axosyslog-1.2.3/modules/http/http-grammar.y",
+        )
+        _add_link(archive, "axosyslog-1.2.3/modules/chained.conf", tarfile.SYMTYPE, "http/link-grammar.y")
+        _add_link(archive, "axosyslog-1.2.3/modules/dangling.conf", tarfile.SYMTYPE, "missing.conf")
+        _add_link(archive, "axosyslog-1.2.3/modules/outside.conf", tarfile.SYMTYPE, "../../outside.conf")
+        _add_link(archive, "axosyslog-1.2.3/modules/http-dir", tarfile.SYMTYPE, "http")
+
+    source_tree = TarballSourceTree(tarball)
+    modules_dir = tarball / "modules"
+
+    assert source_tree.is_dir(modules_dir / "http")
+    assert sorted(source_tree.iterdir(modules_dir)) == [
+        modules_dir / "chained.conf",
+        modules_dir / "hard-grammar.y",
+        modules_dir / "http",
+    ]
+    assert sorted(source_tree.rglob(modules_dir, "*-grammar.y")) == [
+        modules_dir / "hard-grammar.y",
+        modules_dir / "http" / "http-grammar.y",
+        modules_dir / "http" / "link-grammar.y",
+    ]
+
+    for link in ("hard-grammar.y", "http/link-grammar.y", "chained.conf"):
+        assert source_tree.is_file(modules_dir / link)
+        assert source_tree.read_bytes(modules_dir / link) == b"%%\n"
+
+    assert source_tree.is_file(modules_dir / "http" / "http.c")
+    with pytest.raises(FileNotFoundError):
+        source_tree.read_bytes(modules_dir / "http" / "http.c")
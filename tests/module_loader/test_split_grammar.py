@@ -0,0 +1,72 @@
+from itertools import combinations
+from typing import Set, Tuple
+
+from neologism import DCFG, Rule
+
+from axosyslog_cfg_helper.module_loader.split_grammar import split_grammar
+
+
+def _create_grammar(*rules: Rule) -> DCFG:
+    grammar = DCFG()
+    for rule in rules:
+        grammar.add_rule(rule)
+
+    return grammar
+
+
+def _sentences_of_parts(grammar: DCFG, max_parts: int) -> Set[Tuple[str, ...]]:
+    parts = split_grammar(grammar, max_parts)
+    sentences_of_parts = [part.sentences for part in parts]
+
+    assert 1 < len(parts) <= max_parts
+    assert all(part.is_finite() for part in parts)
+    assert all(not first & second for first, second in combinations(sentences_of_parts, 2))
+
+    return set().union(*sentences_of_parts)
+
+
+def test_split_grammar_by_alternatives_of_start():
+    grammar = _create_grammar(
+        Rule("$accept", ("start",)),
+        Rule("start", ("source", "a", "(", "options", ")")),
+        Rule("start", ("source", "b", "(", "options", ")")),
+        Rule("start", ("destination", "c", "(", "options", ")")),
+        Rule("options", ("option", "options")),
+        Rule("options", ()),
+        Rule("option", ("x", "(", "<string>", ")")),
+        Rule("option", ("y", "(", "option", ")")),
+    )
+
+    assert _sentences_of_parts(grammar, 2) == grammar.sentences
+    assert _sentences_of_parts(grammar, 5) == grammar.sentences
+
+
+def test_split_grammar_cuts_the_loops_like_the_serial_enumeration():
+    grammar = _create_grammar(
+        Rule("S", ("N0",)),
+        Rule("N0", ("N2", "N3", "a")),
+        Rule("N2", ("N3", "N0")),
+        Rule("N2", ("b", "N1")),
+        Rule("N1", ("N2", "c")),
+        Rule("N1", ("c",)),
+        Rule("N3", ("N2",)),
+        Rule("N3", ("c", "a", "a")),
+        Rule("N3", ()),
+    )
+
+    assert _sentences_of_parts(grammar, 4) == grammar.sentences
+
+
+def test_split_grammar_without_alternatives():
+    grammar = _create_grammar(Rule("start", ("options", "{", "level", "(", "<number>", ")", "}", ";")))
+
+    parts = split_grammar(grammar, 4)
+
+    assert len(parts) == 1
+    assert parts[0].sentences == grammar.sentences
+
+
+def test_neologism_keeps_the_graph_of_the_grammar():
+    # split_grammar() cuts the loops of this private graph, like DCFG.iter_sentences() does
+    graph = getattr(DCFG(), "_DCFG__graph")
+    assert graph.is_directed() and graph.is_multigraph()
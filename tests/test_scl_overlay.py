@@ -0,0 +1,64 @@
+from pathlib import Path
+
+from axosyslog_cfg_helper.driver_db import Driver, DriverDB, Option
+from axosyslog_cfg_helper.module_loader import load_scl as load_scl_mod
+from axosyslog_cfg_helper.module_loader.load_scl import load_scl
+from axosyslog_cfg_helper.scl_overlay import load_overlay
+
+
+def _grammar_db() -> DriverDB:
+    http = Driver("destination", "http")
+    http.add_option(Option(name="url", params={("<string>",)}))
+
+    return DriverDB().add_driver(http)
+
+
+def _option_names(driver_db: DriverDB, driver_name: str) -> set:
+    return {option.name for option in driver_db.get_driver("destination", driver_name).options}
+
+
+def test_load_overlay_reuses_the_cache(tmp_path: Path, monkeypatch) -> None:
+    scl_dir, cache_dir = tmp_path / "scl", tmp_path / "cache"
+    scl_dir.mkdir()
+    (scl_dir / "a.conf").write_text("block destination wrap(a() ...) { http(`__VARARGS__`); };", encoding="utf-8")
+
+    overlay, fingerprint = load_overlay(scl_dir, _grammar_db(), "db", cache_dir)
+    assert overlay == load_scl(scl_dir, _grammar_db())
+
+    def failing_resolve(*_):
+        raise AssertionError("the cached overlay is not reused")
+
+    monkeypatch.setattr(load_scl_mod, "_resolve", failing_resolve)
+    assert load_overlay(scl_dir, _grammar_db(), "db", cache_dir) == (overlay, fingerprint)
+
+
+def test_load_overlay_resolves_changed_files(tmp_path: Path) -> None:
+    scl_dir, cache_dir = tmp_path / "scl", tmp_path / "cache"
+    scl_dir.mkdir()
+    conf = scl_dir / "a.conf"
+    conf.write_text("block destination inner(a() ...) { http(`__VARARGS__`); };", encoding="utf-8")
+    (scl_dir / "b.conf").write_text("block destination outer(b() ...) { inner(`__VARARGS__`); };", encoding="utf-8")
+    _, fingerprint = load_overlay(scl_dir, _grammar_db(), "db", cache_dir)
+
+    conf.write_text("block destination inner(changed() ...) { http(`__VARARGS__`); };", encoding="utf-8")
+    overlay, changed_fingerprint = load_overlay(scl_dir, _grammar_db(), "db", cache_dir)
+    assert overlay == load_scl(scl_dir, _grammar_db())
+    assert _option_names(overlay, "outer") == {"b", "changed", "url"}
+    assert changed_fingerprint != fingerprint
+
+    conf.unlink()
+    overlay, _ = load_overlay(scl_dir, _grammar_db(), "db", cache_dir)
+    assert overlay == load_scl(scl_dir, _grammar_db())
+    assert _option_names(overlay, "outer") == {"b"}
+
+
+def test_load_overlay_resolves_every_block_for_another_db(tmp_path: Path) -> None:
+    scl_dir, cache_dir = tmp_path / "scl", tmp_path / "cache"
+    scl_dir.mkdir()
+    (scl_dir / "a.conf").write_text("block destination wrap(a() ...) { http(`__VARARGS__`); };", encoding="utf-8")
+    load_overlay(scl_dir, _grammar_db(), "db", cache_dir)
+
+    grammar_db = _grammar_db()
+    grammar_db.get_driver("destination", "http").add_option(Option(name="body", params={("<string>",)}))
+    overlay, _ = load_overlay(scl_dir, grammar_db, "another db", cache_dir)
+    assert _option_names(overlay, "wrap") == {"a", "body", "url"}